@@ -0,0 +1,54 @@
+import argparse
+import json
+import sys
+
+from batch_qa import BatchAnswerer
+from config_manager import ConfigManager
+from rag_pipeline import RAGPipeline
+
+
+def build_config(args):
+    config = ConfigManager(args.config).get_config()
+    defaults = config.get("defaults") or {}
+    config["mode"] = args.mode or defaults.get("chat_model_provider")
+    config["model_name"] = args.model or defaults.get("chat_model")
+    config["embedding_model_provider"] = args.embedding_provider or defaults.get("embedding_model_provider")
+    config["embedding_model"] = args.embedding_model or defaults.get("embedding_model")
+    batch_config = dict(config.get("batch") or {})
+    if args.concurrency:
+        batch_config["max_concurrency"] = args.concurrency
+    if args.batch_size:
+        batch_config["batch_size"] = args.batch_size
+    config["batch"] = batch_config
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer questions from a JSONL file in bulk.")
+    parser.add_argument("input", help="JSONL file with one {\"id\": ..., \"question\": ...} object per line")
+    parser.add_argument("output", help="JSONL file the answers are appended to; answered ids are skipped when rerun")
+    parser.add_argument("--config", default="config/config.yml", help="Configuration file")
+    parser.add_argument("--mode", help="LLM provider (default: from config defaults)")
+    parser.add_argument("--model", help="Chat model (default: from config defaults)")
+    parser.add_argument("--embedding-provider", help="Embedding provider (default: from config defaults)")
+    parser.add_argument("--embedding-model", help="Embedding model (default: from config defaults)")
+    parser.add_argument("--concurrency", type=int, help="Generations in flight (default: batch.max_concurrency)")
+    parser.add_argument("--batch-size", type=int, help="Questions embedded and searched per batch (default: batch.batch_size)")
+    parser.add_argument("--restart", action="store_true", help="Overwrite the output instead of resuming it")
+    args = parser.parse_args()
+
+    pipeline = RAGPipeline(build_config(args))
+    pipeline.setup()
+    try:
+        stats = BatchAnswerer.from_config(pipeline).run(args.input, args.output, resume=not args.restart)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nInterrupted; rerun the same command to resume.")
+        sys.exit(130)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
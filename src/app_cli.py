@@ -158,9 +158,14 @@ def setup_providers(config):
     return mode, model, embedding_provider, embedding_model
 
 def run_chat(config, handler, rag_pipeline):
+    suggestions = []
     while True:
         try:
             user_input = input("\nYou: ").strip()
+            # A suggested follow-up can be picked by its number; its retrieval was prefetched
+            if user_input.isdigit() and 1 <= int(user_input) <= len(suggestions):
+                user_input = suggestions[int(user_input) - 1]
+                print(f"You: {user_input}")
             
             # Check for special commands
             if user_input.lower() == '/quit':
@@ -169,10 +174,21 @@ def run_chat(config, handler, rag_pipeline):
             elif user_input.lower() == '/restart':
                 print("\nRestarting provider selection...")
                 return True  # Signal to restart provider selection
+            elif user_input.lower() == '/clear':
+                rag_pipeline.reset_conversation()
+                suggestions = []
+                print("\nConversation history cleared.")
+                continue
             
             # Process normal chat input
             if user_input:
-                rag_pipeline.process_input(user_input)
+                suggestions = []
+                if rag_pipeline.process_input(user_input) is not None:
+                    suggestions = rag_pipeline.suggest_followups()
+                if suggestions:
+                    print("\nSuggested follow-ups (enter the number to ask):")
+                    for i, suggestion in enumerate(suggestions, 1):
+                        print(f"{i}. {suggestion}")
                 
         except (KeyboardInterrupt, EOFError):
             print("\nExiting...")
@@ -181,9 +197,13 @@ def run_chat(config, handler, rag_pipeline):
 def main():
     try:
         config_manager = ConfigManager()
-        config = config_manager.get_config()
+        reload_config = config_manager.get_config().get("config_reload") or {}
+        if reload_config.get("watch", True):
+            # Edits to config.yml are applied to the running pipeline without a restart
+            config_manager.start_watching(reload_config.get("interval", 2.0))
         
         while True:
+            config = config_manager.get_config()
             # Get mode and model selections
             mode, model, embedding_provider, embedding_model = setup_providers(config)
             if mode is None or model is None or embedding_provider is None or embedding_model is None:
@@ -200,15 +220,23 @@ def main():
             print(f"Using {embedding_provider} for embeddings with model: {embedding_model}")
             print("\nAvailable commands:")
             print("/restart - Restart provider selection")
+            print("/clear   - Clear conversation history")
             print("/quit    - Exit the program")
             
             # Initialize RAG pipeline with streaming handler
             handler = CommandLineStreamingHandler()
             rag_pipeline = RAGPipeline(config, handler=handler)
             rag_pipeline.setup()
+            on_reload = rag_pipeline.follow_config(config_manager, overrides={
+                "mode": mode,
+                "model_name": model,
+                "embedding_model_provider": embedding_provider,
+                "embedding_model": embedding_model,
+            })
 
             # Start chat loop
             should_restart = run_chat(config, handler, rag_pipeline)
+            config_manager.unsubscribe(on_reload)
             if not should_restart:
                 break
 
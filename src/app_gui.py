@@ -14,7 +14,7 @@ config_manager = ConfigManager()
 
 
 def setup_pipeline(selected_mode, selected_model_name, selected_embedding_provider, selected_embedding_model, uploaded_files, handler):
-    """Sets up the RAG pipeline and returns the chain."""
+    """Sets up and returns the RAG pipeline."""
     try:
         # Create a temporary directory for uploaded files
         temp_dir = tempfile.mkdtemp()
@@ -28,34 +28,41 @@ def setup_pipeline(selected_mode, selected_model_name, selected_embedding_provid
                     f.write(uploaded_file.getvalue())
                 saved_files.append(path)
         
-        embedding_config = {
-            "provider": selected_embedding_provider,
-            "model": selected_embedding_model,
-            "openai_api_key": config_manager.get_config().get("embedding", {}).get("openai_api_key")
-        }
-
-        pipeline_config = {
+        overrides = {
             "mode": selected_mode,
             "model_name": selected_model_name,
-            "callbacks": [handler],
+            "embedding_model_provider": selected_embedding_provider,
+            "embedding_model": selected_embedding_model,
             "ingest_docs": saved_files,
-            "embedding": embedding_config,
         }
+        # The full config carries the provider URLs and API keys the embeddings and LLM clients need
+        pipeline_config = {**config_manager.get_config(), **overrides}
         
         pipeline = RAGPipeline(pipeline_config, handler=handler)
         pipeline.setup()
-        return pipeline.chain
+        if not pipeline.chain:
+            return None
+
+        # Config file edits are applied to this pipeline; the one it replaces stops following them. The
+        # subscription holds the pipeline weakly, so it also ends when a closed session's state is collected.
+        if st.session_state.get("config_subscription"):
+            config_manager.unsubscribe(st.session_state.config_subscription)
+        st.session_state.config_subscription = pipeline.follow_config(config_manager, overrides)
+        return pipeline
             
     except Exception as e:
         st.error(f"Error setting up RAG pipeline: {e}")
         return None
 
 def main():
+    # Every rerun checks whether config.yml was edited; a changed file is reloaded before the sidebar reads it
+    config_manager.check_for_changes()
+
     # Initialize session state
     if "messages" not in st.session_state:
         st.session_state.messages = []
-    if "rag_chain" not in st.session_state:
-        st.session_state.rag_chain = None
+    if "rag_pipeline" not in st.session_state:
+        st.session_state.rag_pipeline = None
     if "handler" not in st.session_state:
         st.session_state.handler = StreamlitStreamingHandler()
     if "selected_mode" not in st.session_state:
@@ -144,7 +151,7 @@ def main():
 
         if not st.session_state.pipeline_initialized or config_changed:
             with st.spinner("Setting up RAG Pipeline..."):
-                st.session_state.rag_chain = setup_pipeline(
+                st.session_state.rag_pipeline = setup_pipeline(
                     st.session_state.selected_mode,
                     st.session_state.selected_model_name,
                     st.session_state.selected_embedding_provider,
@@ -152,7 +159,7 @@ def main():
                     st.session_state.uploaded_files,
                     st.session_state.handler
                 )
-                if st.session_state.rag_chain:
+                if st.session_state.rag_pipeline:
                     st.session_state.pipeline_initialized = True
                     st.success("Configuration applied successfully!")
                     st.session_state.messages = [] # Clear messages on re-config
@@ -175,27 +182,34 @@ def main():
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
-    if prompt := st.chat_input("Ask a question..."):
+    # A clicked follow-up suggestion is asked like a typed question; its retrieval was prefetched
+    prompt = st.chat_input("Ask a question...") or st.session_state.pop("followup", None)
+    if prompt:
+        st.session_state.followups = []
         st.session_state.messages.append({"role": "user", "content": prompt})
         with st.chat_message("user"):
             st.markdown(prompt)
 
         with st.chat_message("assistant"):
-            if st.session_state.rag_chain:
+            if st.session_state.rag_pipeline:
                 message_placeholder = st.empty()
                 st.session_state.handler.set_container(message_placeholder)
-                
-                response = st.session_state.rag_chain.invoke({"query": prompt})
-                
-                if isinstance(response, dict) and "result" in response:
-                    message_placeholder.markdown(response["result"])
-                    st.session_state.messages.append({"role": "assistant", "content": response["result"]})
+
+                # The handler renders the streamed tokens as process_input consumes the pipeline's event stream
+                answer = st.session_state.rag_pipeline.process_input(prompt)
+                if answer is None:
+                    st.error("Error processing your question. Check the console for details.")
                 else:
-                     # The handler will have already updated the UI
-                    st.session_state.messages.append({"role": "assistant", "content": st.session_state.handler.text})
+                    st.session_state.messages.append({"role": "assistant", "content": answer})
+                    st.session_state.followups = st.session_state.rag_pipeline.suggest_followups()
 
             else:
                 st.warning("Please configure the RAG pipeline in the sidebar first.")
 
+    for i, suggestion in enumerate(st.session_state.get("followups") or []):
+        if st.button(suggestion, key=f"followup-{i}"):
+            st.session_state.followup = suggestion
+            st.rerun()
+
 if __name__ == "__main__":
     main()
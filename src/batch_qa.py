@@ -0,0 +1,227 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from llm_scheduler import request_options
+from vector_store_factory import VectorStoreFactory
+
+# Batch generations queue behind interactive requests and prefetches when the provider has a scheduler
+BATCH_PRIORITY = 20
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.split())
+
+
+def read_questions(path):
+    """
+    Return (id, question) pairs from a JSONL file of {"id": ..., "question": ...} objects or plain JSON strings.
+    Items without an id are numbered by their line.
+    """
+    items = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{number}: invalid JSON: {e}")
+            if isinstance(record, str):
+                record = {"question": record}
+            if not isinstance(record, dict) or not isinstance(record.get("question"), str):
+                raise ValueError(f"{path}:{number}: expected an object with a \"question\" string")
+            item_id = record.get("id", number)
+            if item_id in seen:
+                raise ValueError(f"{path}:{number}: duplicate id {item_id!r}")
+            seen.add(item_id)
+            items.append((item_id, record["question"]))
+    return items
+
+
+def load_completed(output_path):
+    """
+    Return the ids already answered in an output file. Failed records and a line cut off by an
+    interruption are removed from the file, so those questions are answered again.
+    """
+    if not os.path.exists(output_path):
+        return set()
+    completed = set()
+    kept = []
+    dropped = False
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line) if line.endswith("\n") else None
+            except json.JSONDecodeError:
+                record = None
+            if not isinstance(record, dict) or "id" not in record or "error" in record:
+                dropped = True
+                continue
+            completed.add(record["id"])
+            kept.append(line)
+    if dropped:
+        temp_path = f"{output_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        os.replace(temp_path, output_path)
+    return completed
+
+
+def _sources(docs):
+    return list(dict.fromkeys(doc.metadata.get("source") for doc in docs or [] if doc.metadata.get("source")))
+
+
+class BatchAnswerer:
+    """
+    Answers questions from a file with a set-up RAGPipeline. Identical questions are answered once.
+    Questions are processed in batches whose embeddings are computed in one call and searched in one
+    vector store query; generations then run with at most `max_concurrency` in flight while the next
+    batch is retrieved. Answers are appended to the output as they complete, so an interrupted run
+    resumes with the questions it had not answered yet.
+    """
+
+    def __init__(self, pipeline, max_concurrency: int = 4, batch_size: int = 256, priority: int = BATCH_PRIORITY, k: int = 4):
+        self.pipeline = pipeline
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.priority = priority
+        self.k = k
+
+    @classmethod
+    def from_config(cls, pipeline):
+        batch_config = pipeline.config.get("batch") or {}
+        return cls(
+            pipeline,
+            max_concurrency=batch_config.get("max_concurrency", 4),
+            batch_size=batch_config.get("batch_size", 256),
+            priority=batch_config.get("priority", BATCH_PRIORITY),
+            k=(pipeline.config.get("retrieval") or {}).get("k", 4),
+        )
+
+    @staticmethod
+    def _rag(components):
+        return bool(components.config.get("ingest_docs")) and components.vector_store is not None
+
+    def _search(self, components, questions):
+        """Return the retrieved documents per question, or None for each when retrieval runs per question."""
+        if not self._rag(components) or components.fusion_retriever:
+            # Query expansion needs LLM calls per question, so it runs alongside the generation
+            return [None] * len(questions)
+        # Embedded as documents: one request for the whole batch, without filling the query cache
+        vectors = components.embeddings.embed_documents(questions)
+        return VectorStoreFactory.search_by_vectors(components.vector_store, vectors, self.k)
+
+    def _answer(self, components, question, docs):
+        retrieval_seconds = 0.0
+        with request_options(priority=self.priority):
+            if self._rag(components):
+                # Retrieval that runs per question (query expansion) is timed as retrieval, not generation
+                start = time.perf_counter()
+                if docs is None:
+                    docs = components.fusion_retriever.invoke(question)
+                if components.docstore:
+                    docs = components.docstore.expand(docs)
+                retrieval_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            response = components.llm.invoke(components.assembler.build(question, docs))
+        usage = response.usage_metadata or {}
+        return {
+            "answer": response.content,
+            "sources": _sources(docs),
+            "retrieval_seconds": retrieval_seconds,
+            "generation_seconds": round(time.perf_counter() - start, 4),
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+        }
+
+    def run(self, input_path, output_path, resume=True):
+        """Answer every question of `input_path` not yet in `output_path` and return run statistics."""
+        # The whole run uses one set of components, even if the config is reloaded meanwhile
+        components = self.pipeline.acquire_components()
+        try:
+            return self._run(components, input_path, output_path, resume)
+        finally:
+            self.pipeline.release_components(components)
+
+    def _run(self, components, input_path, output_path, resume):
+        if components.chain is None:
+            raise RuntimeError("Chat system not properly initialized")
+        items = read_questions(input_path)
+        completed = load_completed(output_path) if resume else set()
+        groups = OrderedDict()  # normalized question -> [(id, question)], answered once
+        for item_id, question in items:
+            if item_id not in completed:
+                groups.setdefault(normalize_question(question), []).append((item_id, question))
+        stats = {
+            "questions": len(items),
+            "resumed": sum(1 for item_id, _ in items if item_id in completed),
+            "unique": len(groups),
+            "answered": 0,
+            "failed": 0,
+        }
+
+        start = time.perf_counter()
+        keys = list(groups)
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="batch-generate")
+        pending = {}  # future -> (group, retrieval seconds per question)
+        try:
+            with open(output_path, "a" if resume else "w", encoding="utf-8") as output:
+                for offset in range(0, len(keys), self.batch_size):
+                    batch = [groups[key] for key in keys[offset:offset + self.batch_size]]
+                    questions = [group[0][1] for group in batch]
+                    retrieval_start = time.perf_counter()
+                    try:
+                        results = self._search(components, questions)
+                    except Exception as e:
+                        for group in batch:
+                            self._write(output, group, None, stats, error=e)
+                        continue
+                    # The batched search is attributed evenly to its questions
+                    retrieval_seconds = (time.perf_counter() - retrieval_start) / len(batch)
+                    for group, question, docs in zip(batch, questions, results):
+                        pending[executor.submit(self._answer, components, question, docs)] = (group, retrieval_seconds)
+                    # At most one batch stays queued, so the next batch is retrieved while this one generates
+                    self._drain(pending, output, stats, limit=self.batch_size)
+                    print(f"Answered {stats['answered'] + stats['failed']}/{stats['unique']} unique questions")
+                self._drain(pending, output, stats, limit=0)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        return stats
+
+    def _drain(self, pending, output, stats, limit):
+        while len(pending) > limit:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                group, retrieval_seconds = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self._write(output, group, None, stats, error=e)
+                    continue
+                # The question's share of the batched search, plus any retrieval it ran itself
+                retrieval_seconds += result["retrieval_seconds"]
+                result["retrieval_seconds"] = round(retrieval_seconds, 4)
+                result["latency_seconds"] = round(retrieval_seconds + result["generation_seconds"], 4)
+                self._write(output, group, result, stats)
+
+    @staticmethod
+    def _write(output, group, result, stats, error=None):
+        first_id = group[0][0]
+        for item_id, question in group:
+            record = {"id": item_id, "question": question}
+            if error is not None:
+                record["error"] = str(error)
+            else:
+                record.update(result)
+                if item_id != first_id:
+                    record["duplicate_of"] = first_id
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # Flushed per answer, so an interruption loses at most the answers still in flight
+        output.flush()
+        stats["failed" if error is not None else "answered"] += 1
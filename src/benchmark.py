@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+
+import yaml
+
+from benchmarks import StubProvider
+from benchmarks.scenarios import SCENARIOS, run_scenarios
+from config_manager import ConfigManager
+from llm_factory import LLMFactory
+
+RESULTS_DIR = "benchmark_results"
+
+
+def build_config(workdir, args):
+    return {
+        "mode": "stub",
+        "model_name": "stub-chat",
+        "embedding_model_provider": "stub",
+        "embedding_model": "stub-embed",
+        "providers": {
+            "stub": {
+                "first_token_latency": args.first_token_latency,
+                "tokens_per_second": args.tokens_per_second,
+                "answer_tokens": args.answer_tokens,
+                "embedding_latency": args.embedding_latency,
+                "embedding_per_text_latency": args.embedding_per_text_latency,
+            }
+        },
+        "api_keys": {},
+        "chunking_strategies": ["fixed_size"],
+        "chunking_strategies_parameters": {"fixed_size": {"size": 1000, "overlap": 200}},
+        "chroma_path": os.path.join(workdir, "chromadb"),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(previous, current):
+    print(f"\nComparison with {previous.get('commit')} ({previous.get('timestamp')}):")
+    for scenario, metrics in current["results"].items():
+        old_metrics = previous.get("results", {}).get(scenario)
+        if not old_metrics:
+            continue
+        print(f"  {scenario}:")
+        for key, value in metrics.items():
+            old_value = old_metrics.get(key)
+            if isinstance(value, (int, float)) and isinstance(old_value, (int, float)) and old_value:
+                change = (value - old_value) / old_value * 100
+                print(f"    {key}: {old_value} -> {value} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite against stub providers.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--files", type=int, default=60, help="Number of synthetic corpus files")
+    parser.add_argument("--queries", type=int, default=50, help="Number of queries for the latency scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent queries for the latency scenario")
+    parser.add_argument("--first-token-latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--answer-tokens", type=int, default=64)
+    parser.add_argument("--embedding-latency", type=float, default=0.01)
+    parser.add_argument("--embedding-per-text-latency", type=float, default=0.001)
+    parser.add_argument("--output-dir", default=RESULTS_DIR, help="Directory where result files are written")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    args = parser.parse_args()
+
+    LLMFactory._providers["stub"] = StubProvider
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-") as workdir:
+        config = build_config(workdir, args)
+        config_path = os.path.join(workdir, "config.yml")
+        with open(config_path, "w") as f:
+            yaml.safe_dump(config, f)
+        ConfigManager(config_path)
+
+        results = run_scenarios(
+            config,
+            workdir,
+            args.scenario or SCENARIOS,
+            num_files=args.files,
+            num_queries=args.queries,
+            concurrency=args.concurrency,
+        )
+
+    commit = git_commit()
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    report = {
+        "commit": commit,
+        "timestamp": timestamp,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": vars(args),
+        "results": results,
+    }
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, f"{timestamp}-{commit}.json")
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"\nResults saved to {output_path}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from .stub_providers import StubChatModel, StubEmbeddings, StubProvider
+
+__all__ = ["StubChatModel", "StubEmbeddings", "StubProvider"]
@@ -0,0 +1,142 @@
+import os
+import random
+from typing import List
+
+_TOPICS = [
+    "storage", "networking", "scheduling", "caching", "indexing", "replication",
+    "compression", "monitoring", "authentication", "billing", "deployment", "testing",
+]
+
+_WORDS = (
+    "system service request response latency throughput queue worker cluster node "
+    "disk memory cache index shard replica leader follower batch stream record "
+    "schema table column query plan budget limit timeout retry backoff error "
+    "metric alert dashboard owner team release version rollout config policy"
+).split()
+
+
+def _sentence(rng: random.Random, topic: str) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 18))]
+    words.insert(rng.randint(0, len(words)), topic)
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraphs(rng: random.Random, topic: str, count: int) -> List[str]:
+    return [" ".join(_sentence(rng, topic) for _ in range(rng.randint(3, 6))) for _ in range(count)]
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int = 90) -> List[str]:
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + len(word) + 1 > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def write_pdf(path: str, pages: List[List[str]]):
+    """Write a minimal text-only PDF with one page per entry in `pages`."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        body = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        for line in lines:
+            body.append(f"({_pdf_escape(line)}) Tj T*")
+        body.append("ET")
+        stream = "\n".join(body).encode("latin-1", "replace")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream.decode('latin-1')}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1", "replace")
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def _write_file(path: str, rng: random.Random, topic: str, paragraphs: int):
+    extension = os.path.splitext(path)[1]
+    content = _paragraphs(rng, topic, paragraphs)
+    if extension == ".pdf":
+        pages = [_wrap(content[i]) + _wrap(content[i + 1]) if i + 1 < len(content) else _wrap(content[i])
+                 for i in range(0, len(content), 2)]
+        write_pdf(path, pages)
+    elif extension == ".md":
+        with open(path, "w") as f:
+            f.write(f"# {topic.title()}\n\n")
+            for i, paragraph in enumerate(content):
+                f.write(f"## Section {i + 1}\n\n{paragraph}\n\n")
+    else:
+        with open(path, "w") as f:
+            f.write("\n\n".join(content) + "\n")
+
+
+def generate_corpus(root: str, num_files: int = 60, formats=("pdf", "md", "txt"), paragraphs_per_file: int = 8, seed: int = 42) -> List[str]:
+    """Generate a deterministic synthetic corpus under `root` and return the file paths."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(num_files):
+        topic = _TOPICS[i % len(_TOPICS)]
+        extension = formats[i % len(formats)]
+        directory = os.path.join(root, topic)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"doc_{i:05d}.{extension}")
+        _write_file(path, rng, topic, paragraphs_per_file)
+        paths.append(path)
+    return paths
+
+
+def modify_corpus(paths: List[str], fraction: float = 0.1, touch_fraction: float = 0.1, seed: int = 7, paragraphs_per_file: int = 8):
+    """
+    Rewrite the content of a fraction of the files and only touch (bump the mtime of) another fraction.
+    Returns (modified, touched) path lists.
+    """
+    rng = random.Random(seed)
+    shuffled = sorted(paths)
+    rng.shuffle(shuffled)
+    modified_count = int(len(shuffled) * fraction)
+    touched_count = int(len(shuffled) * touch_fraction)
+    modified = shuffled[:modified_count]
+    touched = shuffled[modified_count:modified_count + touched_count]
+
+    for path in modified:
+        topic = os.path.basename(os.path.dirname(path))
+        _write_file(path, rng, topic, paragraphs_per_file)
+    for path in touched:
+        os.utime(path, None)
+    return modified, touched
+
+
+def generate_queries(num_queries: int = 50, seed: int = 11) -> List[str]:
+    """Generate deterministic questions about the synthetic corpus topics."""
+    rng = random.Random(seed)
+    templates = [
+        "How does {topic} handle {word}?",
+        "What is the {word} limit for {topic}?",
+        "Describe the {topic} {word} policy.",
+        "Why does {topic} report {word} errors?",
+    ]
+    return [rng.choice(templates).format(topic=rng.choice(_TOPICS), word=rng.choice(_WORDS)) for _ in range(num_queries)]
@@ -0,0 +1,181 @@
+import os
+import shutil
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import generate_corpus, generate_queries, modify_corpus
+from chunk_spool import peak_rss_mb
+from document_processor import DocumentProcessor
+from rag_pipeline import RAGPipeline
+from vector_store_factory import VectorStoreFactory
+
+
+def rss_high_water_mb():
+    """Peak resident set size of this process in MB, or None where unsupported."""
+    return peak_rss_mb()
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _count_chunks(vector_store):
+    return VectorStoreFactory.count(vector_store) if vector_store else 0
+
+
+def _fresh_store(config):
+    shutil.rmtree(config["chroma_path"], ignore_errors=True)
+
+
+def run_ingestion(config, corpus_files):
+    _fresh_store(config)
+    start = time.perf_counter()
+    processor = DocumentProcessor(config)
+    elapsed = time.perf_counter() - start
+    chunks = _count_chunks(processor.get_vector_store())
+    return {
+        "files": len(corpus_files),
+        "chunks": chunks,
+        "seconds": round(elapsed, 4),
+        "files_per_second": round(len(corpus_files) / elapsed, 2) if elapsed else None,
+        "chunks_per_second": round(chunks / elapsed, 2) if elapsed else None,
+        "rss_high_water_mb": rss_high_water_mb(),
+    }
+
+
+def run_incremental_reingest(config, corpus_files, fraction=0.1, touch_fraction=0.1):
+    # Make sure the store reflects the unmodified corpus before measuring
+    DocumentProcessor(config)
+    modified, touched = modify_corpus(corpus_files, fraction=fraction, touch_fraction=touch_fraction)
+
+    start = time.perf_counter()
+    processor = DocumentProcessor(config)
+    elapsed = time.perf_counter() - start
+    return {
+        "files": len(corpus_files),
+        "modified_files": len(modified),
+        "touched_files": len(touched),
+        "chunks": _count_chunks(processor.get_vector_store()),
+        "seconds": round(elapsed, 4),
+        "rss_high_water_mb": rss_high_water_mb(),
+    }
+
+
+def run_query_latency(config, num_queries=50, concurrency=4):
+    pipeline = RAGPipeline(config)
+    pipeline.setup()
+    queries = generate_queries(num_queries)
+
+    def timed(indexed_query):
+        index, query = indexed_query
+        start = time.perf_counter()
+        # One session per query keeps every query a stateless first turn
+        pipeline.process_input(query, session_id=f"bench-{index}")
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, enumerate(queries)))
+    wall = time.perf_counter() - start
+
+    return {
+        "queries": num_queries,
+        "concurrency": concurrency,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "queries_per_second": round(num_queries / wall, 2) if wall else None,
+        "rss_high_water_mb": rss_high_water_mb(),
+    }
+
+
+def _traced_ingest(config):
+    _fresh_store(config)
+    tracemalloc.start()
+    try:
+        processor = DocumentProcessor(config)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / (1024 * 1024), 2), processor.get_ingest_stats()
+
+
+def run_memory(config, corpus_files, bounded_memory_limit_mb=64):
+    # RSS only ever grows within a process, so the unbounded and bounded runs are compared by traced Python peaks
+    python_peak, _ = _traced_ingest(config)
+    bounded_config = dict(config, ingestion=dict(config.get("ingestion") or {}, memory_limit_mb=bounded_memory_limit_mb))
+    bounded_peak, bounded_stats = _traced_ingest(bounded_config)
+    return {
+        "files": len(corpus_files),
+        "python_peak_mb": python_peak,
+        "bounded_memory_limit_mb": bounded_memory_limit_mb,
+        "bounded_python_peak_mb": bounded_peak,
+        "bounded_spilled_chunks": bounded_stats.get("spilled_chunks"),
+        "rss_high_water_mb": rss_high_water_mb(),
+    }
+
+
+def run_vector_store(config, num_queries=50, backends=("chroma", "numpy")):
+    """Compare vector store backends on load time and search throughput, excluding embedding latency."""
+    queries = generate_queries(num_queries)
+    results = {}
+    for backend in backends:
+        backend_config = dict(config, vector_store=dict(config.get("vector_store") or {}, backend=backend))
+        _fresh_store(backend_config)
+        processor = DocumentProcessor(backend_config)
+        query_vectors = [processor.get_embeddings().embed_query(query) for query in queries]
+        del processor
+
+        start = time.perf_counter()
+        vector_store = VectorStoreFactory.create_vector_store(backend_config)
+        load_seconds = time.perf_counter() - start
+
+        latencies = []
+        start = time.perf_counter()
+        for vector in query_vectors:
+            query_start = time.perf_counter()
+            vector_store.similarity_search_by_vector(vector, k=4)
+            latencies.append(time.perf_counter() - query_start)
+        wall = time.perf_counter() - start
+
+        # Flat keys keep the results comparable across runs with --compare
+        results.update({
+            f"{backend}_chunks": _count_chunks(vector_store),
+            f"{backend}_load_ms": round(load_seconds * 1000, 2),
+            f"{backend}_p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            f"{backend}_p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            f"{backend}_queries_per_second": round(num_queries / wall, 2) if wall else None,
+        })
+    return results
+
+
+SCENARIOS = ["ingestion", "incremental_reingest", "query_latency", "memory", "vector_store"]
+
+
+def run_scenarios(config, workdir, scenarios, num_files=60, num_queries=50, concurrency=4):
+    corpus_dir = os.path.join(workdir, "corpus")
+    shutil.rmtree(corpus_dir, ignore_errors=True)
+    corpus_files = generate_corpus(corpus_dir, num_files=num_files)
+    config["ingest_docs"] = [corpus_dir]
+
+    results = {}
+    for name in scenarios:
+        print(f"Running scenario: {name}")
+        if name == "ingestion":
+            results[name] = run_ingestion(config, corpus_files)
+        elif name == "incremental_reingest":
+            results[name] = run_incremental_reingest(config, corpus_files)
+        elif name == "query_latency":
+            results[name] = run_query_latency(config, num_queries=num_queries, concurrency=concurrency)
+        elif name == "memory":
+            results[name] = run_memory(config, corpus_files)
+        elif name == "vector_store":
+            results[name] = run_vector_store(config, num_queries=num_queries)
+        else:
+            raise ValueError(f"Unknown benchmark scenario: {name}")
+    return results
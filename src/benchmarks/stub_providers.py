@@ -0,0 +1,151 @@
+import hashlib
+import math
+import re
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from llm_providers.base_provider import LLMProvider
+
+_WORD_RE = re.compile(r"\w+")
+
+_VOCABULARY = (
+    "the document describes a process for handling requests and the result depends on "
+    "configuration values provided by the operator while each component reports its state "
+    "to a central service that stores metrics about latency throughput and errors"
+).split()
+
+
+def _stable_hash(text: str) -> int:
+    return int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:8], "big")
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Deterministic stand-in chat model.
+    The answer is derived from a hash of the prompt and streamed with simulated latency.
+    """
+
+    first_token_latency: float = 0.05
+    tokens_per_second: float = 50.0
+    answer_tokens: int = 64
+    streaming: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def _answer_tokens(self, messages: List[BaseMessage]) -> List[str]:
+        prompt = "".join(str(message.content) for message in messages)
+        seed = _stable_hash(prompt)
+        tokens = []
+        for i in range(self.answer_tokens):
+            word = _VOCABULARY[(seed + i * 2654435761) % len(_VOCABULARY)]
+            tokens.append(word if i == 0 else " " + word)
+        return tokens
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        prompt_tokens = sum(len(_WORD_RE.findall(str(message.content))) for message in messages)
+        tokens = self._answer_tokens(messages)
+        token_delay = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+        time.sleep(self.first_token_latency)
+        for i, token in enumerate(tokens):
+            if i and token_delay:
+                time.sleep(token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="",
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": len(tokens),
+                "total_tokens": prompt_tokens + len(tokens),
+            },
+        ))
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text = ""
+        usage = None
+        for chunk in self._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            text += chunk.text
+            usage = chunk.message.usage_metadata or usage
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+
+class StubEmbeddings(Embeddings):
+    """
+    Deterministic hashed bag-of-words embeddings.
+    Texts sharing words get similar vectors, so retrieval results are meaningful and reproducible.
+    """
+
+    def __init__(self, dimensions: int = 256, latency: float = 0.01, per_text_latency: float = 0.001):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.per_text_latency = per_text_latency
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in _WORD_RE.findall(text.lower()):
+            h = _stable_hash(word)
+            vector[h % self.dimensions] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency + self.per_text_latency * len(texts))
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency + self.per_text_latency)
+        return self._embed(text)
+
+
+class StubProvider(LLMProvider):
+    """
+    Offline provider used by the benchmark suite.
+    Latency and token rates are read from the `providers.stub` section of the config.
+    """
+
+    def _settings(self):
+        return self.config_manager.get_config().get("providers", {}).get("stub", {}) or {}
+
+    def create_llm(self):
+        settings = self._settings()
+        return StubChatModel(
+            first_token_latency=settings.get("first_token_latency", 0.05),
+            tokens_per_second=settings.get("tokens_per_second", 50.0),
+            answer_tokens=settings.get("answer_tokens", 64),
+            callbacks=self.callbacks,
+        )
+
+    def create_embeddings(self):
+        settings = self._settings()
+        return StubEmbeddings(
+            dimensions=settings.get("embedding_dimensions", 256),
+            latency=settings.get("embedding_latency", 0.01),
+            per_text_latency=settings.get("embedding_per_text_latency", 0.001),
+        )
+
+    def get_available_models(self) -> List[str]:
+        return ["stub-chat", "stub-embed"]
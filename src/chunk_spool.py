@@ -0,0 +1,131 @@
+import json
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from typing import Iterator, List, Optional
+from langchain.docstore.document import Document
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_HEADER = struct.Struct("<I")
+# Rough per-chunk overhead of the Document, its metadata dict and the str headers
+_CHUNK_OVERHEAD = 512
+# Checking RSS reads /proc, so it is only sampled every this many appends
+_RSS_CHECK_INTERVAL = 64
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Peak resident set size in MB of this process, or of its largest terminated child, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size in MB, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class ChunkSpool:
+    """
+    Ordered buffer of chunks that keeps at most `buffer_bytes` of them in memory.
+    Beyond that, or whenever the process RSS exceeds `rss_limit_mb`, buffered chunks are spilled to a
+    temporary file as length-prefixed, zlib-compressed JSON records and read back in batches.
+    Callers should feed it a page at a time and drain it when `over_rss_limit()` reports memory pressure.
+    """
+
+    def __init__(self, buffer_bytes: int, rss_limit_mb: Optional[float] = None, directory: Optional[str] = None):
+        self.buffer_bytes = buffer_bytes
+        self.rss_limit_mb = rss_limit_mb
+        self.directory = directory
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._file = None
+        self._spilled = 0
+        self._appends = 0
+        self.total_spilled = 0
+
+    def __len__(self):
+        return self._spilled + len(self._buffer)
+
+    def extend(self, chunks: List[Document]):
+        for chunk in chunks:
+            self.append(chunk)
+
+    def append(self, chunk: Document):
+        self._buffer.append(chunk)
+        self._buffered_bytes += len(chunk.page_content) + _CHUNK_OVERHEAD
+        self._appends += 1
+        if self._buffered_bytes > self.buffer_bytes or self._over_rss_limit():
+            self.spill()
+
+    def _over_rss_limit(self) -> bool:
+        if self._appends % _RSS_CHECK_INTERVAL:
+            return False
+        return self.over_rss_limit()
+
+    def over_rss_limit(self) -> bool:
+        """Whether the process RSS currently exceeds `rss_limit_mb`."""
+        if not self.rss_limit_mb:
+            return False
+        rss = current_rss_mb()
+        return rss is not None and rss > self.rss_limit_mb
+
+    def spill(self):
+        """Move all buffered chunks to disk, after any chunks spilled before them."""
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="rag-chunks-", dir=self.directory)
+        self._file.seek(0, os.SEEK_END)
+        for chunk in self._buffer:
+            record = zlib.compress(json.dumps([chunk.page_content, chunk.metadata]).encode("utf-8"))
+            self._file.write(_HEADER.pack(len(record)))
+            self._file.write(record)
+        self._spilled += len(self._buffer)
+        self.total_spilled += len(self._buffer)
+        self._buffer = []
+        self._buffered_bytes = 0
+
+    def batches(self, batch_size: int) -> Iterator[List[Document]]:
+        """Yield all chunks in insertion order, at most `batch_size` at a time, and empty the spool."""
+        batch = []
+        if self._file is not None:
+            self._file.flush()
+            self._file.seek(0)
+            for _ in range(self._spilled):
+                (length,) = _HEADER.unpack(self._file.read(_HEADER.size))
+                page_content, metadata = json.loads(zlib.decompress(self._file.read(length)))
+                batch.append(Document(page_content=page_content, metadata=metadata))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        buffered, self._buffer = self._buffer, []
+        for chunk in buffered:
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+        self.clear()
+
+    def clear(self):
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._spilled = 0
+        if self._file is not None:
+            self._file.close()
+            self._file = None
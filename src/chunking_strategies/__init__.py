@@ -4,5 +4,6 @@ from .sliding_window_chunking import SlidingWindowChunking
 from .sentence_based_chunking import SentenceBasedChunking
 from .paragraph_based_chunking import ParagraphBasedChunking
 from .page_based_chunking import PageBasedChunking
+from .hierarchical_chunking import HierarchicalChunking
 
-__all__ = ["BaseChunkingStrategy", "FixedSizeChunking", "SlidingWindowChunking", "SentenceBasedChunking", "ParagraphBasedChunking", "PageBasedChunking"]
+__all__ = ["BaseChunkingStrategy", "FixedSizeChunking", "SlidingWindowChunking", "SentenceBasedChunking", "ParagraphBasedChunking", "PageBasedChunking", "HierarchicalChunking"]
@@ -0,0 +1,52 @@
+import hashlib
+from typing import List, Dict, Any, Tuple
+from langchain.docstore.document import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from .base_strategy import BaseChunkingStrategy
+
+class HierarchicalChunking(BaseChunkingStrategy):
+    """
+    Embeds small child chunks for precise matching and keeps their parent sections for context.
+    Each child records its parent in the `parent_id` metadata; parents go to a docstore instead of the vector store.
+    With `parent_size` set to 0, parents are the loaded pages or sections as-is.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.parent_size = config.get("parent_size", 2000)
+        self.parent_overlap = config.get("parent_overlap", 0)
+        self.child_size = config.get("child_size", 400)
+        self.child_overlap = config.get("child_overlap", 50)
+        if not self.child_size:
+            raise ValueError("HierarchicalChunking requires a positive 'child_size'.")
+        if self.parent_size and self.child_size >= self.parent_size:
+            raise ValueError("HierarchicalChunking requires 'child_size' to be smaller than 'parent_size'.")
+
+    def split_with_parents(self, documents: List[Document], counts: Dict[str, int] = None) -> Tuple[List[Document], List[Tuple[str, Document]]]:
+        """
+        Return (child chunks, [(parent_id, parent)]); parent IDs are deterministic per source.
+        Pass the same `counts` dict when a source is split one page at a time, so its parent IDs keep counting up.
+        """
+        if self.parent_size:
+            parent_splitter = RecursiveCharacterTextSplitter(chunk_size=self.parent_size, chunk_overlap=self.parent_overlap)
+            parents = parent_splitter.split_documents(documents)
+        else:
+            parents = documents
+        child_splitter = RecursiveCharacterTextSplitter(chunk_size=self.child_size, chunk_overlap=self.child_overlap)
+
+        children = []
+        identified_parents = []
+        counts = {} if counts is None else counts
+        for parent in parents:
+            source = str(parent.metadata.get("source", ""))
+            index = counts.get(source, 0)
+            counts[source] = index + 1
+            parent_id = f"{hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]}-p{index}"
+            identified_parents.append((parent_id, parent))
+            for child in child_splitter.split_documents([parent]):
+                child.metadata["parent_id"] = parent_id
+                children.append(child)
+        return children, identified_parents
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        return self.split_with_parents(documents)[0]
@@ -5,6 +5,7 @@ from chunking_strategies import (
     SentenceBasedChunking,
     ParagraphBasedChunking,
     PageBasedChunking,
+    HierarchicalChunking,
 )
 
 class ChunkingStrategyFactory:
@@ -14,6 +15,7 @@ class ChunkingStrategyFactory:
         "sentence_based": SentenceBasedChunking,
         "paragraph_based": ParagraphBasedChunking,
         "page_based": PageBasedChunking,
+        "hierarchical": HierarchicalChunking,
     }
 
     @staticmethod
@@ -1,32 +1,178 @@
+import copy
+import hashlib
+import threading
 import yaml
 import os
+from collections import namedtuple
+
+DEFAULT_CONFIG_PATH = "config/config.yml"
+
+# An immutable view of one load of a config file; `changed` lists the top-level sections that differ from the previous version
+ConfigSnapshot = namedtuple("ConfigSnapshot", ["version", "config", "digest", "mtime", "size", "changed"])
+
+def endpoint_urls(provider_config):
+    """Return the endpoint pool of a provider section, which may set `url` or `urls` to a string or a list."""
+    provider_config = provider_config or {}
+    urls = provider_config.get("urls") or provider_config.get("url") or []
+    if isinstance(urls, str):
+        urls = [urls]
+    return [url.rstrip("/") for url in urls if url]
+
+def changed_sections(old_config, new_config):
+    """Return the top-level keys whose values differ between two configs."""
+    old_config = old_config or {}
+    new_config = new_config or {}
+    return frozenset(key for key in set(old_config) | set(new_config) if old_config.get(key) != new_config.get(key))
 
 class ConfigManager:
-    _instance = None
-    _config = None
+    """
+    Holds the configuration loaded from a YAML file as versioned snapshots.
+    There is one instance per config file; the first one created is the default returned by `ConfigManager()`.
+    `reload()` swaps in a new snapshot atomically, so readers see either the old or the new config but never a mix,
+    and notifies subscribers with the previous and the new snapshot.
+    """
+
+    _instances = {}
+    _default = None
+    _instances_lock = threading.Lock()
 
-    def __new__(cls, config_path="config/config.yml"):
-        if cls._instance is None:
-            cls._instance = super(ConfigManager, cls).__new__(cls)
-            cls._instance._load_config(config_path)
-        return cls._instance
+    def __new__(cls, config_path=None):
+        with cls._instances_lock:
+            if config_path is None:
+                if cls._default is not None:
+                    return cls._default
+                config_path = DEFAULT_CONFIG_PATH
+            key = os.path.abspath(config_path)
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = super(ConfigManager, cls).__new__(cls)
+                instance._init(config_path)
+                cls._instances[key] = instance
+                if cls._default is None:
+                    cls._default = instance
+            return instance
+
+    def _init(self, config_path):
+        self.config_path = config_path
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._watch_thread = None
+        self._watch_stop = threading.Event()
+        self._snapshot = None
+        self._load_config(config_path)
 
     def _load_config(self, config_path):
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"Configuration file not found at {config_path}")
-        with open(config_path, 'r') as f:
-            ConfigManager._config = yaml.safe_load(f)
+        self._snapshot = self._read_snapshot(None)
         print(f"Loaded configuration from {config_path}")
 
+    def _read_snapshot(self, previous):
+        stat = os.stat(self.config_path)
+        with open(self.config_path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if previous is not None and digest == previous.digest:
+            # Touched but unchanged: keep the snapshot, only remember the new stat
+            return previous._replace(mtime=stat.st_mtime, size=stat.st_size)
+        config = yaml.safe_load(data) or {}
+        if previous is None:
+            return ConfigSnapshot(1, config, digest, stat.st_mtime, stat.st_size, frozenset(config))
+        return ConfigSnapshot(previous.version + 1, config, digest, stat.st_mtime, stat.st_size,
+                              changed_sections(previous.config, config))
+
+    def reload(self):
+        """
+        Re-read the config file. Returns the new snapshot, or None if the content did not change.
+        An unreadable or invalid file keeps the current snapshot.
+        """
+        with self._lock:
+            previous = self._snapshot
+            try:
+                snapshot = self._read_snapshot(previous)
+            except (OSError, yaml.YAMLError) as e:
+                print(f"Warning: Could not reload configuration from {self.config_path}, keeping version {previous.version}: {e}")
+                try:
+                    # Not retried until the file changes again
+                    stat = os.stat(self.config_path)
+                    self._snapshot = previous._replace(mtime=stat.st_mtime, size=stat.st_size)
+                except OSError:
+                    pass
+                return None
+            self._snapshot = snapshot
+            if snapshot.version == previous.version:
+                return None
+            subscribers = list(self._subscribers)
+        print(f"Reloaded configuration from {self.config_path} (version {snapshot.version}, changed: {', '.join(sorted(snapshot.changed)) or 'none'})")
+        for callback in subscribers:
+            try:
+                callback(previous, snapshot)
+            except Exception as e:
+                print(f"Warning: Configuration subscriber failed: {e}")
+        return snapshot
+
+    def check_for_changes(self):
+        """Reload if the file's mtime or size changed since the last load. Cheap enough to call on every request."""
+        snapshot = self._snapshot
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        if stat.st_mtime == snapshot.mtime and stat.st_size == snapshot.size:
+            return None
+        return self.reload()
+
+    def start_watching(self, interval=2.0):
+        """Poll the config file for changes in a background thread."""
+        if self._watch_thread:
+            return
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(target=self._watch_loop, args=(interval,), name="config-watch", daemon=True)
+        self._watch_thread.start()
+
+    def stop_watching(self):
+        self._watch_stop.set()
+        if self._watch_thread:
+            self._watch_thread.join()
+            self._watch_thread = None
+
+    def _watch_loop(self, interval):
+        while not self._watch_stop.wait(interval):
+            self.check_for_changes()
+
+    def subscribe(self, callback):
+        """Register `callback(previous, snapshot)`, called after every reload that changed the config, in subscription order."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def get_snapshot(self):
+        return self._snapshot
+
+    def get_version(self):
+        return self._snapshot.version
+
     def get_config(self):
-        return ConfigManager._config
+        # A copy, so callers adding their own keys cannot alter the shared snapshot
+        return copy.deepcopy(self._snapshot.config)
 
     def get_provider_url(self, provider_name):
-        return ConfigManager._config.get("providers", {}).get(provider_name, {}).get("url")
+        urls = self.get_provider_urls(provider_name)
+        return urls[0] if urls else None
+
+    def get_provider_urls(self, provider_name):
+        return endpoint_urls(self.get_provider_config(provider_name))
+
+    def get_provider_config(self, provider_name):
+        return (self._snapshot.config.get("providers") or {}).get(provider_name) or {}
 
 
     def get_api_key(self, key_name):
-        return ConfigManager._config.get("api_keys", {}).get(key_name)
+        return (self._snapshot.config.get("api_keys") or {}).get(key_name)
 
     def get_embedding_config(self):
-        return ConfigManager._config.get("embedding", {})
+        return self._snapshot.config.get("embedding", {})
@@ -0,0 +1,229 @@
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from langchain.prompts import PromptTemplate
+
+_COMPRESS_THRESHOLD = 256
+_SEPARATOR = "\x1f"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for budgeting."""
+    return (len(text) + 3) // 4
+
+
+def _pack(question: str, answer: str):
+    text = question + _SEPARATOR + answer
+    if len(text) < _COMPRESS_THRESHOLD:
+        return text
+    return zlib.compress(text.encode("utf-8"))
+
+
+def _unpack(packed):
+    if isinstance(packed, bytes):
+        packed = zlib.decompress(packed).decode("utf-8")
+    question, _, answer = packed.partition(_SEPARATOR)
+    return question, answer
+
+
+def _clip_tokens(text: str, budget: int) -> str:
+    """Keep the most recent part of `text` that fits in `budget` tokens."""
+    max_chars = budget * 4
+    if len(text) <= max_chars:
+        return text
+    return "..." + text[-(max_chars - 3):]
+
+
+class ConversationState:
+    __slots__ = ("summary", "turns", "turn_tokens", "last_active", "version")
+
+    def __init__(self):
+        self.summary = ""
+        self.turns = []  # packed (question, answer) pairs, oldest first
+        self.turn_tokens = []
+        self.last_active = time.monotonic()
+        self.version = 0  # incremented on every turn, so cached work derived from the history can be invalidated
+
+
+class ConversationMemory:
+    """
+    Per-session conversation state with a hard token budget for the history.
+    Older turns are folded into a rolling summary once the budget is exceeded,
+    and sessions are evicted least-recently-used beyond `max_sessions` or after `session_ttl` seconds.
+    """
+
+    def __init__(self, history_token_budget: int = 1000, summary_token_budget: int = 300,
+                 max_sessions: int = 1000, session_ttl: float = 3600, condense_questions: bool = True):
+        self.history_token_budget = history_token_budget
+        self.summary_token_budget = min(summary_token_budget, history_token_budget)
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.condense_questions = condense_questions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        conversation_config = config.get("conversation") or {}
+        return cls(
+            history_token_budget=conversation_config.get("history_token_budget", 1000),
+            summary_token_budget=conversation_config.get("summary_token_budget", 300),
+            max_sessions=conversation_config.get("max_sessions", 1000),
+            session_ttl=conversation_config.get("session_ttl", 3600),
+            condense_questions=conversation_config.get("condense_questions", True),
+        )
+
+    def configure(self, config):
+        """Apply the budgets and limits of a new `conversation` section, keeping the existing sessions."""
+        settings = ConversationMemory.from_config(config)
+        with self._lock:
+            self.history_token_budget = settings.history_token_budget
+            self.summary_token_budget = settings.summary_token_budget
+            self.max_sessions = settings.max_sessions
+            self.session_ttl = settings.session_ttl
+            self.condense_questions = settings.condense_questions
+
+    def _evict(self, now):
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        if self.session_ttl:
+            while self._sessions:
+                session_id, state = next(iter(self._sessions.items()))
+                if now - state.last_active < self.session_ttl:
+                    break
+                del self._sessions[session_id]
+
+    def _get_state(self, session_id, create=False):
+        now = time.monotonic()
+        state = self._sessions.get(session_id)
+        if state is None:
+            if not create:
+                return None
+            state = ConversationState()
+            self._sessions[session_id] = state
+        else:
+            self._sessions.move_to_end(session_id)
+        state.last_active = now
+        self._evict(now)
+        return state
+
+    def get_history(self, session_id) -> str:
+        """Return the summary and recent turns of a session, formatted for a prompt."""
+        with self._lock:
+            state = self._get_state(session_id)
+            if state is None:
+                return ""
+            summary = state.summary
+            turns = [_unpack(packed) for packed in state.turns]
+
+        lines = []
+        if summary:
+            lines.append(f"Summary of earlier conversation: {summary}")
+        for question, answer in turns:
+            lines.append(f"User: {question}")
+            lines.append(f"Assistant: {answer}")
+        return "\n".join(lines)
+
+    def get_last_turn(self, session_id):
+        """Return the most recent (question, answer) of a session, or None."""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None or not state.turns:
+                return None
+            packed = state.turns[-1]
+        return _unpack(packed)
+
+    def get_version(self, session_id) -> int:
+        with self._lock:
+            state = self._sessions.get(session_id)
+            return state.version if state else 0
+
+    def condense_question(self, session_id, question: str, llm) -> str:
+        """Rewrite a follow-up question into a standalone question suitable for retrieval."""
+        if not self.condense_questions:
+            return question
+        history = self.get_history(session_id)
+        if not history:
+            return question
+        prompt = PromptTemplate(
+            template=(
+                "Given the following conversation and a follow-up question, rephrase the follow-up "
+                "question to be a standalone question. Reply with the question only.\n\n"
+                "Conversation:\n{history}\n\n"
+                "Follow-up question: {question}\n\n"
+                "Standalone question:"
+            ),
+            input_variables=["history", "question"],
+        )
+        try:
+            response = (prompt | llm).invoke({"history": history, "question": question})
+        except Exception as e:
+            print(f"Warning: Could not condense follow-up question: {e}")
+            return question
+        condensed = getattr(response, "content", response).strip()
+        return condensed or question
+
+    def add_turn(self, session_id, question: str, answer: str, llm=None):
+        """Record a turn and fold the oldest turns into the summary while over budget."""
+        with self._lock:
+            state = self._get_state(session_id, create=True)
+            state.version += 1
+            state.turns.append(_pack(question, answer))
+            state.turn_tokens.append(estimate_tokens(question) + estimate_tokens(answer))
+
+            overflow = []
+            budget = self.history_token_budget - estimate_tokens(state.summary)
+            while state.turns and sum(state.turn_tokens) > budget:
+                overflow.append(_unpack(state.turns.pop(0)))
+                state.turn_tokens.pop(0)
+            previous_summary = state.summary
+
+        if not overflow:
+            return
+
+        summary = self._summarize(previous_summary, overflow, llm)
+        with self._lock:
+            state = self._get_state(session_id, create=True)
+            state.summary = _clip_tokens(summary, self.summary_token_budget)
+            # The new summary may be longer than the old one, so re-check the budget
+            budget = self.history_token_budget - estimate_tokens(state.summary)
+            while state.turns and sum(state.turn_tokens) > budget:
+                state.turns.pop(0)
+                state.turn_tokens.pop(0)
+
+    def _summarize(self, summary: str, turns, llm) -> str:
+        transcript = "\n".join(f"User: {question}\nAssistant: {answer}" for question, answer in turns)
+        if llm is None:
+            return f"{summary}\n{transcript}".strip()
+        prompt = PromptTemplate(
+            template=(
+                "Progressively summarize the conversation, adding to the previous summary. "
+                "Keep it under {max_words} words.\n\n"
+                "Previous summary:\n{summary}\n\n"
+                "New lines of conversation:\n{transcript}\n\n"
+                "New summary:"
+            ),
+            input_variables=["summary", "transcript", "max_words"],
+        )
+        try:
+            response = (prompt | llm).invoke({
+                "summary": summary or "(none)",
+                "transcript": transcript,
+                "max_words": self.summary_token_budget * 3 // 4,
+            })
+            return getattr(response, "content", response).strip()
+        except Exception as e:
+            print(f"Warning: Could not summarize conversation history: {e}")
+            return f"{summary}\n{transcript}".strip()
+
+    def clear(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "turns": sum(len(state.turns) for state in self._sessions.values()),
+            }
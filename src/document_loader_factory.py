@@ -0,0 +1,40 @@
+import os
+from langchain_community.document_loaders import (
+    CSVLoader,
+    Docx2txtLoader,
+    PyPDFLoader,
+    TextLoader,
+    UnstructuredHTMLLoader,
+    UnstructuredMarkdownLoader,
+)
+
+class DocumentLoaderFactory:
+    _loaders = {
+        ".pdf": PyPDFLoader,
+        ".md": UnstructuredMarkdownLoader,
+        ".txt": TextLoader,
+        ".html": UnstructuredHTMLLoader,
+        ".htm": UnstructuredHTMLLoader,
+        ".docx": Docx2txtLoader,
+        ".csv": CSVLoader,
+    }
+
+    @staticmethod
+    def get_supported_extensions():
+        """Return the file extensions that have a registered loader."""
+        return list(DocumentLoaderFactory._loaders.keys())
+
+    @staticmethod
+    def register_loader(extension: str, loader_class):
+        """Register a loader class, constructed with the file path, for an extension such as '.rst'."""
+        if not extension.startswith("."):
+            extension = "." + extension
+        DocumentLoaderFactory._loaders[extension.lower()] = loader_class
+
+    @staticmethod
+    def get_loader_class(file_path: str):
+        extension = os.path.splitext(file_path)[1].lower()
+        loader_class = DocumentLoaderFactory._loaders.get(extension)
+        if not loader_class:
+            raise ValueError(f"Unsupported document type: {extension}")
+        return loader_class
@@ -1,13 +1,38 @@
 import os
 import json
-import glob
-from langchain_community.document_loaders import PyPDFLoader, UnstructuredMarkdownLoader, TextLoader
-from langchain_chroma import Chroma
+import hashlib
 from langchain_ollama import OllamaEmbeddings
 from langchain_openai import OpenAIEmbeddings
 from chunking_strategy_factory import ChunkingStrategyFactory
+from llm_factory import LLMFactory
+from config_manager import endpoint_urls
+from query_embedding_cache import CachedQueryEmbeddings
+from ingest_manifest import IngestManifest, ManifestEntry
+from file_scanner import scan_paths, hash_files, ingest_root, under_root
+from document_loader_factory import DocumentLoaderFactory
+from parallel_loader import ParallelDocumentLoader
+from parent_docstore import ParentDocstore
+from chunk_spool import ChunkSpool, peak_rss_mb
+from vector_store_factory import CHROMA_PATH, VectorStoreFactory
 
-CHROMA_PATH = "chromadb"
+MANIFEST_FILE = "ingest_manifest.sqlite3"
+DOCSTORE_FILE = "parent_docstore.sqlite3"
+
+def config_fingerprint(config):
+    """Hash of the settings that determine the chunks and vectors of a file."""
+    strategies = [name for name in config.get("chunking_strategies", []) if isinstance(name, str)]
+    params = config.get("chunking_strategies_parameters") or {}
+    fingerprint = {
+        "embedding_provider": config.get("embedding_model_provider"),
+        "embedding_model": config.get("embedding_model"),
+        "chunking_strategies": strategies,
+        "chunking_strategies_parameters": {name: params.get(name) for name in strategies},
+    }
+    backend = VectorStoreFactory.get_backend_name(config)
+    if backend != "chroma":
+        # Switching backends re-ingests every file into the new store; Chroma fingerprints predate this key
+        fingerprint["vector_store_backend"] = backend
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode("utf-8")).hexdigest()[:16]
 
 class DocumentProcessor:
     def __init__(self, config):
@@ -17,104 +42,245 @@ class DocumentProcessor:
         self.embedding_model = self.config.get("embedding_model")
         self.providers_config = self.config.get("providers")
         self.api_keys_config = self.config.get("api_keys")
-        self.chroma_path = CHROMA_PATH
-        self.embeddings = self._create_embeddings()
-        self.file_loaders = {
-            ".pdf": PyPDFLoader,
-            ".md": UnstructuredMarkdownLoader,
-            ".txt": TextLoader,
-        }
+        self.chroma_path = self.config.get("chroma_path", CHROMA_PATH)
+        self.embeddings = self._wrap_query_cache(self._create_embeddings())
+        self.manifest = None
+        self.docstore = ParentDocstore(os.path.join(self.chroma_path, DOCSTORE_FILE))
+        self.failures = []
+        self.ingest_stats = {}
         self.vector_store = self._setup_vector_store()
 
     def _setup_vector_store(self):
-        from datetime import datetime
+        fingerprint = self._config_fingerprint()
+        self.manifest = IngestManifest(os.path.join(self.chroma_path, MANIFEST_FILE))
+        self.manifest.migrate_json(os.path.join(self.chroma_path, "doc_metadata.json"), fingerprint)
 
-        metadata_file = os.path.join(self.chroma_path, "doc_metadata.json")
+        backend = VectorStoreFactory.get_backend_name(self.config)
+        if VectorStoreFactory.exists(self.config):
+            print(f"Loading existing {backend} vector store from: {self.chroma_path}")
+        else:
+            print(f"No existing {backend} vector store found. Creating a new one.")
+        vector_store = VectorStoreFactory.create_vector_store(self.config, self.embeddings)
 
-        old_metadata = {}
-        if os.path.exists(metadata_file):
-            try:
-                with open(metadata_file, "r") as f:
-                    old_metadata = json.load(f)
-            except Exception:
-                old_metadata = {}
-
-        if os.path.exists(self.chroma_path) and os.listdir(self.chroma_path):
-            print(f"Loading existing ChromaDB from: {self.chroma_path}")
-            vector_store = Chroma(
-                persist_directory=self.chroma_path,
-                embedding_function=self.embeddings
+        ingestion_config = self.config.get("ingestion") or {}
+        current = {
+            scanned.path: scanned
+            for scanned in scan_paths(
+                self.ingest_docs,
+                extensions=DocumentLoaderFactory.get_supported_extensions(),
+                include=ingestion_config.get("include"),
+                exclude=ingestion_config.get("exclude"),
             )
-        else:
-            print("No existing ChromaDB found. Creating a new one.")
-            vector_store = None
+        }
+        known = self.manifest.get_many(current)
+        quarantined = self.manifest.get_quarantined()
 
-        to_process = []
-        new_metadata = {}
+        candidates = [
+            scanned for path, scanned in current.items()
+            # Files that failed to parse are skipped until they change
+            if quarantined.get(path, (None, None))[:2] != (scanned.size, scanned.mtime)
+            and (path not in known
+            or known[path].size != scanned.size
+            or known[path].mtime != scanned.mtime
+            or known[path].config_fingerprint != fingerprint)
+        ]
+        # Only files whose size or mtime changed are hashed, in parallel
+        hashes = hash_files([scanned.path for scanned in candidates], max_workers=ingestion_config.get("hash_workers", 8))
 
-        for path in self.ingest_docs:
-            path = os.path.expanduser(path)
-            if os.path.isfile(path):
-                files = [path]
-            else:
-                files = []
-                for file_type in self.file_loaders.keys():
-                    files.extend(glob.glob(os.path.join(path, f"**/*{file_type}"), recursive=True))
-            
-            for file in files:
-                mtime = os.path.getmtime(file)
-                new_metadata[file] = mtime
-                if file not in old_metadata or old_metadata[file] != mtime:
-                    to_process.append(file)
-
-        if to_process:
-            print(f"Processing {len(to_process)} new/updated files...")
-            documents = []
-            for file in to_process:
-                file_extension = os.path.splitext(file)[1]
-                loader_class = self.file_loaders.get(file_extension)
-                if loader_class:
-                    loader = loader_class(file)
-                    documents.extend(loader.load())
-
-            all_chunks = []
-            chunking_strategies_config = self.config.get("chunking_strategies", [])
-            all_chunking_strategies_params = self.config.get("chunking_strategies_parameters", {})
-
-            for strategy_name in chunking_strategies_config:
-                if not isinstance(strategy_name, str):
-                    print(f"Warning: Invalid chunking strategy entry: {strategy_name}. Skipping.")
-                    continue
-
-                strategy_specific_config = all_chunking_strategies_params.get(strategy_name, {})
-                
-                try:
-                    strategy = ChunkingStrategyFactory.create_strategy(strategy_name, strategy_specific_config)
-                    chunks = strategy.split_documents(documents)
-                    all_chunks.extend(chunks)
-                    print(f"  - Applied {strategy_name} chunking: {len(chunks)} chunks generated.")
-                except ValueError as e:
-                    print(f"Error applying {strategy_name} chunking: {e}. Skipping this strategy.")
-
-            if vector_store:
-                vector_store.add_documents(all_chunks)
+        to_process = []
+        touched = []
+        for scanned in candidates:
+            entry = known.get(scanned.path)
+            content_hash = hashes.get(scanned.path)
+            if content_hash is None:
+                continue
+            if entry and entry.content_hash == content_hash and entry.config_fingerprint == fingerprint:
+                # Content-identical touch: record the new stat, nothing to re-ingest
+                touched.append(entry._replace(size=scanned.size, mtime=scanned.mtime))
             else:
-                vector_store = Chroma.from_documents(
-                    all_chunks, self.embeddings, persist_directory=self.chroma_path
-                )
+                to_process.append(scanned)
 
-            print("Vector store updated with new documents.")
-        else:
+        if touched:
+            with self.manifest.transaction():
+                for entry in touched:
+                    self.manifest.upsert(entry)
+            print(f"{len(touched)} files were touched without content changes.")
+
+        # Files that disappeared from an ingested directory; entries of other sources are left alone
+        roots = [root for root in map(ingest_root, self.ingest_docs) if root]
+        removed = [
+            entry
+            for root, pattern in roots
+            for entry in self.manifest.entries_under(root)
+            if entry.path not in current and under_root(entry.path, root, pattern)
+        ]
+
+        if not to_process and not removed:
             print("No new or updated files found. Using existing vector store.")
+            return vector_store
+
+        index_version = self.manifest.bump_index_version()
+        print(f"Processing {len(to_process)} new/updated files (index version {index_version})...")
+        strategies = self._create_chunking_strategies()
+        chunk_counts = {name: 0 for name, _ in strategies}
+        loader = ParallelDocumentLoader(
+            max_workers=ingestion_config.get("parse_workers", 4),
+            timeout=ingestion_config.get("parse_timeout", 120),
+            memory_limit_mb=ingestion_config.get("parse_memory_limit_mb"),
+            start_method=ingestion_config.get("start_method", "spawn"),
+        )
+        # With a memory ceiling, chunks beyond a quarter of it are spilled to disk before they are embedded,
+        # and past the ceiling the chunks so far are written out and files are parsed one at a time
+        memory_limit_mb = ingestion_config.get("memory_limit_mb")
+        spool = ChunkSpool(
+            buffer_bytes=memory_limit_mb * 1024 * 1024 // 4 if memory_limit_mb else float("inf"),
+            rss_limit_mb=memory_limit_mb,
+            directory=ingestion_config.get("spill_dir"),
+        )
+        batch_size = ingestion_config.get("embed_batch_size", 256)
+        memory_flushes = 0
+        scanned_files = {scanned.path: scanned for scanned in to_process}
+        tasks = [(DocumentLoaderFactory.get_loader_class(scanned.path), scanned.path) for scanned in to_process]
+        for result in loader.load(tasks, pause=spool.over_rss_limit):
+            file = result.path
+            scanned = scanned_files[file]
+            if result.error:
+                print(f"Warning: Could not load {file}: {result.error}. Quarantining it until it changes.")
+                self.failures.append((file, result.error))
+                with self.manifest.transaction():
+                    self.manifest.quarantine(file, scanned.size, scanned.mtime, result.error)
+                continue
+            # Pages are split one at a time and released as soon as every strategy has split them
+            pages = result.documents
+            pages.reverse()
+            result = None
+
+            entry = known.get(file)
+            if entry and not entry.chunk_ids:
+                # Migrated entries are deleted by source, which must happen before the new chunks are written
+                self._delete_chunks(vector_store, file, entry)
+            written = 0
+            parent_ids = set()
+            parent_counts = {}
+            while pages:
+                page = pages.pop()
+                for strategy_name, strategy in strategies:
+                    if hasattr(strategy, "split_with_parents"):
+                        # Only the small child chunks are embedded; their parents go to the docstore
+                        strategy_chunks, strategy_parents = strategy.split_with_parents([page], parent_counts)
+                        self.docstore.add(file, strategy_parents)
+                        parent_ids.update(parent_id for parent_id, _ in strategy_parents)
+                        strategy_parents = None
+                    else:
+                        strategy_chunks = strategy.split_documents([page])
+                    chunk_counts[strategy_name] += len(strategy_chunks)
+                    spool.extend(strategy_chunks)
+                    strategy_chunks = None
+                page = None
+                if len(spool) and spool.over_rss_limit():
+                    written = self._write_chunks(vector_store, file, spool, batch_size, written)
+                    memory_flushes += 1
+            written = self._write_chunks(vector_store, file, spool, batch_size, written)
+
+            chunk_ids = self._chunk_ids(file, written)
+            if entry and entry.chunk_ids:
+                self._delete_chunks(vector_store, file, entry, keep=set(chunk_ids))
+            self.docstore.retain_source(file, parent_ids)
 
-        os.makedirs(self.chroma_path, exist_ok=True)
-        with open(metadata_file, "w") as f:
-            json.dump(new_metadata, f)
+            # The manifest row is committed only after the vector store holds the new chunks,
+            # so an interrupted run reprocesses the file instead of losing it
+            with self.manifest.transaction():
+                self.manifest.upsert(ManifestEntry(file, scanned.size, scanned.mtime, hashes[file], chunk_ids, fingerprint),
+                                     index_version=index_version)
+                if file in quarantined:
+                    self.manifest.release_quarantine(file)
+
+        for strategy_name, count in chunk_counts.items():
+            print(f"  - Applied {strategy_name} chunking: {count} chunks generated.")
+
+        if removed:
+            print(f"Removing {len(removed)} deleted files from the vector store...")
+            for entry in removed:
+                self._delete_chunks(vector_store, entry.path, entry)
+                self.docstore.delete_source(entry.path)
+                with self.manifest.transaction():
+                    self.manifest.remove(entry.path, index_version=index_version)
+
+        self.ingest_stats = {
+            "files": len(to_process) - len(self.failures),
+            "chunks": sum(chunk_counts.values()),
+            "spilled_chunks": spool.total_spilled,
+            "memory_flushes": memory_flushes,
+            "memory_limit_mb": memory_limit_mb,
+            "peak_rss_mb": peak_rss_mb(),
+            "parse_worker_peak_rss_mb": peak_rss_mb(children=True),
+        }
+        print(f"Peak RSS: {self.ingest_stats['peak_rss_mb']} MB (parse workers: "
+              f"{self.ingest_stats['parse_worker_peak_rss_mb']} MB), {spool.total_spilled} chunks spilled to disk.")
+        if memory_flushes:
+            print(f"Chunks were written early {memory_flushes} times to stay under the ingestion memory limit of {memory_limit_mb} MB.")
 
+        if self.failures:
+            print(f"{len(self.failures)} files failed to load and were quarantined:")
+            for file, error in self.failures:
+                print(f"  - {file}: {error}")
+        print("Vector store updated with new documents.")
         return vector_store
-    
+
+    def _create_chunking_strategies(self):
+        strategies = []
+        chunking_strategies_config = self.config.get("chunking_strategies", [])
+        all_chunking_strategies_params = self.config.get("chunking_strategies_parameters", {})
+
+        for strategy_name in chunking_strategies_config:
+            if not isinstance(strategy_name, str):
+                print(f"Warning: Invalid chunking strategy entry: {strategy_name}. Skipping.")
+                continue
+
+            strategy_specific_config = all_chunking_strategies_params.get(strategy_name) or {}
+
+            try:
+                strategies.append((strategy_name, ChunkingStrategyFactory.create_strategy(strategy_name, strategy_specific_config)))
+            except ValueError as e:
+                print(f"Error applying {strategy_name} chunking: {e}. Skipping this strategy.")
+        return strategies
+
+    def _config_fingerprint(self):
+        return config_fingerprint(self.config)
+
+    @staticmethod
+    def _chunk_ids(file, count, start=0):
+        # Deterministic IDs make re-adding a file after an interrupted run an upsert
+        prefix = hashlib.sha1(file.encode("utf-8")).hexdigest()[:16]
+        return [f"{prefix}-{i}" for i in range(start, count)]
+
+    @staticmethod
+    def _write_chunks(vector_store, file, spool, batch_size, written):
+        """Embed and write the spooled chunks of a file, numbered on from `written`. Returns the new count."""
+        for batch in spool.batches(batch_size):
+            vector_store.add_documents(batch, ids=DocumentProcessor._chunk_ids(file, written + len(batch), start=written))
+            written += len(batch)
+        return written
+
+    @staticmethod
+    def _delete_chunks(vector_store, file, entry, keep=frozenset()):
+        if entry is None:
+            return
+        if entry.chunk_ids:
+            stale = [chunk_id for chunk_id in entry.chunk_ids if chunk_id not in keep]
+            if stale:
+                vector_store.delete(ids=stale)
+        else:
+            # Entries migrated from doc_metadata.json do not know their chunk IDs
+            VectorStoreFactory.delete_where_source(vector_store, file)
+
     def _create_embeddings(self):
-        provider_url = self.providers_config.get(self.embedding_provider, {}).get("url")
+        embeddings = LLMFactory.create_embeddings(self.embedding_provider, self.embedding_model)
+        if embeddings is not None:
+            return embeddings
+
+        provider_urls = endpoint_urls(self.providers_config.get(self.embedding_provider))
+        provider_url = provider_urls[0] if provider_urls else None
 
         if not provider_url:
             raise ValueError(f"URL for embedding provider '{self.embedding_provider}' not found in config.yml")
@@ -133,10 +299,40 @@ class DocumentProcessor:
         else:
             raise ValueError("Invalid embedding provider specified in config.yml")
 
+    def _wrap_query_cache(self, embeddings):
+        cache_config = self.config.get("query_cache") or {}
+        if not cache_config.get("enabled", True):
+            return embeddings
+
+        cached = CachedQueryEmbeddings(
+            embeddings,
+            namespace=f"{self.embedding_provider}:{self.embedding_model}",
+            max_entries=cache_config.get("max_entries", 2048),
+            cache_dir=cache_config.get("cache_dir", os.path.join(self.chroma_path, "query_cache")),
+        )
+        cached.warm_from_log(
+            cache_config.get("query_log"),
+            limit=cache_config.get("warm_limit", 500),
+            tail_bytes=cache_config.get("warm_tail_bytes", 1 << 20),
+        )
+        return cached
+
     # get method for embeddings
     def get_embeddings(self):
         return self.embeddings  
     
+    # get method for chunk counts, spilling and peak memory of the last ingest run
+    def get_ingest_stats(self):
+        return self.ingest_stats
+
+    # get method for files that failed to load during this run
+    def get_failures(self):
+        return self.failures
+
+    # get method for the parent docstore of hierarchical chunks
+    def get_docstore(self):
+        return self.docstore
+
     # get method for vector store
     def get_vector_store(self):
         return self.vector_store
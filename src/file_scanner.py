@@ -0,0 +1,120 @@
+import glob
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+
+class ScannedFile(NamedTuple):
+    path: str
+    size: int
+    mtime: float
+
+
+def _fnmatch(rel_path: str, pattern: str) -> bool:
+    # Like glob, a leading "**/" also matches files directly in the root
+    return fnmatch(rel_path, pattern) or (pattern.startswith("**/") and fnmatch(rel_path, pattern[3:]))
+
+
+def _matches(rel_path: str, name: str, patterns: List[str]) -> bool:
+    return any(_fnmatch(rel_path, pattern) or fnmatch(name, pattern) for pattern in patterns)
+
+
+def _split_glob(path: str):
+    """Split a glob path into the directory to walk and the pattern relative to it."""
+    parts = path.split(os.sep)
+    for i, part in enumerate(parts):
+        if glob.has_magic(part):
+            return os.sep.join(parts[:i]) or ".", os.sep.join(parts[i:])
+    return path, None
+
+
+def _walk(root: str, pattern: Optional[str], extensions, include: List[str], exclude: List[str]) -> Iterator[ScannedFile]:
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    rel_path = os.path.relpath(entry.path, root)
+                    if exclude and _matches(rel_path, entry.name, exclude):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    if extensions and os.path.splitext(entry.name)[1] not in extensions:
+                        continue
+                    if pattern and not _fnmatch(rel_path, pattern):
+                        continue
+                    if include and not _matches(rel_path, entry.name, include):
+                        continue
+                    stat = entry.stat()
+                    yield ScannedFile(entry.path, stat.st_size, stat.st_mtime)
+        except OSError as e:
+            print(f"Warning: Could not scan {directory}: {e}")
+
+
+def scan_paths(paths: Iterable[str], extensions=None, include: Optional[List[str]] = None,
+               exclude: Optional[List[str]] = None) -> Iterator[ScannedFile]:
+    """
+    Walk files and directories in a single os.scandir pass per tree, reusing the stat results.
+    Paths may be glob patterns (e.g. `docs/**/*.txt`); `include` and `exclude` patterns are
+    matched against the path relative to the walked root and against the file name.
+    """
+    extensions = set(extensions or [])
+    include = list(include or [])
+    exclude = list(exclude or [])
+    for path in paths:
+        path = os.path.expanduser(path)
+        root, pattern = _split_glob(path)
+        if pattern is None and os.path.isfile(path):
+            stat = os.stat(path)
+            yield ScannedFile(path, stat.st_size, stat.st_mtime)
+            continue
+        if not os.path.isdir(root):
+            print(f"Warning: Ingest path not found: {path}")
+            continue
+        yield from _walk(root, pattern, extensions, include, exclude)
+
+
+def ingest_root(path: str):
+    """Return (directory, glob pattern or None) walked for an ingest path, or None if it names a single file."""
+    path = os.path.expanduser(path)
+    root, pattern = _split_glob(path)
+    if pattern is None and os.path.isfile(path):
+        return None
+    return root, pattern
+
+
+def under_root(path: str, root: str, pattern: Optional[str] = None) -> bool:
+    """Return whether `path` would be picked up by walking `root` with `pattern`."""
+    rel_path = os.path.relpath(path, root)
+    if rel_path.startswith(os.pardir):
+        return False
+    return pattern is None or _fnmatch(rel_path, pattern)
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_files(paths: List[str], max_workers: int = 8) -> Dict[str, Optional[str]]:
+    """Hash files in a thread pool; files that cannot be read map to None."""
+    def safe_hash(path):
+        try:
+            return hash_file(path)
+        except OSError as e:
+            print(f"Warning: Could not read {path}: {e}")
+            return None
+
+    if not paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(paths, executor.map(safe_hash, paths)))
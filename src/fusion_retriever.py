@@ -0,0 +1,185 @@
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from langchain.prompts import PromptTemplate
+
+MODES = ("multi_query", "hyde")
+
+_VARIANTS_PROMPT = PromptTemplate(
+    template=(
+        "Write {num_variants} different versions of the following question to retrieve relevant documents "
+        "from a vector database. Vary the wording and spell out abbreviations or implied context. "
+        "Reply with one question per line and nothing else.\n\n"
+        "Question: {question}"
+    ),
+    input_variables=["num_variants", "question"],
+)
+
+_HYDE_PROMPT = PromptTemplate(
+    template=(
+        "Write a short passage that would answer the following question, as it might appear in a document. "
+        "Reply with the passage only.\n\n"
+        "Question: {question}\n\n"
+        "Passage:"
+    ),
+    input_variables=["question"],
+)
+
+_NUMBERING = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+
+def _doc_key(doc):
+    return getattr(doc, "id", None) or (doc.metadata.get("source"), doc.page_content)
+
+
+def reciprocal_rank_fusion(result_lists, k: int = 60):
+    """Merge ranked document lists; each document scores sum(1 / (k + rank)) over the lists it appears in."""
+    scores = {}
+    docs = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results):
+            key = _doc_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+            docs.setdefault(key, doc)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+class _ModeStats:
+    __slots__ = ("calls", "seconds", "results", "unique_hits")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0  # from the start of retrieval until the mode's last search finished
+        self.results = 0  # distinct documents retrieved
+        self.unique_hits = 0  # fused results no other mode retrieved
+
+
+class FusionRetriever:
+    """
+    Retrieves with the original question plus optional expanded queries, merged by reciprocal rank fusion.
+    `multi_query` asks the LLM for rephrased questions, `hyde` searches with the embedding of an LLM-written
+    hypothetical answer. Generation and all searches run concurrently, and per-mode latency and unique
+    contributions are tracked so the extra calls can be judged against what they add.
+    """
+
+    def __init__(self, vector_store, embeddings, llm, modes=MODES, num_variants: int = 3, k: int = 4,
+                 fetch_k: int = None, rrf_k: int = 60, max_workers: int = 4):
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise ValueError(f"Unknown retrieval modes: {', '.join(sorted(unknown))}")
+        self.vector_store = vector_store
+        self.embeddings = embeddings
+        self.llm = llm
+        self.modes = list(modes)
+        self.num_variants = num_variants
+        self.k = k
+        self.fetch_k = fetch_k or k
+        self.rrf_k = rrf_k
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fusion-retrieval")
+        self._stats = {mode: _ModeStats() for mode in ["original"] + self.modes}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, vector_store, embeddings, llm):
+        """Return a FusionRetriever for the `retrieval` config section, or None when no modes are enabled."""
+        retrieval_config = config.get("retrieval") or {}
+        modes = retrieval_config.get("modes") or []
+        if not modes:
+            return None
+        return cls(
+            vector_store,
+            embeddings,
+            llm,
+            modes=modes,
+            num_variants=retrieval_config.get("num_variants", 3),
+            k=retrieval_config.get("k", 4),
+            fetch_k=retrieval_config.get("fetch_k"),
+            rrf_k=retrieval_config.get("rrf_k", 60),
+            max_workers=retrieval_config.get("max_workers", 4),
+        )
+
+    def _submit(self, fn, *args):
+        # Worker threads do not inherit context variables such as scheduler request options
+        return self._executor.submit(contextvars.copy_context().run, fn, *args)
+
+    def _generate(self, prompt, inputs) -> str:
+        response = (prompt | self.llm).invoke(inputs)
+        return getattr(response, "content", response).strip()
+
+    def _search(self, question):
+        return self.vector_store.similarity_search(question, k=self.fetch_k)
+
+    def _variants(self, question):
+        text = self._generate(_VARIANTS_PROMPT, {"num_variants": self.num_variants, "question": question})
+        variants = [_NUMBERING.sub("", line).strip() for line in text.splitlines()]
+        return [variant for variant in variants if variant and variant != question][:self.num_variants]
+
+    def _hyde(self, question):
+        passage = self._generate(_HYDE_PROMPT, {"question": question})
+        # Embedded as a document: the passage is compared against chunks, and should not fill the query cache
+        vector = self.embeddings.embed_documents([passage])[0]
+        return self.vector_store.similarity_search_by_vector(vector, k=self.fetch_k)
+
+    def invoke(self, question):
+        start = time.perf_counter()
+        # future -> (mode, whether it yields variants to search rather than results)
+        pending = {self._submit(self._search, question): ("original", False)}
+        if "multi_query" in self.modes:
+            pending[self._submit(self._variants, question)] = ("multi_query", True)
+        if "hyde" in self.modes:
+            pending[self._submit(self._hyde, question)] = ("hyde", False)
+
+        # Follow-up searches are submitted from here, so workers never block on each other
+        ranked_lists = {}
+        seconds = {}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                mode, yields_variants = pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    if mode == "original":
+                        raise
+                    print(f"Warning: {mode} retrieval failed: {e}")
+                    continue
+                if yields_variants:
+                    for variant in value:
+                        pending[self._submit(self._search, variant)] = (mode, False)
+                else:
+                    ranked_lists.setdefault(mode, []).append(value)
+                seconds[mode] = time.perf_counter() - start
+
+        fused = reciprocal_rank_fusion([results for lists in ranked_lists.values() for results in lists], k=self.rrf_k)[:self.k]
+        found_by = {mode: {_doc_key(doc) for results in lists for doc in results} for mode, lists in ranked_lists.items()}
+        with self._lock:
+            for mode, lists in ranked_lists.items():
+                stats = self._stats[mode]
+                stats.calls += 1
+                stats.seconds += seconds[mode]
+                stats.results += len(found_by[mode])
+                others = set().union(*(keys for other, keys in found_by.items() if other != mode))
+                stats.unique_hits += sum(1 for doc in fused if _doc_key(doc) in found_by[mode] - others)
+        return fused
+
+    def shutdown(self):
+        """Release the worker threads once running searches finish."""
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self):
+        """
+        Return calls, average latency and unique fused results per mode. A mode pays for itself when its
+        `unique_hits` are worth the latency it adds over `original`, the plain search of the question.
+        """
+        with self._lock:
+            return {
+                mode: {
+                    "calls": stats.calls,
+                    "avg_seconds": round(stats.seconds / stats.calls, 4) if stats.calls else 0.0,
+                    "avg_distinct_results": round(stats.results / stats.calls, 2) if stats.calls else 0.0,
+                    "unique_hits": stats.unique_hits,
+                }
+                for mode, stats in self._stats.items()
+            }
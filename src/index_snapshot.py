@@ -0,0 +1,248 @@
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+from array import array
+from typing import Optional
+
+from langchain.docstore.document import Document
+from document_processor import CHROMA_PATH, DOCSTORE_FILE, MANIFEST_FILE, config_fingerprint
+from vector_store_factory import VectorStoreFactory
+from ingest_manifest import IngestManifest, ManifestEntry
+from parent_docstore import ParentDocstore
+
+SNAPSHOT_FORMAT = 1
+_BATCH_SIZE = 500
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _entry_chunk_ids(vector_store, entry):
+    if entry.chunk_ids:
+        return entry.chunk_ids
+    # Entries migrated from doc_metadata.json do not know their chunk IDs
+    return VectorStoreFactory.ids_for_source(vector_store, entry.path)
+
+
+def export_snapshot(config, output_path: str, since: Optional[int] = None) -> dict:
+    """
+    Package the vector collection, ingest manifest and config fingerprint into a versioned archive.
+    With `since`, only files changed or removed after that index version are included (a delta snapshot).
+    `config` must carry the embedding model and chunking settings the index was built with; an index whose
+    manifest records other settings is refused, so a snapshot is never labelled with the wrong model.
+    """
+    chroma_path = config.get("chroma_path", CHROMA_PATH)
+    manifest = IngestManifest(os.path.join(chroma_path, MANIFEST_FILE))
+    docstore = ParentDocstore(os.path.join(chroma_path, DOCSTORE_FILE))
+    # Snapshots move stored vectors only, so no embedding function is needed
+    vector_store = VectorStoreFactory.create_vector_store(config)
+    try:
+        index_version = manifest.get_index_version()
+        fingerprint = config_fingerprint(config)
+        mismatched = [entry.path for entry in manifest.entries() if entry.config_fingerprint != fingerprint]
+        if mismatched:
+            raise SnapshotError(
+                f"{len(mismatched)} indexed files (e.g. {mismatched[0]}) were built with different embedding or chunking "
+                f"settings than {config.get('embedding_model_provider')}/{config.get('embedding_model')}; pass the "
+                f"embedding model the index was built with, or re-ingest before exporting"
+            )
+        if since is None:
+            entries = manifest.entries()
+            removed = {}
+        else:
+            if since > index_version:
+                raise SnapshotError(f"Index is at version {index_version}, cannot export changes since {since}")
+            entries = manifest.changed_since(since)
+            removed = manifest.removed_since(since)
+
+        with tempfile.TemporaryDirectory(prefix="rag-snapshot-") as workdir:
+            dimension = None
+            chunk_count = 0
+            with open(os.path.join(workdir, "manifest.jsonl"), "w") as manifest_file, \
+                    open(os.path.join(workdir, "chunks.jsonl"), "w") as chunks_file, \
+                    open(os.path.join(workdir, "embeddings.f32"), "wb") as embeddings_file, \
+                    open(os.path.join(workdir, "parents.jsonl"), "w") as parents_file:
+                for entry in entries:
+                    chunk_ids = _entry_chunk_ids(vector_store, entry)
+                    manifest_file.write(json.dumps(entry._replace(chunk_ids=chunk_ids)._asdict()) + "\n")
+                    for parent_id, parent in docstore.get_source(entry.path):
+                        parents_file.write(json.dumps({
+                            "id": parent_id, "source": entry.path, "content": parent.page_content, "metadata": parent.metadata,
+                        }) + "\n")
+                    for i in range(0, len(chunk_ids), _BATCH_SIZE):
+                        batch = VectorStoreFactory.get_records(vector_store, chunk_ids[i:i + _BATCH_SIZE])
+                        for chunk_id, document, metadata, embedding in zip(*batch):
+                            if dimension is None:
+                                dimension = len(embedding)
+                            chunks_file.write(json.dumps({"id": chunk_id, "document": document, "metadata": metadata}) + "\n")
+                            array("f", embedding).tofile(embeddings_file)
+                            chunk_count += 1
+
+            info = {
+                "format": SNAPSHOT_FORMAT,
+                "created_at": time.time(),
+                "index_version": index_version,
+                "base_version": since,
+                "embedding_model_provider": config.get("embedding_model_provider"),
+                "embedding_model": config.get("embedding_model"),
+                "config_fingerprint": fingerprint,
+                "vector_store_backend": VectorStoreFactory.get_backend_name(config),
+                "dimension": dimension,
+                "files": len(entries),
+                "chunks": chunk_count,
+                "removed": removed,
+            }
+            with open(os.path.join(workdir, "snapshot.json"), "w") as f:
+                json.dump(info, f, indent=2)
+
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            with tarfile.open(output_path, "w:gz") as archive:
+                for name in ("snapshot.json", "manifest.jsonl", "chunks.jsonl", "embeddings.f32", "parents.jsonl"):
+                    archive.add(os.path.join(workdir, name), arcname=name)
+    finally:
+        manifest.close()
+        docstore.close()
+
+    print(f"Exported {info['files']} files and {info['chunks']} chunks at index version {index_version} to {output_path}")
+    return info
+
+
+def read_snapshot_info(path: str) -> dict:
+    with tarfile.open(path, "r:*") as archive:
+        return json.load(archive.extractfile("snapshot.json"))
+
+
+def _check_compatible(info, config, local_version):
+    if info.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"Unsupported snapshot format: {info.get('format')}")
+    snapshot_model = (info.get("embedding_model_provider"), info.get("embedding_model"))
+    local_model = (config.get("embedding_model_provider"), config.get("embedding_model"))
+    if snapshot_model != local_model:
+        raise SnapshotError(
+            f"Snapshot was built with embedding model {snapshot_model[0]}/{snapshot_model[1]}, "
+            f"but this node is configured for {local_model[0]}/{local_model[1]}"
+        )
+    # Backends may store vectors differently (e.g. normalized), so snapshots only move between equal backends
+    backend = VectorStoreFactory.get_backend_name(config)
+    if info.get("vector_store_backend", "chroma") != backend:
+        raise SnapshotError(f"Snapshot was exported from the {info.get('vector_store_backend')} backend, but this node uses {backend}")
+    if info.get("config_fingerprint") != config_fingerprint(config):
+        raise SnapshotError("Snapshot was built with different chunking settings than this node's configuration")
+    base_version = info.get("base_version")
+    if base_version is not None and base_version != local_version:
+        raise SnapshotError(
+            f"Delta snapshot applies to index version {base_version}, but the local index is at version {local_version}"
+        )
+
+
+def import_snapshot(config, path: str) -> dict:
+    """
+    Load a snapshot into the local index without re-parsing or re-embedding.
+    A full snapshot replaces the local index; a delta snapshot must match the local index version.
+    Manifest entries keep the absolute paths of the exporting node, so the corpus must live at the same paths here.
+    """
+    chroma_path = config.get("chroma_path", CHROMA_PATH)
+    os.makedirs(chroma_path, exist_ok=True)
+    manifest = IngestManifest(os.path.join(chroma_path, MANIFEST_FILE))
+    docstore = ParentDocstore(os.path.join(chroma_path, DOCSTORE_FILE))
+    try:
+        with tempfile.TemporaryDirectory(prefix="rag-snapshot-") as workdir:
+            with tarfile.open(path, "r:*") as archive:
+                info = json.load(archive.extractfile("snapshot.json"))
+                _check_compatible(info, config, manifest.get_index_version())
+                # Members are extracted by name and read back sequentially; seeking back and forth in a gzip stream is slow
+                for name in ("manifest.jsonl", "chunks.jsonl", "embeddings.f32", "parents.jsonl"):
+                    if name == "parents.jsonl" and name not in archive.getnames():
+                        # Snapshots without hierarchical chunks may predate the parent docstore
+                        open(os.path.join(workdir, name), "w").close()
+                        continue
+                    with archive.extractfile(name) as source, open(os.path.join(workdir, name), "wb") as target:
+                        shutil.copyfileobj(source, target)
+            vector_store = VectorStoreFactory.create_vector_store(config)
+
+            with open(os.path.join(workdir, "manifest.jsonl"), "r") as f:
+                entries = [ManifestEntry(**json.loads(line)) for line in f]
+            incoming = {entry.path for entry in entries}
+            missing = [entry.path for entry in entries if not os.path.exists(entry.path)]
+            if missing:
+                print(f"Warning: {len(missing)} imported files (e.g. {missing[0]}) do not exist at the same path on this node; "
+                      f"their chunks are served, but the next ingest treats them as removed if they are under an ingested directory.")
+            removed = dict(info.get("removed") or {})
+            if info.get("base_version") is None:
+                # A full snapshot replaces whatever the local index holds
+                for entry in manifest.entries():
+                    if entry.path not in incoming:
+                        removed[entry.path] = entry.chunk_ids
+
+            dimension = info.get("dimension") or 0
+            with open(os.path.join(workdir, "chunks.jsonl"), "r") as chunks_file, \
+                    open(os.path.join(workdir, "embeddings.f32"), "rb") as embeddings_file:
+                batch = []
+                for line in chunks_file:
+                    batch.append(json.loads(line))
+                    if len(batch) >= _BATCH_SIZE:
+                        _upsert_chunks(vector_store, batch, embeddings_file, dimension)
+                        batch = []
+                if batch:
+                    _upsert_chunks(vector_store, batch, embeddings_file, dimension)
+
+            # Chunks of files that shrank or disappeared
+            local = manifest.get_many(incoming)
+            stale = [
+                chunk_id
+                for entry in entries if entry.path in local
+                for chunk_id in set(local[entry.path].chunk_ids) - set(entry.chunk_ids)
+            ]
+            for removed_path, chunk_ids in removed.items():
+                local_entry = manifest.get(removed_path)
+                stale.extend(local_entry.chunk_ids if local_entry else chunk_ids)
+            for i in range(0, len(stale), _BATCH_SIZE):
+                VectorStoreFactory.delete_ids(vector_store, stale[i:i + _BATCH_SIZE])
+
+            parents = {entry.path: [] for entry in entries}
+            with open(os.path.join(workdir, "parents.jsonl"), "r") as f:
+                for line in f:
+                    parent = json.loads(line)
+                    parents.setdefault(parent["source"], []).append(
+                        (parent["id"], Document(page_content=parent["content"], metadata=parent["metadata"]))
+                    )
+            for source, source_parents in parents.items():
+                docstore.replace_source(source, source_parents)
+            for removed_path in removed:
+                docstore.delete_source(removed_path)
+
+            # The manifest is committed only after the vector store holds the imported chunks
+            index_version = info["index_version"]
+            with manifest.transaction():
+                for entry in entries:
+                    manifest.upsert(entry, index_version=index_version)
+                for removed_path in removed:
+                    manifest.remove(removed_path, index_version=index_version)
+                manifest.set_meta("index_version", index_version)
+    finally:
+        manifest.close()
+        docstore.close()
+
+    kind = "delta" if info.get("base_version") is not None else "full"
+    print(f"Imported {kind} snapshot with {info['files']} files and {info['chunks']} chunks; "
+          f"index is now at version {info['index_version']}")
+    return info
+
+
+def _upsert_chunks(vector_store, batch, embeddings_file, dimension):
+    embeddings = []
+    for _ in batch:
+        vector = array("f")
+        vector.frombytes(embeddings_file.read(dimension * vector.itemsize))
+        embeddings.append(vector.tolist())
+    VectorStoreFactory.upsert_records(
+        vector_store,
+        [chunk["id"] for chunk in batch],
+        [chunk["document"] for chunk in batch],
+        [chunk["metadata"] for chunk in batch],
+        embeddings,
+    )
@@ -0,0 +1,234 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    content_hash TEXT,
+    chunk_ids TEXT NOT NULL DEFAULT '',
+    config_fingerprint TEXT,
+    updated_at REAL,
+    index_version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS removed (
+    path TEXT PRIMARY KEY,
+    chunk_ids TEXT NOT NULL DEFAULT '',
+    index_version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quarantine (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime REAL,
+    error TEXT,
+    quarantined_at REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# SQLite limits the number of host parameters per statement
+_BATCH_SIZE = 500
+
+
+class ManifestEntry(NamedTuple):
+    path: str
+    size: Optional[int]
+    mtime: Optional[float]
+    content_hash: Optional[str]
+    chunk_ids: List[str]
+    config_fingerprint: Optional[str]
+
+
+def _to_entry(row) -> ManifestEntry:
+    path, size, mtime, content_hash, chunk_ids, fingerprint = row
+    return ManifestEntry(path, size, mtime, content_hash, chunk_ids.split("\n") if chunk_ids else [], fingerprint)
+
+
+class IngestManifest:
+    """
+    Transactional record of ingested files, stored in SQLite.
+    Only changed rows are written, and every update batch is committed atomically.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+        if "index_version" not in columns:
+            # Manifests created before index versions were tracked
+            self._conn.execute("ALTER TABLE files ADD COLUMN index_version INTEGER NOT NULL DEFAULT 0")
+            self._conn.commit()
+        self._lock = threading.RLock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Group updates into one atomic commit; rolled back if the block raises."""
+        with self._lock:
+            with self._conn:
+                yield self
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        return self.get_many([path]).get(path)
+
+    def get_many(self, paths: Iterable[str]) -> Dict[str, ManifestEntry]:
+        paths = list(paths)
+        entries = {}
+        with self._lock:
+            for i in range(0, len(paths), _BATCH_SIZE):
+                batch = paths[i:i + _BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    "SELECT path, size, mtime, content_hash, chunk_ids, config_fingerprint "
+                    f"FROM files WHERE path IN ({placeholders})",
+                    batch,
+                )
+                for row in rows:
+                    entries[row[0]] = _to_entry(row)
+        return entries
+
+    def entries(self) -> List[ManifestEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime, content_hash, chunk_ids, config_fingerprint FROM files"
+            ).fetchall()
+        return [_to_entry(row) for row in rows]
+
+    def entries_under(self, root: str) -> List[ManifestEntry]:
+        """Return all entries whose path is `root` or lies below it."""
+        prefix = root.rstrip(os.sep) + os.sep
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime, content_hash, chunk_ids, config_fingerprint FROM files "
+                "WHERE path = ? OR substr(path, 1, ?) = ?",
+                (root, len(prefix), prefix),
+            ).fetchall()
+        return [_to_entry(row) for row in rows]
+
+    def upsert(self, entry: ManifestEntry, index_version: Optional[int] = None):
+        """
+        Insert or update an entry. `index_version` marks the index version that changed the file's chunks;
+        when omitted, an existing row keeps its version (e.g. for stat-only updates).
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO files (path, size, mtime, content_hash, chunk_ids, config_fingerprint, updated_at, index_version) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE(?, 0)) "
+                "ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime, "
+                "content_hash = excluded.content_hash, chunk_ids = excluded.chunk_ids, "
+                "config_fingerprint = excluded.config_fingerprint, updated_at = excluded.updated_at, "
+                "index_version = COALESCE(?, files.index_version)",
+                (entry.path, entry.size, entry.mtime, entry.content_hash, "\n".join(entry.chunk_ids),
+                 entry.config_fingerprint, time.time(), index_version, index_version),
+            )
+            if index_version is not None:
+                self._conn.execute("DELETE FROM removed WHERE path = ?", (entry.path,))
+
+    def remove(self, path: str, index_version: Optional[int] = None):
+        """Delete an entry; with `index_version`, a tombstone is kept so delta snapshots can replay the removal."""
+        with self._lock:
+            if index_version is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO removed (path, chunk_ids, index_version) "
+                    "SELECT path, chunk_ids, ? FROM files WHERE path = ?",
+                    (index_version, path),
+                )
+            self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def get_index_version(self) -> int:
+        return int(self.get_meta("index_version", 0))
+
+    def bump_index_version(self) -> int:
+        """Start a new index version for a batch of changes and return it."""
+        with self.transaction():
+            version = self.get_index_version() + 1
+            self.set_meta("index_version", version)
+        return version
+
+    def changed_since(self, index_version: int) -> List[ManifestEntry]:
+        """Return entries whose chunks changed after `index_version`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime, content_hash, chunk_ids, config_fingerprint FROM files WHERE index_version > ?",
+                (index_version,),
+            ).fetchall()
+        return [_to_entry(row) for row in rows]
+
+    def removed_since(self, index_version: int) -> Dict[str, List[str]]:
+        """Return path -> chunk IDs of entries removed after `index_version`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, chunk_ids FROM removed WHERE index_version > ?", (index_version,)
+            ).fetchall()
+        return {path: chunk_ids.split("\n") if chunk_ids else [] for path, chunk_ids in rows}
+
+    def quarantine(self, path: str, size: int, mtime: float, error: str):
+        """Record a file that failed to parse so it is skipped until it changes."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO quarantine (path, size, mtime, error, quarantined_at) VALUES (?, ?, ?, ?, ?)",
+                (path, size, mtime, error, time.time()),
+            )
+
+    def release_quarantine(self, path: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM quarantine WHERE path = ?", (path,))
+
+    def get_quarantined(self) -> Dict[str, tuple]:
+        """Return path -> (size, mtime, error) of quarantined files."""
+        with self._lock:
+            rows = self._conn.execute("SELECT path, size, mtime, error FROM quarantine").fetchall()
+        return {path: (size, mtime, error) for path, size, mtime, error in rows}
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def get_meta(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def migrate_json(self, json_path: str, config_fingerprint: str):
+        """
+        Import a legacy doc_metadata.json (path -> mtime) and rename it.
+        Legacy entries are assumed to have been built with the current configuration.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, "r") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            legacy = {}
+
+        with self.transaction():
+            existing = self.get_many(legacy.keys())
+            for path, mtime in legacy.items():
+                if path in existing:
+                    continue
+                size = os.path.getsize(path) if os.path.exists(path) else None
+                self.upsert(ManifestEntry(path, size, mtime, None, [], config_fingerprint))
+        os.replace(json_path, json_path + ".migrated")
+        print(f"Migrated {len(legacy)} entries from {json_path} to the ingest manifest.")
+        return len(legacy)
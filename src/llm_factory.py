@@ -1,5 +1,8 @@
+import threading
 from config_manager import ConfigManager
 from llm_providers import LMStudioProvider, LiteLLMProvider, OllamaProvider, OpenRouterProvider
+from llm_router import Endpoint, EndpointPool, RoutedChatModel
+from llm_scheduler import LLMScheduler, ScheduledChatModel
 
 class LLMFactory:
     _providers = {
@@ -8,6 +11,12 @@ class LLMFactory:
         "ollama": OllamaProvider,
         "openrouter": OpenRouterProvider
     }
+    # Endpoint pools are shared per (provider, model) so load is balanced across all pipelines
+    _pools = {}
+    # Schedulers are shared per provider so the concurrency limit holds across all pipelines
+    _schedulers = {}
+    _pools_lock = threading.Lock()
+    _watching_config = False
 
     @staticmethod
     def get_available_providers():
@@ -35,14 +44,157 @@ class LLMFactory:
     @staticmethod
     def create_llm(mode, model_name, callbacks):
         config_manager = ConfigManager()
+        LLMFactory._watch_config(config_manager)
         
         provider_class = LLMFactory._providers.get(mode)
         if not provider_class:
             raise ValueError(f"Unsupported mode: {mode}")
 
         print(f"\nUsing {mode} with model: {model_name}")
-        provider = provider_class(config_manager, model_name, callbacks)
-        return provider.create_llm()
+        scheduler = LLMFactory._get_scheduler(config_manager, mode)
+        # When scheduled, the wrapper reports tokens to the callbacks instead of the client
+        client_callbacks = [] if scheduler else callbacks
+
+        fallbacks = LLMFactory._get_fallbacks(config_manager, mode)
+        if len(config_manager.get_provider_urls(mode)) <= 1 and not fallbacks:
+            provider = provider_class(config_manager, model_name, client_callbacks)
+            llm = provider.create_llm()
+        else:
+            pools = [LLMFactory._get_pool(mode, model_name)]
+            for fallback in fallbacks:
+                fallback_mode = fallback.get("provider", mode)
+                if fallback_mode not in LLMFactory._providers:
+                    raise ValueError(f"Unsupported fallback provider: {fallback_mode}")
+                pools.append(LLMFactory._get_pool(fallback_mode, fallback.get("model", model_name)))
+            llm = RoutedChatModel(pools=pools, callbacks=client_callbacks)
+
+        if scheduler:
+            return ScheduledChatModel(llm=llm, scheduler=scheduler, callbacks=callbacks)
+        return llm
+
+    @staticmethod
+    def _get_scheduler(config_manager, mode):
+        """Return the shared scheduler of a provider, or None if `max_concurrency` is not configured."""
+        provider_config = config_manager.get_provider_config(mode)
+        max_concurrency = provider_config.get("max_concurrency")
+        if not max_concurrency:
+            return None
+        with LLMFactory._pools_lock:
+            scheduler = LLMFactory._schedulers.get(mode)
+            if scheduler is None:
+                scheduler = LLMScheduler(mode, max_concurrency=max_concurrency, max_queue=provider_config.get("max_queue", 1000))
+                LLMFactory._schedulers[mode] = scheduler
+            return scheduler
+
+    @staticmethod
+    def get_scheduler_stats():
+        """Return queue depth and wait-time metrics of every provider scheduler."""
+        with LLMFactory._pools_lock:
+            schedulers = dict(LLMFactory._schedulers)
+        return {mode: scheduler.get_stats() for mode, scheduler in schedulers.items()}
+
+    @staticmethod
+    def _get_fallbacks(config_manager, mode):
+        fallbacks = config_manager.get_provider_config(mode).get("fallback") or []
+        return [fallbacks] if isinstance(fallbacks, dict) else fallbacks
+
+    @staticmethod
+    def _get_pool(mode, model_name):
+        with LLMFactory._pools_lock:
+            pool = LLMFactory._pools.get((mode, model_name))
+            if pool is not None:
+                return pool
+
+            config_manager = ConfigManager()
+            provider_class = LLMFactory._providers[mode]
+            provider_config = config_manager.get_provider_config(mode)
+            endpoints = []
+            for url in config_manager.get_provider_urls(mode) or [None]:
+                # Endpoint clients stream without callbacks; the routed model reports tokens itself
+                provider = provider_class(config_manager, model_name, [])
+                provider.base_url = url
+                endpoints.append(Endpoint(mode, model_name, url, provider.create_llm(), health_check=provider.health_check))
+
+            pool = EndpointPool(
+                endpoints,
+                balancing=provider_config.get("balancing", "least_outstanding"),
+                failure_threshold=provider_config.get("failure_threshold", 3),
+                recovery_timeout=provider_config.get("recovery_timeout", 30),
+                health_check_interval=provider_config.get("health_check_interval", 30),
+                health_check_timeout=provider_config.get("health_check_timeout", 5),
+            )
+            if len(endpoints) > 1:
+                pool.start_health_checks()
+            LLMFactory._pools[(mode, model_name)] = pool
+            return pool
+
+    @staticmethod
+    def get_provider_modes(mode):
+        """Return the provider and its fallback providers, i.e. every provider section an LLM of this mode depends on."""
+        modes = {mode}
+        for fallback in LLMFactory._get_fallbacks(ConfigManager(), mode):
+            modes.add(fallback.get("provider", mode))
+        return modes
+
+    @staticmethod
+    def changed_providers(old_config, new_config):
+        """Return the providers whose configuration differs between two configs."""
+        if (old_config.get("api_keys") or {}) != (new_config.get("api_keys") or {}):
+            # Keys are looked up by the providers themselves, so any of them may be affected
+            return set(LLMFactory._providers)
+        old = old_config.get("providers") or {}
+        new = new_config.get("providers") or {}
+        return {name for name in set(old) | set(new) if old.get(name) != new.get(name)}
+
+    @staticmethod
+    def _watch_config(config_manager):
+        # Subscribed before any pipeline, so pipelines reloading after it already get fresh pools
+        with LLMFactory._pools_lock:
+            if LLMFactory._watching_config:
+                return
+            LLMFactory._watching_config = True
+        config_manager.subscribe(LLMFactory._on_config_reload)
+
+    @staticmethod
+    def _on_config_reload(previous, snapshot):
+        """Drop the pools and schedulers of changed providers; the rest stay warm. In-flight requests finish on the old ones."""
+        changed = LLMFactory.changed_providers(previous.config, snapshot.config)
+        if not changed:
+            return
+        with LLMFactory._pools_lock:
+            for key in [key for key in LLMFactory._pools if key[0] in changed]:
+                LLMFactory._pools.pop(key).stop_health_checks()
+            for mode in changed:
+                LLMFactory._schedulers.pop(mode, None)
+
+    @staticmethod
+    def get_router_stats():
+        """Return load and circuit breaker state of every endpoint pool."""
+        with LLMFactory._pools_lock:
+            pools = dict(LLMFactory._pools)
+        return {f"{mode}:{model_name}": pool.get_stats() for (mode, model_name), pool in pools.items()}
+
+    @staticmethod
+    def get_prompt_cache_style(mode, model_name):
+        """Return how prompts for a provider and model should be marked for caching; `prompt_cache` in the provider config overrides it."""
+        config_manager = ConfigManager()
+        style = config_manager.get_provider_config(mode).get("prompt_cache", "auto")
+        if style != "auto":
+            return style
+        provider_class = LLMFactory._providers.get(mode)
+        if not provider_class:
+            raise ValueError(f"Unsupported mode: {mode}")
+        return provider_class(config_manager, model_name, []).prompt_cache_style()
+
+    @staticmethod
+    def create_embeddings(mode, model_name):
+        """Return embeddings from a registered provider, or None if the provider does not supply its own."""
+        provider_class = LLMFactory._providers.get(mode)
+        if not provider_class:
+            return None
+
+        provider = provider_class(ConfigManager(), model_name, [])
+        return provider.create_embeddings()
 
     @staticmethod
     def get_available_models(mode, model_type="chat"):
@@ -2,11 +2,20 @@ from abc import ABC, abstractmethod
 from typing import List, Optional
 from langchain.callbacks.base import BaseCallbackHandler
 
+# Model families whose providers only cache prompt prefixes marked with cache_control breakpoints
+EXPLICIT_CACHE_MODELS = ("anthropic", "claude", "gemini")
+
 class LLMProvider(ABC):
     def __init__(self, config_manager, model_name: str, callbacks: List[BaseCallbackHandler]):
         self.config_manager = config_manager
         self.model_name = model_name
         self.callbacks = callbacks
+        # Set by the router to pin this instance to one endpoint of a provider pool
+        self.base_url = None
+
+    def get_provider_url(self, provider_name: str) -> str:
+        """Return the pinned endpoint, or the first configured URL of the provider"""
+        return self.base_url or self.config_manager.get_provider_url(provider_name)
 
     @abstractmethod
     def create_llm(self):
@@ -14,10 +23,25 @@ class LLMProvider(ABC):
         pass
 
     @abstractmethod
-    def get_available_models(self) -> List[str]:
-        """Return a list of available models for this provider"""
+    def get_available_models(self, timeout: Optional[float] = None) -> List[str]:
+        """Return a list of available models for this provider, waiting at most `timeout` seconds for the endpoint"""
         pass
     
+    def health_check(self, timeout: Optional[float] = 5.0) -> bool:
+        """Return whether the provider endpoint answers within `timeout` seconds"""
+        return bool(self.get_available_models(timeout=timeout))
+
+    def prompt_cache_style(self) -> str:
+        """
+        Return "prefix" if repeated prompt prefixes are reused automatically,
+        or "cache_control" if cacheable blocks must be marked in the messages
+        """
+        return "prefix"
+
     def supports_embeddings(self) -> bool:
         """Return whether this provider supports embedding models"""
         return True
+
+    def create_embeddings(self):
+        """Return an embeddings instance for this provider, or None to use the built-in embedding clients"""
+        return None
@@ -1,8 +1,8 @@
 import os
 import requests
 from langchain_litellm import ChatLiteLLM
-from .base_provider import LLMProvider
-from typing import List
+from .base_provider import EXPLICIT_CACHE_MODELS, LLMProvider
+from typing import List, Optional
 
 class LiteLLMProvider(LLMProvider):
     def create_llm(self):
@@ -19,7 +19,7 @@ class LiteLLMProvider(LLMProvider):
 
         llm_args = {
             "model": self.model_name,
-            "base_url": self.config_manager.get_provider_url("litellm"),
+            "base_url": self.get_provider_url("litellm"),
             "streaming": True,
             "callbacks": self.callbacks
         }
@@ -29,14 +29,18 @@ class LiteLLMProvider(LLMProvider):
 
         return ChatLiteLLM(**llm_args)
 
-    def get_available_models(self) -> List[str]:
-        base_url = self.config_manager.get_provider_url("litellm")
+    def prompt_cache_style(self) -> str:
+        model_name = self.model_name.lower()
+        return "cache_control" if any(family in model_name for family in EXPLICIT_CACHE_MODELS) else "prefix"
+
+    def get_available_models(self, timeout: Optional[float] = None) -> List[str]:
+        base_url = self.get_provider_url("litellm")
         proxy_key = self.config_manager.get_api_key("litellm")
         try:
             headers = {}
             if proxy_key:
                 headers["Authorization"] = f"Bearer {proxy_key}"
-            response = requests.get(f"{base_url}/models", headers=headers)
+            response = requests.get(f"{base_url}/models", headers=headers, timeout=timeout)
             response.raise_for_status()
             models = response.json().get("data", [])
             return [model["id"] for model in models]
@@ -1,21 +1,24 @@
 import requests
 from langchain_ollama import ChatOllama
 from .base_provider import LLMProvider
-from typing import List
+from typing import List, Optional
 
 class OllamaProvider(LLMProvider):
     def create_llm(self):
-        base_url = self.config_manager.get_provider_url("ollama")
+        base_url = self.get_provider_url("ollama")
+        # Keeping the model loaded between requests lets Ollama reuse the KV cache of a repeated prompt prefix
+        keep_alive = self.config_manager.get_provider_config("ollama").get("keep_alive", "30m")
         return ChatOllama(
             base_url=base_url,
             model=self.model_name,
+            keep_alive=keep_alive,
             callbacks=self.callbacks
         )
 
-    def get_available_models(self) -> List[str]:
-        base_url = self.config_manager.get_provider_url("ollama")
+    def get_available_models(self, timeout: Optional[float] = None) -> List[str]:
+        base_url = self.get_provider_url("ollama")
         try:
-            response = requests.get(f"{base_url}/api/tags")
+            response = requests.get(f"{base_url}/api/tags", timeout=timeout)
             response.raise_for_status()
             models = response.json().get("models", [])
             return [model["name"] for model in models]
@@ -1,7 +1,7 @@
 import requests
 from langchain_openai import ChatOpenAI
 from .base_provider import LLMProvider
-from typing import List
+from typing import List, Optional
 
 class OpenAICompatibleProvider(LLMProvider):
     """
@@ -15,7 +15,7 @@ class OpenAICompatibleProvider(LLMProvider):
     
     def get_base_url(self) -> str:
         """Get the base URL for this provider from config"""
-        return self.config_manager.get_provider_url(self.provider_name)
+        return self.get_provider_url(self.provider_name)
     
     def get_api_key(self) -> str:
         """Get the API key for this provider. Override in subclasses if needed."""
@@ -29,22 +29,26 @@ class OpenAICompatibleProvider(LLMProvider):
     
     def create_llm(self):
         """Create the ChatOpenAI instance with provider-specific configuration"""
+        provider_config = self.config_manager.get_provider_config(self.provider_name)
         return ChatOpenAI(
             base_url=self.get_api_endpoint(),
             api_key=self.get_api_key(),
             model=self.model_name,
             temperature=0.1,
             streaming=True,
+            # Usage, including cached prompt tokens, is reported in the final stream chunk.
+            # Disable it for servers that reject the stream_options request field.
+            stream_usage=provider_config.get("stream_usage", True),
             callbacks=self.callbacks
         )
 
-    def get_available_models(self) -> List[str]:
+    def get_available_models(self, timeout: Optional[float] = None) -> List[str]:
         """Fetch available models from the provider's /models endpoint"""
         try:
             models_url = f"{self.get_api_endpoint()}/models"
             headers = {"Authorization": f"Bearer {self.get_api_key()}"}
             
-            response = requests.get(models_url, headers=headers)
+            response = requests.get(models_url, headers=headers, timeout=timeout)
             response.raise_for_status()
             models = response.json().get("data", [])
             return [model["id"] for model in models]
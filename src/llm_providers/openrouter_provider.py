@@ -1,3 +1,4 @@
+from .base_provider import EXPLICIT_CACHE_MODELS
 from .openai_compatible_provider import OpenAICompatibleProvider
 
 class OpenRouterProvider(OpenAICompatibleProvider):
@@ -18,7 +19,7 @@ class OpenRouterProvider(OpenAICompatibleProvider):
     def get_base_url(self) -> str:
         """Get OpenRouter base URL from config, with fallback to default"""
         try:
-            return self.config_manager.get_provider_url("openrouter")
+            return self.get_provider_url("openrouter")
         except:
             # Fallback to default OpenRouter URL if not configured
             return "https://openrouter.ai/api"
@@ -26,3 +27,8 @@ class OpenRouterProvider(OpenAICompatibleProvider):
     def supports_embeddings(self) -> bool:
         """OpenRouter does not support embedding models"""
         return False
+
+    def prompt_cache_style(self) -> str:
+        """Anthropic and Gemini models on OpenRouter need cache_control breakpoints; others cache prefixes automatically"""
+        model_name = self.model_name.lower()
+        return "cache_control" if any(family in model_name for family in EXPLICIT_CACHE_MODELS) else "prefix"
@@ -0,0 +1,224 @@
+import threading
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class Endpoint:
+    """One endpoint of a provider pool, with its load and circuit breaker state."""
+
+    def __init__(self, provider_name: str, model_name: str, url: Optional[str], llm, health_check=None):
+        self.provider_name = provider_name
+        self.model_name = model_name
+        self.url = url
+        self.llm = llm
+        self.health_check = health_check
+        self.outstanding = 0
+        self.latency = None  # EWMA of time to first token, in seconds
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def name(self):
+        return f"{self.provider_name}:{self.url or 'default'}"
+
+
+class EndpointPool:
+    """
+    Balances requests for one provider/model across its endpoints.
+    Endpoints that fail `failure_threshold` times in a row are taken out of rotation
+    and retried after `recovery_timeout` seconds or when a health check passes.
+    Each endpoint is probed by its own thread, so an unreachable endpoint does not delay the checks of the others.
+    """
+
+    def __init__(self, endpoints: List[Endpoint], balancing: str = "least_outstanding", failure_threshold: int = 3,
+                 recovery_timeout: float = 30.0, health_check_interval: float = 30.0, health_check_timeout: float = 5.0,
+                 latency_alpha: float = 0.3):
+        if balancing not in ("least_outstanding", "latency_weighted"):
+            raise ValueError(f"Unsupported balancing strategy: {balancing}")
+        self.endpoints = endpoints
+        self.balancing = balancing
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.latency_alpha = latency_alpha
+        self._lock = threading.Lock()
+        self._health_threads = []
+        self._health_stop = threading.Event()
+
+    def _is_available(self, endpoint: Endpoint, now: float) -> bool:
+        if endpoint.state == CLOSED:
+            return True
+        if endpoint.state == OPEN and now - endpoint.opened_at >= self.recovery_timeout:
+            endpoint.state = HALF_OPEN
+        # A half-open endpoint gets a single trial request at a time
+        return endpoint.state == HALF_OPEN and endpoint.outstanding == 0
+
+    def _score(self, endpoint: Endpoint):
+        if self.balancing == "latency_weighted":
+            # Unmeasured endpoints score as fast so they get sampled
+            return (endpoint.outstanding + 1) * (endpoint.latency or 0.0), endpoint.outstanding
+        return endpoint.outstanding, endpoint.latency or 0.0
+
+    def acquire(self, exclude=()) -> Optional[Endpoint]:
+        """Pick an endpoint and count the request as outstanding on it."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude and self._is_available(e, now)]
+            if not candidates:
+                return None
+            endpoint = min(candidates, key=self._score)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, success: bool, first_token_latency: Optional[float] = None):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if success:
+                endpoint.consecutive_failures = 0
+                endpoint.state = CLOSED
+                if first_token_latency is not None:
+                    if endpoint.latency is None:
+                        endpoint.latency = first_token_latency
+                    else:
+                        endpoint.latency += self.latency_alpha * (first_token_latency - endpoint.latency)
+            else:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.state == HALF_OPEN or endpoint.consecutive_failures >= self.failure_threshold:
+                    self._open(endpoint)
+
+    def _open(self, endpoint: Endpoint):
+        if endpoint.state != OPEN:
+            print(f"Circuit opened for {endpoint.name}")
+        endpoint.state = OPEN
+        endpoint.opened_at = time.monotonic()
+
+    def start_health_checks(self):
+        if self._health_threads or not self.health_check_interval:
+            return
+        for endpoint in self.endpoints:
+            if not endpoint.health_check:
+                continue
+            thread = threading.Thread(target=self._health_loop, args=(endpoint,), name=f"llm-health-check-{endpoint.name}", daemon=True)
+            thread.start()
+            self._health_threads.append(thread)
+
+    def stop_health_checks(self):
+        self._health_stop.set()
+
+    def _health_loop(self, endpoint: Endpoint):
+        while not self._health_stop.wait(self.health_check_interval):
+            try:
+                healthy = endpoint.health_check(timeout=self.health_check_timeout)
+            except Exception:
+                healthy = False
+            with self._lock:
+                if not healthy:
+                    self._open(endpoint)
+                elif endpoint.state == OPEN:
+                    endpoint.state = HALF_OPEN
+
+    def get_stats(self):
+        with self._lock:
+            return [
+                {
+                    "endpoint": endpoint.name,
+                    "model": endpoint.model_name,
+                    "state": endpoint.state,
+                    "outstanding": endpoint.outstanding,
+                    "latency": endpoint.latency,
+                    "requests": endpoint.requests,
+                    "failures": endpoint.failures,
+                }
+                for endpoint in self.endpoints
+            ]
+
+
+class RoutedChatModel(BaseChatModel):
+    """
+    Chat model that routes each request to an endpoint of the primary pool and
+    fails over to the next endpoint, then to the fallback pools, until one succeeds.
+    Failover only happens before the first token; once output has been streamed an error is raised.
+    """
+
+    pools: List[Any]
+    streaming: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed"
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        errors = []
+        for pool in self.pools:
+            tried = set()
+            while True:
+                endpoint = pool.acquire(exclude=tried)
+                if endpoint is None:
+                    break
+                tried.add(endpoint)
+
+                start = time.perf_counter()
+                first_token_latency = None
+                success = False
+                try:
+                    for message_chunk in endpoint.llm.stream(messages, stop=stop, **kwargs):
+                        if first_token_latency is None:
+                            first_token_latency = time.perf_counter() - start
+                        chunk = ChatGenerationChunk(message=message_chunk)
+                        if run_manager and chunk.text:
+                            run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                        yield chunk
+                    success = True
+                    return
+                except GeneratorExit:
+                    # The consumer stopped reading; the endpoint itself did fine
+                    success = True
+                    raise
+                except Exception as e:
+                    if first_token_latency is not None:
+                        raise
+                    errors.append(f"{endpoint.name}: {e}")
+                    print(f"Endpoint {endpoint.name} failed, trying next: {e}")
+                finally:
+                    pool.release(endpoint, success, first_token_latency)
+
+        raise RuntimeError("All LLM endpoints failed: " + "; ".join(errors) if errors else "No LLM endpoint available")
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = None
+        for chunk in self._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            message = chunk.message if message is None else message + chunk.message
+        if message is None:
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=""))])
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(
+            content=message.content,
+            usage_metadata=message.usage_metadata,
+            response_metadata=message.response_metadata,
+        ))])
@@ -0,0 +1,289 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_request_options = contextvars.ContextVar("llm_request_options", default=(0, None))
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request is shed because its deadline cannot be met."""
+    pass
+
+
+@contextmanager
+def request_options(priority: int = 0, timeout: Optional[float] = None):
+    """
+    Set the priority (lower runs first) and completion timeout in seconds
+    for LLM calls made in this context.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    token = _request_options.set((priority, deadline))
+    try:
+        yield
+    finally:
+        _request_options.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("priority", "deadline", "event", "loop", "future", "granted", "cancelled")
+
+    def __init__(self, priority, deadline, loop=None):
+        self.priority = priority
+        self.deadline = deadline
+        # Threads wait on an event; coroutines await a future, so waiting never occupies a thread
+        self.event = threading.Event() if loop is None else None
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+        self.granted = False
+        self.cancelled = False
+
+    def wake(self) -> bool:
+        """Signal the waiter. Returns False if it can no longer be resumed."""
+        if self.event is not None:
+            self.event.set()
+            return True
+        try:
+            self.loop.call_soon_threadsafe(self._resolve)
+        except RuntimeError:
+            # The loop is closed; its coroutine will never resume to use the slot
+            self.cancelled = True
+            return False
+        return True
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class LLMScheduler:
+    """
+    Limits concurrent LLM calls to a provider and queues the rest by priority, then arrival.
+    Requests whose deadline cannot be met given the queue ahead of them are shed immediately.
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 4, max_queue: int = 1000, service_time_alpha: float = 0.2):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.service_time_alpha = service_time_alpha
+        self._lock = threading.Lock()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self._service_time = None  # EWMA of request duration, in seconds
+        self._wait_times = deque(maxlen=1000)
+        self.completed = 0
+        self.shed = 0
+
+    def _estimated_completion(self, priority) -> float:
+        if self._service_time is None:
+            return 0.0
+        ahead = sum(1 for _, _, waiter in self._queue if waiter.priority <= priority and not waiter.cancelled)
+        if self._active < self.max_concurrency and not ahead:
+            return self._service_time
+        rounds = (ahead // self.max_concurrency) + 1
+        return rounds * self._service_time + self._service_time
+
+    def _enqueue(self, priority, deadline, start, loop=None) -> Optional[_Waiter]:
+        """Take a free slot and return None, or queue and return a waiter. Caller holds the lock."""
+        if deadline is not None and start + self._estimated_completion(priority) > deadline:
+            self.shed += 1
+            raise DeadlineExceeded(f"{self.name}: deadline cannot be met with {len(self._queue)} queued requests")
+        if self._active < self.max_concurrency and not self._queue:
+            self._active += 1
+            self._wait_times.append(0.0)
+            return None
+        if len(self._queue) >= self.max_queue:
+            self.shed += 1
+            raise DeadlineExceeded(f"{self.name}: queue is full ({self.max_queue} requests)")
+        waiter = _Waiter(priority, deadline, loop)
+        heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        return waiter
+
+    def _finish_wait(self, waiter: _Waiter, start: float):
+        with self._lock:
+            if not waiter.granted:
+                waiter.cancelled = True
+                self.shed += 1
+                raise DeadlineExceeded(f"{self.name}: deadline passed after {time.monotonic() - start:.2f}s in queue")
+            self._wait_times.append(time.monotonic() - start)
+
+    def acquire(self, priority: int = 0, deadline: Optional[float] = None):
+        """Block until a slot is free. Raises DeadlineExceeded if the request is shed."""
+        start = time.monotonic()
+        with self._lock:
+            waiter = self._enqueue(priority, deadline, start)
+        if waiter is None:
+            return
+        timeout = deadline - time.monotonic() if deadline is not None else None
+        waiter.event.wait(timeout if timeout is None or timeout > 0 else 0)
+        self._finish_wait(waiter, start)
+
+    async def aacquire(self, priority: int = 0, deadline: Optional[float] = None):
+        """Wait for a free slot without blocking a thread. Raises DeadlineExceeded if the request is shed."""
+        start = time.monotonic()
+        with self._lock:
+            waiter = self._enqueue(priority, deadline, start, asyncio.get_running_loop())
+        if waiter is None:
+            return
+        timeout = deadline - time.monotonic() if deadline is not None else None
+        try:
+            await asyncio.wait({waiter.future}, timeout=timeout if timeout is None or timeout > 0 else 0)
+        except asyncio.CancelledError:
+            with self._lock:
+                waiter.cancelled = True
+                if waiter.granted:
+                    # Granted just before the cancellation arrived: hand the slot to the next request
+                    self._active -= 1
+                    self._dispatch()
+            raise
+        self._finish_wait(waiter, start)
+
+    def release(self, service_time: Optional[float] = None):
+        with self._lock:
+            self._active -= 1
+            self.completed += 1
+            if service_time is not None:
+                if self._service_time is None:
+                    self._service_time = service_time
+                else:
+                    self._service_time += self.service_time_alpha * (service_time - self._service_time)
+            self._dispatch()
+
+    def _dispatch(self):
+        now = time.monotonic()
+        while self._queue and self._active < self.max_concurrency:
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.cancelled:
+                continue
+            if waiter.deadline is not None and now >= waiter.deadline:
+                # Let the waiter time out on its own; it will record itself as shed
+                waiter.wake()
+                continue
+            waiter.granted = True
+            self._active += 1
+            if not waiter.wake():
+                waiter.granted = False
+                self._active -= 1
+
+    @contextmanager
+    def slot(self, priority: int = 0, deadline: Optional[float] = None):
+        self.acquire(priority, deadline)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    @asynccontextmanager
+    async def aslot(self, priority: int = 0, deadline: Optional[float] = None):
+        await self.aacquire(priority, deadline)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def get_stats(self):
+        with self._lock:
+            waits = sorted(self._wait_times)
+            return {
+                "name": self.name,
+                "max_concurrency": self.max_concurrency,
+                "active": self._active,
+                "queue_depth": sum(1 for _, _, waiter in self._queue if not waiter.cancelled),
+                "completed": self.completed,
+                "shed": self.shed,
+                "average_wait": sum(waits) / len(waits) if waits else 0.0,
+                "p95_wait": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                "average_service_time": self._service_time or 0.0,
+            }
+
+
+class ScheduledChatModel(BaseChatModel):
+    """Chat model that runs each call of the wrapped model inside a scheduler slot."""
+
+    llm: Any
+    scheduler: Any
+    streaming: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "scheduled"
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        priority, deadline = _request_options.get()
+        with self.scheduler.slot(priority, deadline):
+            for message_chunk in self.llm.stream(messages, stop=stop, **kwargs):
+                chunk = ChatGenerationChunk(message=message_chunk)
+                if run_manager and chunk.text:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        # Without this, LangChain would run _stream on its executor, where queued requests
+        # would block the threads that the requests holding slots need to make progress
+        priority, deadline = _request_options.get()
+        async with self.scheduler.aslot(priority, deadline):
+            async for message_chunk in self.llm.astream(messages, stop=stop, **kwargs):
+                chunk = ChatGenerationChunk(message=message_chunk)
+                if run_manager and chunk.text:
+                    await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+
+    @staticmethod
+    def _to_result(message) -> ChatResult:
+        if message is None:
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=""))])
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(
+            content=message.content,
+            usage_metadata=message.usage_metadata,
+            response_metadata=message.response_metadata,
+        ))])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = None
+        for chunk in self._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            message = chunk.message if message is None else message + chunk.message
+        return self._to_result(message)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = None
+        async for chunk in self._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            message = chunk.message if message is None else message + chunk.message
+        return self._to_result(message)
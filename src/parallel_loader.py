@@ -0,0 +1,139 @@
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class LoadResult(NamedTuple):
+    path: str
+    documents: Optional[List[Any]]
+    error: Optional[str]
+
+
+def _worker_main(conn, memory_limit_bytes):
+    if resource is not None and memory_limit_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        loader_class, path = task
+        try:
+            conn.send((path, loader_class(path).load(), None))
+        except MemoryError:
+            conn.send((path, None, "memory limit exceeded"))
+        except Exception as e:
+            conn.send((path, None, f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, context, memory_limit_bytes):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit_bytes), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.path = None
+        self.started = None
+
+    def submit(self, loader_class, path):
+        self.path = path
+        self.started = time.monotonic()
+        self.conn.send((loader_class, path))
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ParallelDocumentLoader:
+    """
+    Parses files in worker processes so a pathological file cannot stall or crash ingestion.
+    Each file gets `timeout` seconds; a worker that times out or dies is replaced and the file is reported as failed.
+    `memory_limit_mb` optionally caps each worker's virtual address space (RLIMIT_AS), not its resident memory.
+    Parsers that map large files or reserve big arenas can exceed a cap well above their RSS, so it is off by default.
+    With `max_workers=0` files are parsed in-process without these protections.
+    Results are produced lazily: a worker whose result has not been consumed yet waits instead of parsing ahead.
+    """
+
+    def __init__(self, max_workers: int = 4, timeout: float = 120, memory_limit_mb: Optional[int] = None, start_method: str = "spawn"):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        self.start_method = start_method
+
+    def load(self, tasks: Iterable[Tuple[Any, str]], pause: Optional[Callable[[], bool]] = None) -> Iterator[LoadResult]:
+        """
+        Load (loader_class, path) tasks, yielding results in completion order.
+        While `pause()` returns True, a new file is only handed out once no other file is being parsed.
+        """
+        tasks = deque(tasks)
+        if not self.max_workers:
+            for loader_class, path in tasks:
+                try:
+                    yield LoadResult(path, loader_class(path).load(), None)
+                except Exception as e:
+                    yield LoadResult(path, None, f"{type(e).__name__}: {e}")
+            return
+
+        context = multiprocessing.get_context(self.start_method)
+        idle = [_Worker(context, self.memory_limit_bytes) for _ in range(min(self.max_workers, len(tasks)))]
+        busy = []
+        try:
+            while tasks or busy:
+                # Under memory pressure, parse one file at a time
+                while tasks and idle and not (busy and pause and pause()):
+                    worker = idle.pop()
+                    worker.submit(*tasks.popleft())
+                    busy.append(worker)
+
+                deadline = min(worker.started for worker in busy) + self.timeout
+                ready = wait([worker.conn for worker in busy] + [worker.process.sentinel for worker in busy],
+                             timeout=max(0.0, deadline - time.monotonic()))
+
+                now = time.monotonic()
+                for worker in list(busy):
+                    error = None
+                    if worker.conn in ready or worker.process.sentinel in ready:
+                        try:
+                            path, documents, error = worker.conn.recv()
+                            busy.remove(worker)
+                            idle.append(worker)
+                            yield LoadResult(path, documents, error)
+                            continue
+                        except (EOFError, OSError):
+                            worker.process.join(timeout=1)
+                            error = f"worker crashed (exit code {worker.process.exitcode})"
+                    elif now - worker.started >= self.timeout:
+                        error = f"timed out after {self.timeout}s"
+                    else:
+                        continue
+
+                    busy.remove(worker)
+                    worker.kill()
+                    if tasks:
+                        idle.append(_Worker(context, self.memory_limit_bytes))
+                    yield LoadResult(worker.path, None, error)
+        finally:
+            for worker in idle:
+                worker.stop()
+            for worker in busy:
+                worker.kill()
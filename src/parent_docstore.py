@@ -0,0 +1,116 @@
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Dict, Iterable, List, Tuple
+from langchain.docstore.document import Document
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parents (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    content BLOB NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parents_source ON parents (source);
+"""
+
+# SQLite limits the number of host parameters per statement
+_BATCH_SIZE = 500
+
+
+class ParentDocstore:
+    """
+    Compact store of the parent sections of hierarchical chunks, kept outside the vector store.
+    Text is zlib-compressed in SQLite and rows are grouped by source file so they can be replaced per file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def replace_source(self, source: str, parents: Iterable[Tuple[str, Document]]):
+        """Atomically replace the parents stored for a source file."""
+        rows = [
+            (parent_id, source, zlib.compress(parent.page_content.encode("utf-8")), json.dumps(parent.metadata))
+            for parent_id, parent in parents
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM parents WHERE source = ?", (source,))
+            self._conn.executemany("INSERT OR REPLACE INTO parents (id, source, content, metadata) VALUES (?, ?, ?, ?)", rows)
+
+    def add(self, source: str, parents: Iterable[Tuple[str, Document]]):
+        """Insert or replace parents of a source file, keeping its other parents."""
+        rows = [
+            (parent_id, source, zlib.compress(parent.page_content.encode("utf-8")), json.dumps(parent.metadata))
+            for parent_id, parent in parents
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO parents (id, source, content, metadata) VALUES (?, ?, ?, ?)", rows)
+
+    def retain_source(self, source: str, keep_ids):
+        """Delete the parents of a source file whose IDs are not in `keep_ids`, e.g. after it was re-added with `add`."""
+        keep_ids = set(keep_ids)
+        with self._lock, self._conn:
+            stale = [(parent_id,) for (parent_id,) in self._conn.execute("SELECT id FROM parents WHERE source = ?", (source,))
+                     if parent_id not in keep_ids]
+            self._conn.executemany("DELETE FROM parents WHERE id = ?", stale)
+
+    def delete_source(self, source: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM parents WHERE source = ?", (source,))
+
+    def get_source(self, source: str) -> List[Tuple[str, Document]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT id, content, metadata FROM parents WHERE source = ?", (source,)).fetchall()
+        return [(parent_id, self._to_document(content, metadata)) for parent_id, content, metadata in rows]
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, Document]:
+        ids = list(ids)
+        parents = {}
+        with self._lock:
+            for i in range(0, len(ids), _BATCH_SIZE):
+                batch = ids[i:i + _BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(f"SELECT id, content, metadata FROM parents WHERE id IN ({placeholders})", batch)
+                for parent_id, content, metadata in rows:
+                    parents[parent_id] = self._to_document(content, metadata)
+        return parents
+
+    @staticmethod
+    def _to_document(content, metadata) -> Document:
+        return Document(page_content=zlib.decompress(content).decode("utf-8"), metadata=json.loads(metadata))
+
+    def expand(self, docs: List[Document]) -> List[Document]:
+        """
+        Replace retrieved child chunks by their parents, in order of the best-ranked child and without duplicates.
+        Documents without a parent are kept as they are.
+        """
+        parent_ids = [doc.metadata.get("parent_id") for doc in docs]
+        parents = self.get_many({parent_id for parent_id in parent_ids if parent_id})
+        expanded = []
+        seen = set()
+        for doc, parent_id in zip(docs, parent_ids):
+            parent = parents.get(parent_id)
+            if parent is None:
+                expanded.append(doc)
+            elif parent_id not in seen:
+                seen.add(parent_id)
+                expanded.append(parent)
+        return expanded
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM parents").fetchone()[0]
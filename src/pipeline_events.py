@@ -0,0 +1,29 @@
+from typing import Any, List, NamedTuple, Optional
+
+
+class RetrievalEvent(NamedTuple):
+    """Retrieval finished; `sources` are the documents placed in the prompt."""
+    question: str
+    sources: List[Any]
+    seconds: float
+
+
+class TokenEvent(NamedTuple):
+    text: str
+
+
+class UsageEvent(NamedTuple):
+    input_tokens: int
+    output_tokens: int
+    total_tokens: int
+    cached_tokens: int = 0  # input tokens the provider served from its prompt cache
+
+
+class TimingEvent(NamedTuple):
+    retrieval_seconds: float
+    first_token_seconds: Optional[float]
+    total_seconds: float
+
+
+class ErrorEvent(NamedTuple):
+    error: Exception
@@ -0,0 +1,97 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from conversation_memory import estimate_tokens
+
+RAG_INSTRUCTIONS = (
+    "You are an intelligent assistant that answers questions based on provided documents.\n"
+    "Use the documents below to answer the user's question.\n"
+    "If you don't know the answer, just say \"I don't know\" rather than making up an answer."
+)
+
+CHATBOT_INSTRUCTIONS = "You are a helpful assistant. Answer the user's question."
+
+# Styles of prompt caching a provider can use
+CACHE_STYLES = ("prefix", "cache_control")
+
+_CACHE_CONTROL = {"type": "ephemeral"}
+# Recently seen prompt prefixes, used to estimate how often a prefix could be served from cache
+_RECENT_PREFIXES = 256
+
+
+def _doc_sort_key(doc):
+    metadata = doc.metadata or {}
+    return (str(metadata.get("source", "")), str(metadata.get("page", "")), doc.page_content)
+
+
+class PromptAssembler:
+    """
+    Builds chat messages ordered from most to least stable, so consecutive requests share the longest
+    possible prefix: static instructions, then the retrieved documents in a canonical order, then the
+    conversation history and the question.
+    With the `cache_control` style, the instruction and document blocks are marked as cache breakpoints for
+    providers that need explicit hints (e.g. Anthropic or Gemini models via LiteLLM/OpenRouter); with
+    `prefix`, the provider or local server is expected to reuse repeated prefixes on its own.
+    """
+
+    def __init__(self, instructions: str, cache_style: str = "prefix"):
+        if cache_style not in CACHE_STYLES:
+            raise ValueError(f"Unsupported prompt cache style: {cache_style}")
+        self.instructions = instructions
+        self.cache_style = cache_style
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.prefix_repeats = 0
+        self.prefix_tokens = 0
+        self.prompt_tokens = 0
+
+    def format_documents(self, docs) -> str:
+        # Ordered by source rather than by score, so the same documents always produce the same block
+        blocks = []
+        for doc in sorted(docs, key=_doc_sort_key):
+            source = (doc.metadata or {}).get("source")
+            blocks.append(f"[{source}]\n{doc.page_content}" if source else doc.page_content)
+        return "\n\n".join(blocks)
+
+    def build(self, question: str, docs=None, history: str = "") -> List[BaseMessage]:
+        documents = self.format_documents(docs) if docs else ""
+        tail = f"{history}Question: {question}"
+
+        if self.cache_style == "cache_control":
+            content = [{"type": "text", "text": self.instructions, "cache_control": _CACHE_CONTROL}]
+            if documents:
+                content.append({"type": "text", "text": f"Documents:\n{documents}", "cache_control": _CACHE_CONTROL})
+            system = SystemMessage(content=content)
+        else:
+            system = SystemMessage(content=f"{self.instructions}\n\nDocuments:\n{documents}" if documents else self.instructions)
+
+        self._record(self.instructions + documents, tail)
+        return [system, HumanMessage(content=tail)]
+
+    def _record(self, prefix: str, tail: str):
+        key = hashlib.sha1(prefix.encode("utf-8")).hexdigest()
+        prefix_tokens = estimate_tokens(prefix)
+        with self._lock:
+            self.builds += 1
+            self.prefix_tokens += prefix_tokens
+            self.prompt_tokens += prefix_tokens + estimate_tokens(tail)
+            if key in self._recent:
+                self.prefix_repeats += 1
+                self._recent.move_to_end(key)
+            else:
+                self._recent[key] = True
+                while len(self._recent) > _RECENT_PREFIXES:
+                    self._recent.popitem(last=False)
+
+    def get_stats(self):
+        """Return how much of the assembled prompts is a stable prefix, and how often a prefix repeated."""
+        with self._lock:
+            return {
+                "cache_style": self.cache_style,
+                "prompts": self.builds,
+                "prefix_repeats": self.prefix_repeats,
+                "prefix_token_share": round(self.prefix_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0,
+            }
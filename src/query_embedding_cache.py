@@ -0,0 +1,202 @@
+import atexit
+import base64
+import json
+import os
+import re
+import threading
+import time
+import weakref
+from array import array
+from collections import Counter, OrderedDict
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+# Caches with unsaved entries are saved at exit; held weakly, so a replaced cache is not kept alive
+_open_caches = weakref.WeakSet()
+
+
+def _save_open_caches():
+    for cache in list(_open_caches):
+        try:
+            cache.save()
+        except OSError as e:
+            print(f"Warning: Could not save query embedding cache {cache.cache_path}: {e}")
+
+
+atexit.register(_save_open_caches)
+
+# A query log is rewritten down to its last `tail_bytes` once it grows past this multiple of them
+_LOG_TRIM_FACTOR = 4
+_log_lock = threading.Lock()
+
+
+def _read_tail(log_path: str, tail_bytes: int) -> bytes:
+    """Return the last `tail_bytes` of a log, without the line cut by the seek."""
+    with open(log_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        start = max(0, f.tell() - tail_bytes)
+        f.seek(start)
+        tail = f.read()
+    if start:
+        tail = tail[tail.find(b"\n") + 1:] if b"\n" in tail else b""
+    return tail
+
+
+def append_query_log(log_path: str, query: str, tail_bytes: int = 1 << 20):
+    """
+    Append a query to a query log (one query per line). Once the log exceeds a few times `tail_bytes`,
+    it is rewritten to its last `tail_bytes`, the part `warm_from_log` reads, so it does not grow forever.
+    """
+    with _log_lock:
+        with open(log_path, "ab") as f:
+            f.write((" ".join(query.split()) + "\n").encode("utf-8"))
+            size = f.tell()
+        if size <= _LOG_TRIM_FACTOR * tail_bytes:
+            return
+        tmp_path = log_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_read_tail(log_path, tail_bytes))
+        os.replace(tmp_path, log_path)
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Wraps an embeddings instance with an LRU cache of query text -> vector.
+    Document embeddings pass straight through; only `embed_query` is cached.
+    The cache is namespaced by embedding model and persisted to `cache_dir`.
+    """
+
+    def __init__(self, embeddings: Embeddings, namespace: str, max_entries: int = 2048, cache_dir: str = None, save_every: int = 32):
+        self.embeddings = embeddings
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.save_every = save_every
+        self.cache_path = None
+        if cache_dir:
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", namespace)
+            self.cache_path = os.path.join(cache_dir, f"{safe_name}.json")
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self.hits = 0
+        self.misses = 0
+        self.miss_seconds = 0.0
+
+        self._load()
+        if self.cache_path:
+            _open_caches.add(self)
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return " ".join(text.split())
+
+    def _load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            print(f"Warning: Could not read query embedding cache {self.cache_path}. Starting empty.")
+            return
+        if data.get("namespace") != self.namespace:
+            return
+        for key, encoded in data.get("entries", [])[-self.max_entries:]:
+            vector = array("f")
+            vector.frombytes(base64.b64decode(encoded))
+            self._cache[key] = vector
+        print(f"Loaded {len(self._cache)} cached query embeddings for {self.namespace}")
+
+    def save(self):
+        if not self.cache_path:
+            return
+        with self._lock:
+            entries = [[key, base64.b64encode(vector.tobytes()).decode("ascii")] for key, vector in self._cache.items()]
+            self._unsaved = 0
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"namespace": self.namespace, "entries": entries}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def close(self):
+        """Save the cache and stop saving it at exit. Called when the cache is replaced."""
+        _open_caches.discard(self)
+        if self._unsaved:
+            self.save()
+
+    def _store(self, key: str, vector: List[float]):
+        should_save = False
+        with self._lock:
+            self._cache[key] = array("f", vector)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            self._unsaved += 1
+            should_save = self.cache_path is not None and self._unsaved >= self.save_every
+        if should_save:
+            self.save()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return vector.tolist()
+
+        start = time.perf_counter()
+        result = self.embeddings.embed_query(text)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.misses += 1
+            self.miss_seconds += elapsed
+        self._store(key, result)
+        return result
+
+    def warm(self, queries: List[str]) -> int:
+        """Precompute embeddings for queries not yet cached, in one batch. Returns the number added."""
+        with self._lock:
+            missing = list(dict.fromkeys(key for key in map(self._key, queries) if key and key not in self._cache))
+        if not missing:
+            return 0
+        # The built-in Ollama and OpenAI clients embed queries and documents identically,
+        # so a single batched call is equivalent to one embed_query per text.
+        vectors = self.embeddings.embed_documents(missing)
+        for key, vector in zip(missing, vectors):
+            self._store(key, vector)
+        return len(missing)
+
+    def warm_from_log(self, log_path: str, limit: int = 500, tail_bytes: int = 1 << 20) -> int:
+        """
+        Warm the cache with the most frequent queries from a query log (one query per line).
+        Only the last `tail_bytes` of the log are read, so startup does not grow with the log.
+        """
+        if not log_path or not os.path.exists(log_path):
+            return 0
+        lines = _read_tail(log_path, tail_bytes).decode("utf-8", errors="replace").splitlines()
+        counts = Counter(self._key(line) for line in lines if line.strip())
+        added = self.warm([query for query, _ in counts.most_common(limit)])
+        if added:
+            print(f"Warmed query embedding cache with {added} queries from {log_path}")
+        return added
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            average_miss = self.miss_seconds / self.misses if self.misses else 0.0
+            return {
+                "namespace": self.namespace,
+                "entries": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "average_miss_seconds": average_miss,
+                "saved_seconds": self.hits * average_miss,
+            }
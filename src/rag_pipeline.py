@@ -1,80 +1,586 @@
+import asyncio
+import copy
+import re
+import threading
+import time
+import weakref
 from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import ChatPromptTemplate
+from config_manager import changed_sections
 from llm_factory import LLMFactory
 from document_processor import DocumentProcessor
+from vector_store_factory import VectorStoreFactory
+from query_embedding_cache import CachedQueryEmbeddings, append_query_log
+from conversation_memory import ConversationMemory
+from llm_scheduler import DeadlineExceeded, request_options
+from retrieval_prefetcher import RetrievalPrefetcher
+from fusion_retriever import FusionRetriever
+from pipeline_events import RetrievalEvent, TokenEvent, UsageEvent, TimingEvent, ErrorEvent
+from prompt_assembler import CHATBOT_INSTRUCTIONS, RAG_INSTRUCTIONS, PromptAssembler
 
-class RAGPipeline:
-    def __init__(self, config, handler=None):
+# Speculative work runs behind regular requests when the provider has a scheduler
+PREFETCH_PRIORITY = 10
+
+FOLLOWUP_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "Suggest {count} short follow-up questions the user is likely to ask next. "
+               "Reply with one question per line and nothing else."),
+    ("human", "Question: {question}\n\nAnswer: {answer}"),
+])
+_LIST_MARKER = re.compile(r"^\s*(?:\d+[.)]|[-*\u2022])\s*")
+
+# Pipeline config keys that determine the LLM, and the index (documents, chunks, embeddings and their cache)
+LLM_SECTIONS = frozenset({"mode", "model_name"})
+INDEX_SECTIONS = frozenset({
+    "ingest_docs", "embedding_model_provider", "embedding_model", "chunking_strategies",
+    "chunking_strategies_parameters", "ingestion", "vector_store", "chroma_path", "query_cache",
+})
+
+class PipelineComponents:
+    """
+    One consistent set of the components a request uses. A reload builds a new set and publishes it in a
+    single swap; requests keep the set they started with, and a replaced set is closed once its last request ends.
+    """
+
+    __slots__ = ("config", "llm", "prompt_cache_style", "embeddings", "vector_store", "docstore", "retriever",
+                 "fusion_retriever", "prefetcher", "prompt", "assembler", "chain", "users", "successor")
+
+    def __init__(self, config, llm, prompt_cache_style):
         self.config = config
-        llm_mode = self.config["mode"]
-        llm_model_name = self.config["model_name"]
-        callbacks = [handler] if handler else []
-        self.llm = LLMFactory.create_llm(llm_mode, llm_model_name, callbacks)
+        self.llm = llm
+        self.prompt_cache_style = prompt_cache_style
+        self.embeddings = None
+        self.vector_store = None
+        self.docstore = None
+        self.retriever = None
+        self.fusion_retriever = None
+        self.prefetcher = None
+        self.prompt = None
+        self.assembler = None
         self.chain = None
+        self.users = 0
+        self.successor = None  # set when retired
+
+    def derive(self, config):
+        """Return an unpublished copy for `config` that shares all components until they are rebuilt."""
+        components = PipelineComponents(config, self.llm, self.prompt_cache_style)
+        for name in ("embeddings", "vector_store", "docstore", "retriever", "fusion_retriever", "prefetcher",
+                     "prompt", "assembler", "chain"):
+            setattr(components, name, getattr(self, name))
+        return components
+
+    def close(self):
+        """Release the resources of a retired set that its successor does not share."""
+        successor = self.successor
+        if self.prefetcher and self.prefetcher is not successor.prefetcher:
+            self.prefetcher.shutdown()
+        if self.fusion_retriever and self.fusion_retriever is not successor.fusion_retriever:
+            self.fusion_retriever.shutdown()
+        if self.docstore and self.docstore is not successor.docstore:
+            self.docstore.close()
+        if isinstance(self.embeddings, CachedQueryEmbeddings) and self.embeddings is not successor.embeddings:
+            self.embeddings.close()
+
+
+class RAGPipeline:
+    def __init__(self, config, handler=None):
+        llm_mode = config["mode"]
+        llm_model_name = config["model_name"]
+        # The handler consumes the event stream, so the LLM itself carries no callbacks
+        self.handler = handler
+        self._components = PipelineComponents(
+            config,
+            LLMFactory.create_llm(llm_mode, llm_model_name, []),
+            LLMFactory.get_prompt_cache_style(llm_mode, llm_model_name),
+        )
+        self._components_lock = threading.Lock()
+        self._usage_lock = threading.Lock()
+        self._usage_totals = {"responses": 0, "unreported": 0, "input_tokens": 0, "cached_tokens": 0}
+        self.memory = ConversationMemory.from_config(config)
+        self._reload_lock = threading.Lock()
+
+    # The current components, for callers outside a request; requests use the set they acquired
+
+    @property
+    def config(self):
+        return self._components.config
+
+    @property
+    def llm(self):
+        return self._components.llm
+
+    @property
+    def prompt_cache_style(self):
+        return self._components.prompt_cache_style
+
+    @property
+    def embeddings(self):
+        return self._components.embeddings
+
+    @property
+    def vector_store(self):
+        return self._components.vector_store
+
+    @property
+    def docstore(self):
+        return self._components.docstore
+
+    @property
+    def retriever(self):
+        return self._components.retriever
+
+    @property
+    def fusion_retriever(self):
+        return self._components.fusion_retriever
+
+    @property
+    def prefetcher(self):
+        return self._components.prefetcher
+
+    @property
+    def prompt(self):
+        return self._components.prompt
+
+    @property
+    def assembler(self):
+        return self._components.assembler
+
+    @property
+    def chain(self):
+        return self._components.chain
+
+    def acquire_components(self) -> PipelineComponents:
+        """Return the current components and keep them open until `release_components` is called."""
+        with self._components_lock:
+            components = self._components
+            components.users += 1
+            return components
+
+    def release_components(self, components: PipelineComponents):
+        with self._components_lock:
+            components.users -= 1
+            closing = components.successor is not None and components.users == 0
+        if closing:
+            components.close()
+
+    def _publish(self, components: PipelineComponents):
+        with self._components_lock:
+            previous = self._components
+            self._components = components
+            previous.successor = components
+            closing = previous is not components and previous.users == 0
+        if closing:
+            previous.close()
 
     def setup(self):
-        if self.config.get("ingest_docs"):
-            self._setup_rag_chain()
-        else:
-            self._setup_chatbot_chain()
+        with self._reload_lock:
+            components = self._components.derive(self._components.config)
+            self._build(components, rebuild_llm=False, rebuild_index=True, changed=frozenset())
+            self._publish(components)
 
-    def _setup_rag_chain(self):
-        prompt = self._create_rag_prompt()
-        doc_processor = DocumentProcessor(self.config)
+    def _build(self, components: PipelineComponents, rebuild_llm: bool, rebuild_index: bool, changed):
+        """Rebuild the parts of an unpublished component set that depend on what changed."""
+        config = components.config
+        rag = bool(config.get("ingest_docs"))
+        if rebuild_llm:
+            components.llm = LLMFactory.create_llm(config["mode"], config["model_name"], [])
+            components.prompt_cache_style = LLMFactory.get_prompt_cache_style(config["mode"], config["model_name"])
+
+        rebuild_retrieval = rebuild_llm or "retrieval" in changed
+        if rebuild_index:
+            components.embeddings = components.vector_store = components.docstore = None
+            components.retriever = components.fusion_retriever = None
+            if rag:
+                self._build_index(components)
+            rebuild_retrieval = True
+        if rebuild_retrieval and components.vector_store is not None:
+            components.retriever = components.vector_store.as_retriever()
+            components.fusion_retriever = FusionRetriever.from_config(config, components.vector_store, components.embeddings, components.llm)
+        if rebuild_retrieval or "prefetch" in changed:
+            components.prefetcher = self._create_prefetcher(components)
+        if rebuild_retrieval:
+            self._build_generation(components)
+
+    def _build_index(self, components: PipelineComponents):
+        doc_processor = DocumentProcessor(components.config)
         vector_store = doc_processor.get_vector_store()
+        components.embeddings = doc_processor.get_embeddings()
+        components.docstore = doc_processor.get_docstore()
 
         if vector_store:
-            print(f"Number of documents in vector store: {vector_store._collection.count()}")
+            print(f"Number of documents in vector store: {VectorStoreFactory.count(vector_store)}")
         else:
             print("Vector store is not initialized. RAG functionality will not work.")
-            return
+        components.vector_store = vector_store
 
-        self.chain = RetrievalQA.from_chain_type(
-            llm=self.llm,
-            chain_type="stuff",
-            retriever=vector_store.as_retriever(),
-            chain_type_kwargs={"prompt": prompt},
-            return_source_documents=True,
+    def _create_prefetcher(self, components: PipelineComponents):
+        prefetch_config = components.config.get("prefetch") or {}
+        if components.vector_store is None or not prefetch_config.get("enabled", True):
+            return None
+        # Bound to its component set, so a prefetched result always comes from the components that use it
+        return RetrievalPrefetcher(
+            lambda user_input, session_id: self._prefetch_retrieve(components, user_input, session_id),
+            max_workers=prefetch_config.get("max_workers", 2),
+            wait_timeout=prefetch_config.get("wait_timeout", 1.0),
         )
 
-    def _setup_chatbot_chain(self):
-        prompt = self._create_chatbot_prompt()
-        self.chain = prompt | self.llm
+    def _build_generation(self, components: PipelineComponents):
+        if components.config.get("ingest_docs"):
+            if components.vector_store is None:
+                # Without a vector store, RAG functionality is unavailable
+                components.prompt = components.assembler = components.chain = None
+                return
+            prompt = self._create_rag_prompt()
+            components.assembler = PromptAssembler(RAG_INSTRUCTIONS, cache_style=components.prompt_cache_style)
+            # Stateless chain kept for callers that invoke it directly
+            components.chain = RetrievalQA.from_chain_type(
+                llm=components.llm,
+                chain_type="stuff",
+                retriever=components.retriever,
+                chain_type_kwargs={"prompt": prompt.partial(history="")},
+                return_source_documents=True,
+            )
+        else:
+            prompt = self._create_chatbot_prompt()
+            components.assembler = PromptAssembler(CHATBOT_INSTRUCTIONS, cache_style=components.prompt_cache_style)
+            # Stateless chain kept for callers that invoke it directly
+            components.chain = prompt.partial(history="") | components.llm
+        components.prompt = prompt
+
+    def apply_config(self, config):
+        """
+        Switch the pipeline to a new config, rebuilding only the components whose sections changed.
+        The new components are built while requests keep using the current ones, then published in a single
+        swap. Conversation sessions are kept. Returns the names of the rebuilt components.
+        """
+        with self._reload_lock:
+            current = self._components
+            changed = changed_sections(current.config, config)
+            providers = LLMFactory.changed_providers(current.config, config)
+            rebuild_llm = bool(changed & LLM_SECTIONS) or bool(providers & LLMFactory.get_provider_modes(config["mode"]))
+            rebuild_index = bool(changed & INDEX_SECTIONS) or config.get("embedding_model_provider") in providers
+
+            components = current.derive(config)
+            # The manifest makes an index rebuild incremental: only files whose settings fingerprint changed are re-embedded
+            self._build(components, rebuild_llm, rebuild_index, changed)
+            if "conversation" in changed:
+                self.memory.configure(config)
+            self._publish(components)
+
+        rebuilt = []
+        if rebuild_llm:
+            rebuilt.append("llm")
+        if "conversation" in changed:
+            rebuilt.append("conversation")
+        if rebuild_index:
+            rebuilt.append("index")
+        elif components.retriever is not current.retriever:
+            rebuilt.append("retrieval")
+        if components.prefetcher is not current.prefetcher and not rebuild_index:
+            rebuilt.append("prefetch")
+        return rebuilt
+
+    def follow_config(self, config_manager, overrides=None):
+        """
+        Apply every reload of `config_manager` to this pipeline. `overrides`, such as the selected
+        mode and models, are kept on top of the reloaded file. Returns the subscribed callback.
+        The subscription does not keep the pipeline alive; once it is garbage collected, the callback unsubscribes itself.
+        """
+        overrides = dict(overrides or {})
+        pipeline_ref = weakref.ref(self)
 
+        def on_reload(previous, snapshot):
+            pipeline = pipeline_ref()
+            if pipeline is None:
+                config_manager.unsubscribe(on_reload)
+                return
+            rebuilt = pipeline.apply_config({**copy.deepcopy(snapshot.config), **overrides})
+            print(f"Applied configuration version {snapshot.version}, rebuilt: {', '.join(rebuilt) or 'nothing'}")
+
+        config_manager.subscribe(on_reload)
+        return on_reload
+
+    # The chains use the layout of PromptAssembler, so the instructions are only ever part of the stable system prefix
     def _create_rag_prompt(self):
-        prompt_template = (
-            "You are an intelligent assistant that answers questions based on provided documents.\n"
-            "Use the following context to answer the question at the end.\n"
-            "If you don't know the answer, just say \"I don't know\" rather than making up an answer.\n\n"
-            "Context: {context}\n\n"
-            "Question: {question}\n\n"
-            "Answer:"
-        )
-        return PromptTemplate(
-            template=prompt_template, input_variables=["context", "question"]
-        )
+        return ChatPromptTemplate.from_messages([
+            ("system", RAG_INSTRUCTIONS + "\n\nDocuments:\n{context}"),
+            ("human", "{history}Question: {question}"),
+        ])
 
     def _create_chatbot_prompt(self):
-        return PromptTemplate(
-            template="You are a helpful assistant. Answer the following question.\nQuestion: {query}\nAnswer:",
-            input_variables=["query"],
-        )
+        return ChatPromptTemplate.from_messages([
+            ("system", CHATBOT_INSTRUCTIONS),
+            ("human", "{history}Question: {query}"),
+        ])
 
-    def process_input(self, user_input: str):
-        """Process a single user input and generate a response"""
-        try:
-            if self.chain is None:
-                print("Error: Chat system not properly initialized")
-                return
+    def _format_history(self, session_id):
+        history = self.memory.get_history(session_id)
+        return f"Conversation so far:\n{history}\n\n" if history else ""
 
-            if self.config.get("ingest_docs"):
-                response = self.chain.invoke({"query": user_input})
-                # Response handling is managed by the streaming handler
+    def process_input(self, user_input: str, session_id: str = "default", priority: int = 0, timeout: float = None):
+        """
+        Process a single user input, feed the response to the handler and return the answer.
+        `priority` (lower runs first) and `timeout` apply when the provider has a scheduler.
+        """
+        handler = self.handler
+        if handler:
+            handler.on_llm_start({}, [user_input])
+        answer = []
+        error = None
+        for event in self.stream(user_input, session_id=session_id, priority=priority, timeout=timeout):
+            if type(event) is TokenEvent:
+                answer.append(event.text)
+                if handler:
+                    handler.on_llm_new_token(event.text)
+            elif type(event) is ErrorEvent:
+                error = event.error
+        if error is not None:
+            if handler:
+                handler.on_llm_error(error)
+            if isinstance(error, DeadlineExceeded):
+                print(f"\nRequest dropped: {error}")
             else:
-                self.chain.invoke(user_input)
-                # Response handling is managed by the streaming handler
+                print(f"\nError processing input: {error}")
+            return None
+        if handler:
+            handler.on_llm_end(None)
+        return "".join(answer)
+
+    def _prepare(self, components: PipelineComponents, user_input: str, session_id: str):
+        """Build the prompt messages for a question. Returns (messages, retrieval_question, sources)."""
+        history = self._format_history(session_id)
+        if not components.config.get("ingest_docs"):
+            return components.assembler.build(user_input, history=history), user_input, []
+
+        self._log_query(components, user_input)
+        prefetched = None
+        if components.prefetcher:
+            prefetched = components.prefetcher.take(session_id, user_input, self.memory.get_version(session_id))
+        question, docs = prefetched or self._retrieve(components, user_input, session_id)
+        return components.assembler.build(user_input, docs, history), question, docs
+
+    def _retrieve(self, components: PipelineComponents, user_input: str, session_id: str):
+        # Retrieve with a standalone version of follow-up questions
+        question = self.memory.condense_question(session_id, user_input, components.llm)
+        retriever = components.fusion_retriever or components.retriever
+        docs = retriever.invoke(question)
+        # Child chunks of hierarchical chunking are matched, then expanded to their parent sections
+        return question, components.docstore.expand(docs) if components.docstore else docs
+
+    def _prefetch_retrieve(self, components: PipelineComponents, user_input: str, session_id: str):
+        with request_options(priority=PREFETCH_PRIORITY):
+            return self._retrieve(components, user_input, session_id)
+
+    def prefetch(self, user_input: str, session_id: str = "default"):
+        """
+        Start embedding and vector search for a question that is likely to be asked next,
+        such as partial input or a predictable follow-up. The result is reused if the final
+        question matches; otherwise the prefetch is cancelled when the question arrives.
+        """
+        prefetcher = self.prefetcher
+        if prefetcher is None:
+            return
+        prefetcher.prefetch(session_id, user_input, self.memory.get_version(session_id))
+
+    def suggest_followups(self, session_id: str = "default"):
+        """
+        Ask the LLM for likely follow-up questions to the last turn of a session and prefetch retrieval for the first,
+        so picking it skips the retrieval wait. Returns up to `prefetch.suggest_followups` questions, none when it is 0.
+        """
+        components = self.acquire_components()
+        try:
+            count = (components.config.get("prefetch") or {}).get("suggest_followups", 0)
+            last_turn = self.memory.get_last_turn(session_id)
+            if not count or components.prefetcher is None or last_turn is None:
+                return []
+            question, answer = last_turn
+            try:
+                with request_options(priority=PREFETCH_PRIORITY):
+                    response = (FOLLOWUP_PROMPT | components.llm).invoke({"question": question, "answer": answer, "count": count})
+            except Exception as e:
+                print(f"Warning: Could not suggest follow-up questions: {e}")
+                return []
+            suggestions = []
+            for line in getattr(response, "content", response).splitlines():
+                line = _LIST_MARKER.sub("", line).strip()
+                if line and line not in suggestions:
+                    suggestions.append(line)
+            suggestions = suggestions[:count]
+            if suggestions:
+                components.prefetcher.prefetch(session_id, suggestions[0], self.memory.get_version(session_id))
+            return suggestions
+        finally:
+            self.release_components(components)
+
+    def get_prefetch_stats(self):
+        prefetcher = self.prefetcher
+        return prefetcher.get_stats() if prefetcher else None
+
+    def stream(self, user_input: str, session_id: str = "default", priority: int = 0, timeout: float = None):
+        """
+        Answer a question as an iterator of events: RetrievalEvent, TokenEvent per chunk,
+        then UsageEvent and TimingEvent. Failures are yielded as an ErrorEvent instead of raised.
+        A request uses the components that were current when it started, even if the config is reloaded meanwhile.
+        """
+        components = self.acquire_components()
+        try:
+            yield from self._stream(components, user_input, session_id, priority, timeout)
+        finally:
+            self.release_components(components)
+
+    def _stream(self, components: PipelineComponents, user_input: str, session_id: str, priority: int, timeout: float):
+        start = time.perf_counter()
+        if components.chain is None:
+            yield ErrorEvent(RuntimeError("Chat system not properly initialized"))
+            return
+
+        answer = []
+        usage = None
+        first_token_seconds = None
+        try:
+            # Options are only set around blocking calls, never across a yield
+            with request_options(priority=priority, timeout=timeout):
+                messages, question, sources = self._prepare(components, user_input, session_id)
+            retrieval_seconds = time.perf_counter() - start
+            yield RetrievalEvent(question, sources, retrieval_seconds)
+
+            chunks = iter(components.llm.stream(messages))
+            with request_options(priority=priority, timeout=timeout):
+                # The scheduler slot is taken when the first chunk is requested
+                chunk = next(chunks, None)
+            while chunk is not None:
+                if chunk.usage_metadata:
+                    usage = chunk.usage_metadata
+                text = chunk.content
+                if text:
+                    if first_token_seconds is None:
+                        first_token_seconds = time.perf_counter() - start
+                    answer.append(text)
+                    yield TokenEvent(text)
+                chunk = next(chunks, None)
+
+            with request_options(priority=priority, timeout=timeout):
+                self.memory.add_turn(session_id, user_input, "".join(answer), components.llm)
         except Exception as e:
-            print(f"\nError processing input: {e}")
+            yield ErrorEvent(e)
+            return
+
+        usage_event = self._usage_event(usage)
+        if usage_event:
+            yield usage_event
+        yield TimingEvent(retrieval_seconds, first_token_seconds, time.perf_counter() - start)
+
+    @staticmethod
+    async def _anext(iterator):
+        try:
+            return await iterator.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    async def astream(self, user_input: str, session_id: str = "default", priority: int = 0, timeout: float = None):
+        """Async variant of `stream` yielding the same events."""
+        components = self.acquire_components()
+        try:
+            async for event in self._astream(components, user_input, session_id, priority, timeout):
+                yield event
+        finally:
+            self.release_components(components)
+
+    async def _astream(self, components: PipelineComponents, user_input: str, session_id: str, priority: int, timeout: float):
+        start = time.perf_counter()
+        if components.chain is None:
+            yield ErrorEvent(RuntimeError("Chat system not properly initialized"))
+            return
+
+        answer = []
+        usage = None
+        first_token_seconds = None
+        try:
+            with request_options(priority=priority, timeout=timeout):
+                messages, question, sources = await asyncio.to_thread(self._prepare, components, user_input, session_id)
+            retrieval_seconds = time.perf_counter() - start
+            yield RetrievalEvent(question, sources, retrieval_seconds)
+
+            chunks = components.llm.astream(messages).__aiter__()
+            with request_options(priority=priority, timeout=timeout):
+                chunk = await self._anext(chunks)
+            while chunk is not None:
+                if chunk.usage_metadata:
+                    usage = chunk.usage_metadata
+                text = chunk.content
+                if text:
+                    if first_token_seconds is None:
+                        first_token_seconds = time.perf_counter() - start
+                    answer.append(text)
+                    yield TokenEvent(text)
+                chunk = await self._anext(chunks)
+
+            with request_options(priority=priority, timeout=timeout):
+                await asyncio.to_thread(self.memory.add_turn, session_id, user_input, "".join(answer), components.llm)
+        except Exception as e:
+            yield ErrorEvent(e)
+            return
+
+        usage_event = self._usage_event(usage)
+        if usage_event:
+            yield usage_event
+        yield TimingEvent(retrieval_seconds, first_token_seconds, time.perf_counter() - start)
+
+    def _usage_event(self, usage):
+        if not usage:
+            # The backend reported no usage, e.g. with stream_usage disabled; counted so the ratios stay honest
+            with self._usage_lock:
+                self._usage_totals["unreported"] += 1
+            return None
+        # Providers report prompt tokens served from their cache as input_token_details.cache_read
+        cached_tokens = (usage.get("input_token_details") or {}).get("cache_read") or 0
+        event = UsageEvent(usage.get("input_tokens", 0), usage.get("output_tokens", 0), usage.get("total_tokens", 0), cached_tokens)
+        with self._usage_lock:
+            self._usage_totals["responses"] += 1
+            self._usage_totals["input_tokens"] += event.input_tokens
+            self._usage_totals["cached_tokens"] += cached_tokens
+        return event
+
+    def get_prompt_cache_stats(self):
+        """
+        Return the cached share of prompt tokens reported by the provider, together with the prefix
+        stability of the assembled prompts (useful where the provider does not report cache hits).
+        `unreported` counts responses without usage, which the token figures do not include.
+        """
+        with self._usage_lock:
+            totals = dict(self._usage_totals)
+        totals["cached_token_ratio"] = round(totals["cached_tokens"] / totals["input_tokens"], 3) if totals["input_tokens"] else 0.0
+        assembler = self.assembler
+        if assembler:
+            totals.update(assembler.get_stats())
+        return totals
+
+    def reset_conversation(self, session_id: str = "default"):
+        self.memory.clear(session_id)
+        prefetcher = self.prefetcher
+        if prefetcher:
+            prefetcher.cancel(session_id)
+
+    def _log_query(self, components: PipelineComponents, user_input: str):
+        cache_config = components.config.get("query_cache") or {}
+        query_log = cache_config.get("query_log")
+        if not query_log:
+            return
+        try:
+            append_query_log(query_log, user_input, cache_config.get("warm_tail_bytes", 1 << 20))
+        except OSError as e:
+            print(f"Warning: Could not write to query log {query_log}: {e}")
+
+    def get_retrieval_stats(self):
+        """Return per-mode latency and contribution stats of multi-query/HyDE retrieval, or None if disabled."""
+        fusion_retriever = self.fusion_retriever
+        return fusion_retriever.get_stats() if fusion_retriever else None
+
+    def get_query_cache_stats(self):
+        """Return hit-rate and saved-latency stats of the query embedding cache, or None if disabled."""
+        embeddings = self.embeddings
+        if isinstance(embeddings, CachedQueryEmbeddings):
+            return embeddings.get_stats()
+        return None
 
     def chat(self):
         """Legacy method for compatibility"""
@@ -103,6 +609,7 @@ class RAGPipeline:
                 print("-" * 30)
                 response = self.chain.invoke({"query": question})
                 if self.config.get("ingest_docs"):
+                    print(response["result"])
                     print("\n\n--- Source Documents ---")
                     for doc in response['source_documents']:
                         print(f"  - {doc.metadata['source']}")
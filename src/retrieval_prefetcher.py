@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+
+class RetrievalPrefetcher:
+    """
+    Runs retrieval speculatively in background threads, keyed by session and normalized query.
+    A later request for the same key reuses the result; superseded prefetches are cancelled.
+    A prefetch runs at low priority, so a request never waits for one that has not started,
+    and waits at most `wait_timeout` seconds for one that is running.
+    """
+
+    def __init__(self, retrieve_fn, max_workers: int = 2, max_entries: int = 32, wait_timeout: float = 1.0):
+        self.retrieve_fn = retrieve_fn
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="retrieval-prefetch")
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.prefetched = 0
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+        self.late = 0
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def prefetch(self, session_id, query: str, version=None):
+        """
+        Start retrieval for `query` unless it is already in flight.
+        Pending prefetches of the same session for other queries are cancelled.
+        """
+        key = (session_id, self._normalize(query), version)
+        if not key[1]:
+            return None
+        with self._lock:
+            if self._closed:
+                return None
+            future = self._futures.get(key)
+            if future is not None:
+                return future
+            for other_key in [k for k in self._futures if k[0] == session_id]:
+                self._cancel(other_key)
+            future = self._executor.submit(self.retrieve_fn, query, session_id)
+            self._futures[key] = future
+            self.prefetched += 1
+            while len(self._futures) > self.max_entries:
+                self._cancel(next(iter(self._futures)))
+            return future
+
+    def _cancel(self, key):
+        future = self._futures.pop(key)
+        # A running retrieval cannot be interrupted; its result is simply dropped
+        if future.cancel():
+            self.cancelled += 1
+
+    def take(self, session_id, query: str, version=None):
+        """
+        Return the prefetched result for `query`, or None if the caller should retrieve itself: on a miss,
+        when the prefetch had not started yet, or when it is still running after `wait_timeout` seconds.
+        """
+        key = (session_id, self._normalize(query), version)
+        with self._lock:
+            future = self._futures.pop(key, None)
+            for other_key in [k for k in self._futures if k[0] == session_id]:
+                self._cancel(other_key)
+            if future is None or future.cancelled():
+                self.misses += 1
+                return None
+            if future.cancel():
+                # Not started: retrieving inline at the caller's priority is faster than waiting at prefetch priority
+                self.cancelled += 1
+                self.misses += 1
+                return None
+        try:
+            result = future.result(timeout=self.wait_timeout)
+        except TimeoutError:
+            with self._lock:
+                self.late += 1
+            return None
+        except Exception as e:
+            print(f"Warning: Prefetched retrieval failed, retrieving again: {e}")
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def cancel(self, session_id=None):
+        with self._lock:
+            for key in [k for k in self._futures if session_id is None or k[0] == session_id]:
+                self._cancel(key)
+
+    def shutdown(self):
+        """Cancel pending prefetches and release the worker threads once running retrievals finish."""
+        with self._lock:
+            self._closed = True
+            for key in list(self._futures):
+                self._cancel(key)
+        self._executor.shutdown(wait=False)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._futures),
+                "prefetched": self.prefetched,
+                "hits": self.hits,
+                "misses": self.misses,
+                "cancelled": self.cancelled,
+                "late": self.late,
+            }
@@ -0,0 +1,57 @@
+import argparse
+import json
+import sys
+
+from config_manager import ConfigManager
+from index_snapshot import SnapshotError, export_snapshot, import_snapshot, read_snapshot_info
+
+
+def build_config(args):
+    config = dict(ConfigManager(args.config).get_config())
+    defaults = config.get("defaults") or {}
+    config["embedding_model_provider"] = args.embedding_provider or defaults.get("embedding_model_provider")
+    config["embedding_model"] = args.embedding_model or defaults.get("embedding_model")
+    if args.chroma_path:
+        config["chroma_path"] = args.chroma_path
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import vector index snapshots.")
+    parser.add_argument("--config", default="config/config.yml", help="Configuration file")
+    parser.add_argument("--embedding-provider", help="Embedding provider (default: from config defaults)")
+    parser.add_argument("--embedding-model", help="Embedding model (default: from config defaults)")
+    parser.add_argument("--chroma-path", help="Vector store directory (default: chromadb)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write a snapshot of the local index")
+    export_parser.add_argument("output", help="Snapshot archive to write, e.g. snapshots/index.tar.gz")
+    export_parser.add_argument("--since", type=int, help="Only include changes after this index version (delta snapshot)")
+
+    import_parser = subparsers.add_parser("import", help="Load a snapshot into the local index")
+    import_parser.add_argument("snapshots", nargs="+", help="Snapshot archives, applied in order (a full snapshot, then deltas)")
+
+    info_parser = subparsers.add_parser("info", help="Show the metadata of a snapshot")
+    info_parser.add_argument("snapshot")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        info = read_snapshot_info(args.snapshot)
+        info["removed"] = len(info.get("removed") or {})
+        print(json.dumps(info, indent=2))
+        return
+
+    config = build_config(args)
+    try:
+        if args.command == "export":
+            export_snapshot(config, args.output, since=args.since)
+        else:
+            for path in args.snapshots:
+                import_snapshot(config, path)
+    except SnapshotError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
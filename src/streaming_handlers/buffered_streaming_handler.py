@@ -0,0 +1,91 @@
+import io
+import time
+from abc import abstractmethod
+from langchain.callbacks.base import BaseCallbackHandler
+
+
+class BufferedStreamingHandler(BaseCallbackHandler):
+    """
+    Base class for streaming handlers that render in batches.
+    Tokens are collected in a buffer and handed to `_render` when either
+    `flush_interval` seconds have passed or `flush_size` characters are pending.
+    """
+
+    def __init__(self, flush_interval: float = 0.05, flush_size: int = 256):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.reset()
+
+    def reset(self):
+        self._buffer = io.StringIO()
+        self._pending = []
+        self._pending_size = 0
+        self._last_flush = time.perf_counter()
+        self._start_time = None
+        self._end_time = None
+        self.render_time = 0.0
+        self.render_count = 0
+        self.token_count = 0
+
+    @property
+    def text(self) -> str:
+        """Full text streamed so far, including tokens not yet rendered."""
+        if self._pending:
+            return self._buffer.getvalue() + "".join(self._pending)
+        return self._buffer.getvalue()
+
+    @abstractmethod
+    def _render(self, new_text: str):
+        """Render `new_text`, which was appended to the buffer since the last flush."""
+        pass
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self._start_time = time.perf_counter()
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self._start_time = time.perf_counter()
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if self._start_time is None:
+            self._start_time = time.perf_counter()
+        self._pending.append(token)
+        self._pending_size += len(token)
+        self.token_count += 1
+        if self._pending_size >= self.flush_size or time.perf_counter() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def on_llm_end(self, response, **kwargs):
+        self.flush()
+        self._end_time = time.perf_counter()
+
+    def on_llm_error(self, error, **kwargs):
+        self.flush()
+        self._end_time = time.perf_counter()
+
+    def flush(self):
+        if not self._pending:
+            return
+        new_text = "".join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        self._buffer.write(new_text)
+
+        start = time.perf_counter()
+        self._render(new_text)
+        self._last_flush = time.perf_counter()
+        self.render_time += self._last_flush - start
+        self.render_count += 1
+
+    def get_metrics(self):
+        """Return render time versus generation time for the current response."""
+        if self._start_time is None:
+            generation_time = 0.0
+        else:
+            generation_time = (self._end_time or time.perf_counter()) - self._start_time
+        return {
+            "tokens": self.token_count,
+            "renders": self.render_count,
+            "render_time": self.render_time,
+            "generation_time": generation_time,
+            "render_ratio": self.render_time / generation_time if generation_time else 0.0,
+        }
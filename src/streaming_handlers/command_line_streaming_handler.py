@@ -1,12 +1,22 @@
-from langchain.callbacks.base import BaseCallbackHandler
+import sys
+from .buffered_streaming_handler import BufferedStreamingHandler
 
-class CommandLineStreamingHandler(BaseCallbackHandler):
-    def __init__(self):
-        self.buffer = ""
+class CommandLineStreamingHandler(BufferedStreamingHandler):
+    def __init__(self, flush_interval: float = 0.05, flush_size: int = 64):
+        super().__init__(flush_interval=flush_interval, flush_size=flush_size)
 
-    def on_llm_new_token(self, token: str, **kwargs):
-        print(token, end="", flush=True)  # prints tokens live
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.reset()
+        super().on_llm_start(serialized, prompts, **kwargs)
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.reset()
+        super().on_chat_model_start(serialized, messages, **kwargs)
+
+    def _render(self, new_text: str):
+        sys.stdout.write(new_text)
+        sys.stdout.flush()
 
     def on_llm_end(self, response, **kwargs):
+        super().on_llm_end(response, **kwargs)
         print("\n" + "-" * 30)  # optional line after complete output
-
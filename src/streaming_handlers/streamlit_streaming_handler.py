@@ -1,20 +1,19 @@
-from langchain.callbacks.base import BaseCallbackHandler
-import streamlit as st
+from .buffered_streaming_handler import BufferedStreamingHandler
 
-class StreamlitStreamingHandler(BaseCallbackHandler):
-    def __init__(self, container=None):
+class StreamlitStreamingHandler(BufferedStreamingHandler):
+    def __init__(self, container=None, flush_interval: float = 0.1, flush_size: int = 512):
+        super().__init__(flush_interval=flush_interval, flush_size=flush_size)
         self.container = container
-        self.text = ""
         self._text_placeholder = None
 
     def set_container(self, container):
         self.container = container
-        self.text = ""  # Reset text for new conversation
+        self.reset()  # Reset text for new conversation
         self._text_placeholder = None  # Reset placeholder as well
 
-    def on_llm_new_token(self, token: str, **kwargs) -> None:
-        self.text += token
+    def _render(self, new_text: str):
         if self.container:
             if not self._text_placeholder:
                 self._text_placeholder = self.container.empty()
-            self._text_placeholder.markdown(self.text)
+            # Markdown has to be re-rendered as a whole, so this only runs once per flush
+            self._text_placeholder.markdown(self._buffer.getvalue())
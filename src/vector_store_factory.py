@@ -0,0 +1,112 @@
+import os
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from vector_stores import NumpyVectorStore
+
+CHROMA_PATH = "chromadb"
+
+
+def _create_chroma(path, embeddings, backend_config):
+    return Chroma(persist_directory=path, embedding_function=embeddings)
+
+
+def _create_numpy(path, embeddings, backend_config):
+    return NumpyVectorStore(
+        os.path.join(path, "numpy_store"),
+        embedding_function=embeddings,
+        dtype=backend_config.get("dtype", "float32"),
+        compact_ratio=backend_config.get("compact_ratio", 0.5),
+    )
+
+
+class VectorStoreFactory:
+    """
+    Creates the configured vector store backend and performs the few operations that go beyond the
+    LangChain VectorStore interface (counting, metadata deletes and raw vector transfer) for each backend.
+    """
+
+    _backends = {
+        "chroma": _create_chroma,
+        "numpy": _create_numpy,
+    }
+
+    @staticmethod
+    def get_backend_name(config):
+        return (config.get("vector_store") or {}).get("backend", "chroma")
+
+    @staticmethod
+    def create_vector_store(config, embeddings=None):
+        """Open the backend selected by `vector_store.backend` under `chroma_path`; embeddings may be None for raw transfers."""
+        backend = VectorStoreFactory.get_backend_name(config)
+        create = VectorStoreFactory._backends.get(backend)
+        if not create:
+            raise ValueError(f"Unsupported vector store backend: {backend}")
+        return create(config.get("chroma_path", CHROMA_PATH), embeddings, config.get("vector_store") or {})
+
+    @staticmethod
+    def register_backend(name, create):
+        """Register `create(path, embeddings, backend_config)` returning a LangChain VectorStore."""
+        VectorStoreFactory._backends[name] = create
+
+    @staticmethod
+    def exists(config):
+        """Return whether the configured backend already holds a persisted store."""
+        path = config.get("chroma_path", CHROMA_PATH)
+        if VectorStoreFactory.get_backend_name(config) == "numpy":
+            return os.path.exists(os.path.join(path, "numpy_store", "meta.json"))
+        return os.path.exists(os.path.join(path, "chroma.sqlite3"))
+
+    @staticmethod
+    def count(vector_store):
+        if isinstance(vector_store, NumpyVectorStore):
+            return vector_store.count()
+        return vector_store._collection.count()
+
+    @staticmethod
+    def delete_where_source(vector_store, source):
+        if isinstance(vector_store, NumpyVectorStore):
+            vector_store.delete_where("source", source)
+        else:
+            vector_store._collection.delete(where={"source": source})
+
+    @staticmethod
+    def ids_for_source(vector_store, source):
+        if isinstance(vector_store, NumpyVectorStore):
+            return vector_store.ids_where("source", source)
+        return vector_store._collection.get(where={"source": source}, include=[])["ids"]
+
+    @staticmethod
+    def search_by_vectors(vector_store, embeddings, k):
+        """Return the k nearest documents of each query vector, searched in a single call to the backend."""
+        if isinstance(vector_store, NumpyVectorStore):
+            return vector_store.similarity_search_by_vectors(embeddings, k)
+        if not len(embeddings):
+            return []
+        batch = vector_store._collection.query(query_embeddings=list(embeddings), n_results=k, include=["documents", "metadatas"])
+        return [
+            [Document(id=doc_id, page_content=text, metadata=metadata or {}) for doc_id, text, metadata in zip(ids, texts, metadatas)]
+            for ids, texts, metadatas in zip(batch["ids"], batch["documents"], batch["metadatas"])
+        ]
+
+    @staticmethod
+    def get_records(vector_store, ids):
+        """Return (ids, documents, metadatas, embeddings) of the stored ids."""
+        if isinstance(vector_store, NumpyVectorStore):
+            records = vector_store.get(ids)
+            found = [doc_id for doc_id in ids if doc_id in records]
+            return (found, [records[doc_id][0] for doc_id in found], [records[doc_id][1] for doc_id in found],
+                    [records[doc_id][2] for doc_id in found])
+        batch = vector_store._collection.get(ids=list(ids), include=["embeddings", "documents", "metadatas"])
+        return batch["ids"], batch["documents"], batch["metadatas"], batch["embeddings"]
+
+    @staticmethod
+    def upsert_records(vector_store, ids, documents, metadatas, embeddings):
+        if isinstance(vector_store, NumpyVectorStore):
+            vector_store.add_vectors(ids, embeddings, documents, metadatas)
+        else:
+            vector_store._collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    @staticmethod
+    def delete_ids(vector_store, ids):
+        if ids:
+            vector_store.delete(ids=list(ids))
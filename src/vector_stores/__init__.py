@@ -0,0 +1,3 @@
+from .numpy_store import NumpyVectorStore
+
+__all__ = ["NumpyVectorStore"]
@@ -0,0 +1,327 @@
+import json
+import os
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+_DTYPES = {"float32": np.float32, "float16": np.float16}
+# Rows scored per matrix multiply; bounds the temporary score matrix for large stores
+_BLOCK_ROWS = 65536
+_INITIAL_CAPACITY = 1024
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process vector store for small and medium corpora.
+    Normalized embeddings live in a memory-mapped float32 or float16 matrix, so cosine similarity is a matrix
+    multiply and top-k is taken with argpartition. Additions and deletions are appended to a JSON-lines log
+    that is replayed on load; the matrix and log are compacted once most rows are deleted.
+    """
+
+    def __init__(self, path: str, embedding_function: Optional[Embeddings] = None, dtype: str = "float32",
+                 compact_ratio: float = 0.5):
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        self.path = path
+        self.embedding_function = embedding_function
+        self.compact_ratio = compact_ratio
+        self._dtype = dtype
+        self._lock = threading.RLock()
+        self._matrix = None
+        self._dim = None
+        self._rows = 0
+        self._ids = []  # row -> id, None for deleted rows
+        self._documents = []  # row -> (text, metadata)
+        self._id_rows = {}
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return self.embedding_function
+
+    # Storage
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        meta_path = self._file("meta.json")
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        self._dim = meta["dim"]
+        self._dtype = meta["dtype"]
+
+        log_path = self._file("log.jsonl")
+        if os.path.exists(log_path):
+            valid_bytes = 0
+            with open(log_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        record = None
+                    if record is None:
+                        # A torn final line from an interrupted write; its vectors were never acknowledged
+                        break
+                    valid_bytes += len(line)
+                    if record["op"] == "add":
+                        self._set_row(record["row"], record["id"], record["text"], record["metadata"])
+                    elif record["op"] == "delete":
+                        self._clear_row(record["id"])
+            if valid_bytes < os.path.getsize(log_path):
+                # Cut the torn line off, or records appended after it would be lost on the next replay
+                with open(log_path, "r+b") as f:
+                    f.truncate(valid_bytes)
+                    f.flush()
+                    os.fsync(f.fileno())
+        self._open_matrix(max(_INITIAL_CAPACITY, self._rows))
+
+    def _open_matrix(self, capacity):
+        dtype = _DTYPES[self._dtype]
+        matrix_path = self._file("vectors.bin")
+        size = capacity * self._dim * np.dtype(dtype).itemsize
+        if not os.path.exists(matrix_path) or os.path.getsize(matrix_path) < size:
+            with open(matrix_path, "ab") as f:
+                f.truncate(size)
+        capacity = os.path.getsize(matrix_path) // (self._dim * np.dtype(dtype).itemsize)
+        self._matrix = np.memmap(matrix_path, dtype=dtype, mode="r+", shape=(capacity, self._dim))
+
+    def _set_row(self, row, doc_id, text, metadata):
+        while len(self._ids) <= row:
+            self._ids.append(None)
+            self._documents.append(None)
+        previous = self._id_rows.get(doc_id)
+        if previous is not None:
+            self._ids[previous] = None
+            self._documents[previous] = None
+        self._ids[row] = doc_id
+        self._documents[row] = (text, metadata)
+        self._id_rows[doc_id] = row
+        self._rows = max(self._rows, row + 1)
+
+    def _clear_row(self, doc_id):
+        row = self._id_rows.pop(doc_id, None)
+        if row is not None:
+            self._ids[row] = None
+            self._documents[row] = None
+
+    def _append_log(self, records):
+        with open(self._file("log.jsonl"), "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _ensure_dim(self, dim):
+        if self._dim is None:
+            self._dim = dim
+            with open(self._file("meta.json"), "w") as f:
+                json.dump({"dim": dim, "dtype": self._dtype}, f)
+            self._open_matrix(_INITIAL_CAPACITY)
+        elif dim != self._dim:
+            raise ValueError(f"Embedding dimension {dim} does not match the store's dimension {self._dim}")
+
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add_vectors(self, ids: Sequence[str], embeddings, texts: Sequence[str], metadatas: Sequence[Optional[dict]]):
+        """Add or replace records with precomputed embeddings."""
+        if not ids:
+            return []
+        vectors = self._normalize(embeddings)
+        with self._lock:
+            self._ensure_dim(vectors.shape[1])
+            start = self._rows
+            end = start + len(ids)
+            if end > self._matrix.shape[0]:
+                self._matrix.flush()
+                self._open_matrix(max(end, self._matrix.shape[0] * 2))
+            self._matrix[start:end] = vectors.astype(self._matrix.dtype)
+            self._matrix.flush()
+            # Vectors are written before the log, so a replayed log never points at unwritten rows
+            records = [
+                {"op": "add", "id": doc_id, "row": start + i, "text": text, "metadata": metadata or {}}
+                for i, (doc_id, text, metadata) in enumerate(zip(ids, texts, metadatas))
+            ]
+            self._append_log(records)
+            for record in records:
+                self._set_row(record["row"], record["id"], record["text"], record["metadata"])
+            # Replacing an id leaves its old row behind
+            self._maybe_compact()
+        return list(ids)
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        if self.embedding_function is None:
+            raise ValueError("An embedding function is required to add texts")
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        return self.add_vectors(ids, self.embedding_function.embed_documents(texts), texts, metadatas)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        with self._lock:
+            present = [doc_id for doc_id in ids if doc_id in self._id_rows]
+            if not present:
+                return False
+            self._append_log([{"op": "delete", "id": doc_id} for doc_id in present])
+            for doc_id in present:
+                self._clear_row(doc_id)
+            self._maybe_compact()
+        return True
+
+    def _maybe_compact(self):
+        if self._rows > _INITIAL_CAPACITY and len(self._id_rows) < self._rows * (1 - self.compact_ratio):
+            self.compact()
+
+    def ids_where(self, key: str, value) -> List[str]:
+        """Return the ids of records whose metadata `key` equals `value`."""
+        with self._lock:
+            return [doc_id for doc_id, row in self._id_rows.items() if self._documents[row][1].get(key) == value]
+
+    def delete_where(self, key: str, value) -> int:
+        """Delete every record whose metadata `key` equals `value`."""
+        ids = self.ids_where(key, value)
+        self.delete(ids)
+        return len(ids)
+
+    def compact(self):
+        """Rewrite the matrix and log without deleted rows."""
+        with self._lock:
+            if self._dim is None:
+                return
+            live = sorted(self._id_rows.values())
+            vectors = np.array(self._matrix[live]) if live else np.zeros((0, self._dim), dtype=self._matrix.dtype)
+            records = [
+                {"op": "add", "id": self._ids[row], "row": i, "text": self._documents[row][0], "metadata": self._documents[row][1]}
+                for i, row in enumerate(live)
+            ]
+            dtype = _DTYPES[self._dtype]
+            capacity = max(_INITIAL_CAPACITY, len(live))
+            matrix_tmp = self._file("vectors.bin.tmp")
+            compacted = np.memmap(matrix_tmp, dtype=dtype, mode="w+", shape=(capacity, self._dim))
+            compacted[:len(live)] = vectors
+            compacted.flush()
+            del compacted
+            with open(self._file("log.jsonl.tmp"), "w") as f:
+                for record in records:
+                    f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._matrix = None
+            os.replace(matrix_tmp, self._file("vectors.bin"))
+            os.replace(self._file("log.jsonl.tmp"), self._file("log.jsonl"))
+            self._ids, self._documents, self._id_rows, self._rows = [], [], {}, 0
+            for record in records:
+                self._set_row(record["row"], record["id"], record["text"], record["metadata"])
+            self._open_matrix(capacity)
+
+    # Queries
+
+    def count(self) -> int:
+        return len(self._id_rows)
+
+    def get(self, ids: Sequence[str]) -> Dict[str, Tuple[str, dict, List[float]]]:
+        """Return id -> (text, metadata, normalized embedding) for the stored ids."""
+        with self._lock:
+            result = {}
+            for doc_id in ids:
+                row = self._id_rows.get(doc_id)
+                if row is not None:
+                    text, metadata = self._documents[row]
+                    result[doc_id] = (text, metadata, self._matrix[row].astype(np.float32).tolist())
+            return result
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        return [Document(id=doc_id, page_content=text, metadata=metadata) for doc_id, (text, metadata, _) in self.get(ids).items()]
+
+    def top_k(self, queries, k: int) -> List[List[Tuple[Document, float]]]:
+        """
+        Return the best (document, score) pairs for each query vector, scoring blocks of rows with one matrix
+        multiply and keeping per-block candidates with argpartition.
+        """
+        if not len(queries):
+            return []
+        queries = self._normalize(queries)
+        with self._lock:
+            if not self._id_rows or k <= 0:
+                return [[] for _ in range(len(queries))]
+            # Compaction swaps in new row lists and a new matrix, so these references stay consistent with each other;
+            # other writes only append rows past `rows` or clear rows, which are then skipped
+            matrix, rows, ids, documents = self._matrix, self._rows, self._ids, self._documents
+            alive = np.fromiter((doc_id is not None for doc_id in ids[:rows]), dtype=bool, count=rows)
+
+        candidate_rows = []
+        candidate_scores = []
+        for start in range(0, rows, _BLOCK_ROWS):
+            end = min(start + _BLOCK_ROWS, rows)
+            scores = np.asarray(matrix[start:end], dtype=np.float32) @ queries.T
+            scores[~alive[start:end]] = -np.inf
+            block_k = min(k, end - start)
+            best = np.argpartition(-scores, block_k - 1, axis=0)[:block_k]
+            candidate_rows.append(best + start)
+            candidate_scores.append(np.take_along_axis(scores, best, axis=0))
+        candidate_rows = np.concatenate(candidate_rows)
+        candidate_scores = np.concatenate(candidate_scores)
+
+        results = []
+        with self._lock:
+            for q in range(len(queries)):
+                hits = []
+                for i in np.argsort(-candidate_scores[:, q])[:k]:
+                    row, score = int(candidate_rows[i, q]), float(candidate_scores[i, q])
+                    doc_id = ids[row]
+                    if doc_id is None or not np.isfinite(score):
+                        continue
+                    text, metadata = documents[row]
+                    hits.append((Document(id=doc_id, page_content=text, metadata=metadata), score))
+                results.append(hits)
+        return results
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        return self.top_k([embedding], k)[0]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self.embedding_function.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def similarity_search_by_vectors(self, embeddings, k: int = 4) -> List[List[Document]]:
+        """Search many query vectors with one pass over the matrix."""
+        return [[doc for doc, _ in hits] for hits in self.top_k(embeddings, k)]
+
+    def batch_similarity_search(self, queries: List[str], k: int = 4) -> List[List[Document]]:
+        """Search many queries with one embedding call and one pass over the matrix."""
+        if not queries:
+            return []
+        return self.similarity_search_by_vectors(self.embedding_function.embed_documents(queries), k)
+
+    def _select_relevance_score_fn(self):
+        # Scores are cosine similarities in [-1, 1]
+        return lambda score: (score + 1.0) / 2.0
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, path: str = "numpy_store", **kwargs: Any) -> "NumpyVectorStore":
+        store = cls(path, embedding_function=embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Modules under src/ import each other as top-level modules, as when the apps are run from src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# Importing the LLM factory imports litellm, which otherwise fetches its model cost map over the network
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
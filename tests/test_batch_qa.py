@@ -0,0 +1,122 @@
+import json
+import time
+from types import SimpleNamespace
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+
+from batch_qa import BatchAnswerer, load_completed, read_questions
+
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return AIMessage(content=f"answer to {prompt}")
+
+
+class FakeAssembler:
+    def build(self, question, docs=None, history=""):
+        return question
+
+
+class SlowRetriever:
+    def invoke(self, question):
+        time.sleep(0.05)
+        return [Document(page_content="text", metadata={"source": "doc.txt"})]
+
+
+class FakePipeline:
+    def __init__(self, config=None, **components):
+        self.components = SimpleNamespace(
+            config=config or {}, chain=object(), llm=FakeLLM(), assembler=FakeAssembler(),
+            vector_store=None, fusion_retriever=None, embeddings=None, docstore=None,
+        )
+        vars(self.components).update(components)
+
+    def acquire_components(self):
+        return self.components
+
+    def release_components(self, components):
+        pass
+
+
+def _write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines))
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_read_questions_numbers_items_without_id(tmp_path):
+    questions = tmp_path / "questions.jsonl"
+    _write_lines(questions, ['{"id": "a", "question": "First?"}', "", '"Second?"'])
+    assert read_questions(str(questions)) == [("a", "First?"), (3, "Second?")]
+
+
+def test_load_completed_drops_torn_line_and_failed_records(tmp_path):
+    output = tmp_path / "answers.jsonl"
+    output.write_text(
+        '{"id": 1, "answer": "ok"}\n'
+        '{"id": 2, "error": "timeout"}\n'
+        '{"id": 3, "answer": "cut o'
+    )
+    assert load_completed(str(output)) == {1}
+    assert _records(output) == [{"id": 1, "answer": "ok"}]
+
+
+def test_resume_retries_failed_records_only(tmp_path):
+    questions = tmp_path / "questions.jsonl"
+    output = tmp_path / "answers.jsonl"
+    _write_lines(questions, ['{"id": 1, "question": "One?"}', '{"id": 2, "question": "Two?"}'])
+    output.write_text('{"id": 1, "answer": "kept"}\n{"id": 2, "error": "timeout"}\n')
+    pipeline = FakePipeline()
+
+    stats = BatchAnswerer(pipeline).run(str(questions), str(output))
+
+    assert stats["resumed"] == 1 and stats["answered"] == 1
+    assert pipeline.components.llm.prompts == ["Two?"]
+    assert [(record["id"], record.get("answer")) for record in _records(output)] == [(1, "kept"), (2, "answer to Two?")]
+
+
+def test_duplicate_questions_are_answered_once(tmp_path):
+    questions = tmp_path / "questions.jsonl"
+    output = tmp_path / "answers.jsonl"
+    _write_lines(questions, ['{"id": "a", "question": "Same  question?"}', '{"id": "b", "question": "Same question?"}'])
+    pipeline = FakePipeline()
+
+    stats = BatchAnswerer(pipeline).run(str(questions), str(output))
+
+    assert stats["unique"] == 1
+    assert len(pipeline.components.llm.prompts) == 1
+    first, duplicate = _records(output)
+    assert "duplicate_of" not in first
+    assert duplicate["duplicate_of"] == "a" and duplicate["answer"] == first["answer"]
+
+
+def test_restart_overwrites_the_output(tmp_path):
+    questions = tmp_path / "questions.jsonl"
+    output = tmp_path / "answers.jsonl"
+    _write_lines(questions, ['{"id": 1, "question": "One?"}'])
+    output.write_text('{"id": 1, "answer": "stale"}\n{"id": 9, "answer": "other"}\n')
+
+    BatchAnswerer(FakePipeline()).run(str(questions), str(output), resume=False)
+
+    assert [(record["id"], record["answer"]) for record in _records(output)] == [(1, "answer to One?")]
+
+
+def test_expanded_retrieval_is_reported_as_retrieval(tmp_path):
+    questions = tmp_path / "questions.jsonl"
+    output = tmp_path / "answers.jsonl"
+    _write_lines(questions, ['{"id": 1, "question": "One?"}'])
+    pipeline = FakePipeline({"ingest_docs": ["docs"]}, vector_store=object(), fusion_retriever=SlowRetriever())
+
+    BatchAnswerer(pipeline).run(str(questions), str(output))
+
+    (record,) = _records(output)
+    assert record["sources"] == ["doc.txt"]
+    assert record["retrieval_seconds"] >= 0.05
+    assert record["generation_seconds"] < 0.05
@@ -0,0 +1,90 @@
+from langchain_core.runnables import RunnableLambda
+
+import conversation_memory
+from conversation_memory import ConversationMemory, estimate_tokens
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _history_tokens(memory, session_id):
+    return estimate_tokens(memory.get_history(session_id))
+
+
+def test_history_stays_within_token_budget():
+    memory = ConversationMemory(history_token_budget=200, summary_token_budget=50)
+    for i in range(30):
+        memory.add_turn("s", f"question {i} " * 5, f"answer {i} " * 20)
+        # The summary prefix and role labels add a few tokens on top of the budgeted text
+        assert _history_tokens(memory, "s") <= 200 + 20
+
+    history = memory.get_history("s")
+    assert history.startswith("Summary of earlier conversation: ...")
+    assert "answer 29" in history
+    assert "question 0 " not in history
+    assert memory.get_last_turn("s") == ("question 29 " * 5, "answer 29 " * 20)
+    assert memory.get_version("s") == 30
+
+
+def test_llm_summary_is_clipped_to_its_budget():
+    summaries = []
+
+    def summarize(prompt_value):
+        summaries.append(prompt_value.to_string())
+        return "summary " * 500
+
+    memory = ConversationMemory(history_token_budget=100, summary_token_budget=20)
+    for i in range(5):
+        memory.add_turn("s", f"question {i}", "answer " * 40, llm=RunnableLambda(summarize))
+
+    assert summaries
+    summary = memory.get_history("s").splitlines()[0][len("Summary of earlier conversation: "):]
+    assert estimate_tokens(summary) <= 20
+    assert _history_tokens(memory, "s") <= 100 + 20
+
+
+def test_failed_summary_falls_back_to_the_transcript():
+    def fail(prompt_value):
+        raise RuntimeError("model unavailable")
+
+    memory = ConversationMemory(history_token_budget=30, summary_token_budget=20)
+    memory.add_turn("s", "first question", "first answer " * 8, llm=RunnableLambda(fail))
+    memory.add_turn("s", "second question", "second answer", llm=RunnableLambda(fail))
+    assert "first answer" in memory.get_history("s").splitlines()[0]
+
+
+def test_least_recently_used_sessions_are_evicted(monkeypatch):
+    monkeypatch.setattr(conversation_memory.time, "monotonic", Clock())
+    memory = ConversationMemory(max_sessions=2)
+    memory.add_turn("a", "q", "a")
+    memory.add_turn("b", "q", "b")
+    # Reading a session marks it as recently used
+    assert memory.get_history("a")
+    memory.add_turn("c", "q", "c")
+
+    assert memory.get_history("b") == ""
+    assert memory.get_history("a") and memory.get_history("c")
+    assert memory.get_stats() == {"sessions": 2, "turns": 2}
+
+
+def test_idle_sessions_expire(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(conversation_memory.time, "monotonic", clock)
+    memory = ConversationMemory(session_ttl=60)
+    memory.add_turn("idle", "q", "a")
+    clock.now += 30
+    memory.add_turn("active", "q", "a")
+    clock.now += 40
+    # "idle" was last used 70 seconds ago, "active" 40 seconds ago
+    assert memory.get_history("active")
+    assert memory.get_history("idle") == ""
+    assert memory.get_stats()["sessions"] == 1
+
+    memory.configure({"conversation": {"session_ttl": 0}})
+    clock.now += 10_000
+    assert memory.get_history("active")
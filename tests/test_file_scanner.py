@@ -0,0 +1,100 @@
+import os
+
+from langchain_core.embeddings import Embeddings
+
+import document_processor
+from document_processor import DocumentProcessor
+from file_scanner import hash_file, scan_paths
+from llm_factory import LLMFactory
+
+
+def _write(root, rel_path, text="text"):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def _scanned(paths, root, **kwargs):
+    return sorted(os.path.relpath(scanned.path, root) for scanned in scan_paths(paths, **kwargs))
+
+
+def test_include_and_exclude_patterns(tmp_path):
+    for rel_path in ["a.md", "notes/b.md", "notes/c.txt", "node_modules/d.md", "notes/drafts/e.md"]:
+        _write(tmp_path, rel_path)
+
+    assert _scanned([str(tmp_path)], tmp_path, exclude=["node_modules", "drafts"]) == ["a.md", "notes/b.md", "notes/c.txt"]
+    assert _scanned([str(tmp_path)], tmp_path, include=["*.md"], exclude=["node_modules"]) == [
+        "a.md", "notes/b.md", "notes/drafts/e.md",
+    ]
+    # Relative-path patterns; a leading **/ also matches files directly in the root
+    assert _scanned([str(tmp_path)], tmp_path, include=["notes/*.txt"]) == ["notes/c.txt"]
+    assert _scanned([str(tmp_path / "**" / "*.md")], tmp_path, exclude=["notes"]) == ["a.md", "node_modules/d.md"]
+
+
+def test_scan_reports_stat_of_each_file(tmp_path):
+    path = _write(tmp_path, "a.txt", "hello")
+    os.utime(path, (100.0, 100.0))
+    [scanned] = scan_paths([str(tmp_path)], extensions=[".txt"])
+    assert scanned == (path, 5, 100.0)
+    assert list(scan_paths([str(tmp_path)], extensions=[".pdf"])) == []
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.texts = 0
+
+    def embed_documents(self, texts):
+        self.texts += len(texts)
+        return [[float(len(text)), 1.0, float(sum(map(ord, text)) % 97)] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def _processor(tmp_path, monkeypatch, embeddings):
+    monkeypatch.setattr(LLMFactory, "create_embeddings", staticmethod(lambda provider, model: embeddings))
+    return DocumentProcessor({
+        "ingest_docs": [str(tmp_path / "docs")],
+        "embedding_model_provider": "fake",
+        "embedding_model": "fake",
+        "chroma_path": str(tmp_path / "store"),
+        "vector_store": {"backend": "numpy"},
+        "query_cache": {"enabled": False},
+        "chunking_strategies": ["fixed_size"],
+        "chunking_strategies_parameters": {"fixed_size": {"size": 200, "overlap": 20}},
+        "ingestion": {"parse_workers": 0},
+    })
+
+
+def test_touch_without_content_change_is_a_no_op(tmp_path, monkeypatch):
+    paths = [_write(tmp_path, f"docs/{i}.txt", f"paragraph {i}. " * 100) for i in range(3)]
+    embeddings = CountingEmbeddings()
+    first = _processor(tmp_path, monkeypatch, embeddings)
+    chunk_ids = {path: first.manifest.get(path).chunk_ids for path in paths}
+    assert all(chunk_ids.values())
+    first.manifest.close()
+
+    os.utime(paths[0], (1e9, 1e9))
+    embeddings.texts = 0
+    hashed = []
+    real_hash_files = document_processor.hash_files
+    monkeypatch.setattr(document_processor, "hash_files", lambda files, **kwargs: hashed.extend(files) or real_hash_files(files, **kwargs))
+    second = _processor(tmp_path, monkeypatch, embeddings)
+
+    # Only the touched file is hashed; nothing is re-embedded and its chunks are kept
+    assert hashed == [paths[0]]
+    assert embeddings.texts == 0
+    entry = second.manifest.get(paths[0])
+    assert entry.mtime == 1e9
+    assert entry.content_hash == hash_file(paths[0])
+    assert {path: second.manifest.get(path).chunk_ids for path in paths} == chunk_ids
+    second.manifest.close()
+
+    # An actual content change is re-ingested
+    _write(tmp_path, "docs/0.txt", "changed. " * 100)
+    hashed.clear()
+    third = _processor(tmp_path, monkeypatch, embeddings)
+    assert hashed == [paths[0]]
+    assert embeddings.texts > 0
+    assert third.manifest.get(paths[0]).content_hash == hash_file(paths[0])
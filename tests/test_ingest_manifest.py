@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+from ingest_manifest import IngestManifest, ManifestEntry
+
+
+def _entry(path, chunk_ids=("a-0",), fingerprint="fp"):
+    return ManifestEntry(path, 10, 1.0, "hash-" + path, list(chunk_ids), fingerprint)
+
+
+def test_committed_file_survives_a_later_rolled_back_file(tmp_path):
+    db = str(tmp_path / "manifest.sqlite")
+    manifest = IngestManifest(db)
+    with manifest.transaction():
+        manifest.upsert(_entry("a.txt"), index_version=1)
+    with pytest.raises(RuntimeError):
+        with manifest.transaction():
+            manifest.upsert(_entry("b.txt"), index_version=1)
+            manifest.remove("a.txt", index_version=1)
+            raise RuntimeError("write to the vector store failed")
+    manifest.close()
+
+    reopened = IngestManifest(db)
+    assert [entry.path for entry in reopened.entries()] == ["a.txt"]
+    assert reopened.get("a.txt").chunk_ids == ["a-0"]
+    assert reopened.removed_since(0) == {}
+
+
+def test_stat_only_update_keeps_index_version(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "manifest.sqlite"))
+    with manifest.transaction():
+        manifest.upsert(_entry("a.txt"), index_version=2)
+    with manifest.transaction():
+        manifest.upsert(_entry("a.txt")._replace(mtime=5.0))
+    assert [entry.path for entry in manifest.changed_since(1)] == ["a.txt"]
+    assert manifest.changed_since(2) == []
+    assert manifest.get("a.txt").mtime == 5.0
+
+
+def test_migrate_json_imports_legacy_entries_once(tmp_path):
+    doc = tmp_path / "doc.txt"
+    doc.write_text("hello")
+    legacy = tmp_path / "doc_metadata.json"
+    legacy.write_text(json.dumps({str(doc): 123.0, "kept.txt": 1.0, "gone.txt": 2.0}))
+
+    manifest = IngestManifest(str(tmp_path / "manifest.sqlite"))
+    with manifest.transaction():
+        manifest.upsert(_entry("kept.txt"), index_version=1)
+
+    assert manifest.migrate_json(str(legacy), "current") == 3
+    assert not legacy.exists()
+    assert (tmp_path / "doc_metadata.json.migrated").exists()
+
+    migrated = manifest.get(str(doc))
+    assert migrated == ManifestEntry(str(doc), 5, 123.0, None, [], "current")
+    assert manifest.get("gone.txt").size is None
+    # Entries already in the manifest are not overwritten by the legacy file
+    assert manifest.get("kept.txt") == _entry("kept.txt")
+
+    # Once renamed, the legacy file is not imported again
+    assert manifest.migrate_json(str(legacy), "current") == 0
+
+
+def test_migrate_json_tolerates_a_corrupt_legacy_file(tmp_path):
+    legacy = tmp_path / "doc_metadata.json"
+    legacy.write_text("{not json")
+    manifest = IngestManifest(str(tmp_path / "manifest.sqlite"))
+    assert manifest.migrate_json(str(legacy), "current") == 0
+    assert manifest.count() == 0
+    assert os.path.exists(str(legacy) + ".migrated")
@@ -0,0 +1,30 @@
+import threading
+import time
+
+from llm_router import CLOSED, HALF_OPEN, OPEN, Endpoint, EndpointPool
+
+
+def test_hanging_health_check_does_not_delay_other_endpoints():
+    hung = threading.Event()
+    timeouts = []
+
+    def hanging_check(timeout=None):
+        timeouts.append(timeout)
+        hung.wait()
+        return False
+
+    stuck = Endpoint("ollama", "model", "http://stuck", llm=None, health_check=hanging_check)
+    recovering = Endpoint("ollama", "model", "http://recovering", llm=None, health_check=lambda timeout=None: True)
+    pool = EndpointPool([stuck, recovering], health_check_interval=0.01, health_check_timeout=0.5)
+    pool._open(recovering)
+    try:
+        pool.start_health_checks()
+        deadline = time.monotonic() + 5
+        while recovering.state == OPEN and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert recovering.state in (HALF_OPEN, CLOSED)
+        assert stuck.state == CLOSED
+        assert timeouts == [0.5]
+    finally:
+        pool.stop_health_checks()
+        hung.set()
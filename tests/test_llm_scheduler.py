@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Optional
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from llm_scheduler import DeadlineExceeded, LLMScheduler, ScheduledChatModel, request_options
+
+
+class SyncStreamingModel(BaseChatModel):
+    """Streams a few chunks from a blocking _stream only, like RoutedChatModel."""
+
+    delay: float = 0.002
+
+    @property
+    def _llm_type(self) -> str:
+        return "sync-streaming"
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None,
+                **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        for token in ("a", "b", "c"):
+            time.sleep(self.delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="abc"))])
+
+
+async def _collect(model):
+    return "".join([chunk.content async for chunk in model.astream([HumanMessage(content="hi")])])
+
+
+def test_astream_with_more_callers_than_executor_threads():
+    scheduler = LLMScheduler("test", max_concurrency=1)
+    model = ScheduledChatModel(llm=SyncStreamingModel(), scheduler=scheduler)
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=2))
+        return await asyncio.gather(*(_collect(model) for _ in range(64)))
+
+    # A deadlock also blocks the loop's shutdown, so the loop runs in a thread that can be abandoned
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(answers=asyncio.run(main())), daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), f"astream calls deadlocked: {scheduler.get_stats()}"
+    assert result["answers"] == ["abc"] * 64
+    stats = scheduler.get_stats()
+    assert stats["completed"] == 64
+    assert stats["active"] == 0 and stats["queue_depth"] == 0
+
+
+def test_ainvoke_is_scheduled():
+    scheduler = LLMScheduler("test", max_concurrency=2)
+    model = ScheduledChatModel(llm=SyncStreamingModel(), scheduler=scheduler)
+
+    async def main():
+        return await asyncio.gather(*(model.ainvoke([HumanMessage(content="hi")]) for _ in range(8)))
+
+    assert [message.content for message in asyncio.run(main())] == ["abc"] * 8
+    assert scheduler.get_stats()["completed"] == 8
+
+
+def test_async_waiter_past_deadline_is_shed():
+    scheduler = LLMScheduler("test", max_concurrency=1)
+    scheduler.acquire()
+
+    async def main():
+        with request_options(timeout=0.05):
+            await scheduler.aacquire(deadline=time.monotonic() + 0.05)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(main())
+    scheduler.release()
+    assert scheduler.get_stats()["shed"] == 1
+    assert scheduler.get_stats()["active"] == 0
+
+
+def test_cancelled_async_waiter_does_not_leak_its_slot():
+    scheduler = LLMScheduler("test", max_concurrency=1)
+
+    async def main():
+        await scheduler.aacquire()
+        waiting = asyncio.ensure_future(scheduler.aacquire())
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        scheduler.release()
+        await asyncio.wait_for(scheduler.aacquire(), timeout=1)
+        scheduler.release()
+
+    asyncio.run(main())
+    assert scheduler.get_stats()["active"] == 0
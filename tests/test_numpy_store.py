@@ -0,0 +1,77 @@
+import numpy as np
+
+from vector_stores import NumpyVectorStore, numpy_store
+
+DIM = 8
+
+
+def _vector(i):
+    rng = np.random.default_rng(i)
+    return rng.standard_normal(DIM).tolist()
+
+
+def _add(store, numbers):
+    ids = [f"doc-{i}" for i in numbers]
+    store.add_vectors(ids, [_vector(i) for i in numbers], [f"text {i}" for i in numbers], [{"n": i} for i in numbers])
+    return ids
+
+
+def test_search_returns_nearest_documents(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    _add(store, range(20))
+    results = store.similarity_search_by_vectors([_vector(3), _vector(11)], k=2)
+    assert [docs[0].id for docs in results] == ["doc-3", "doc-11"]
+    assert all(len(docs) == 2 for docs in results)
+
+
+def test_empty_query_batch(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    assert store.similarity_search_by_vectors([], k=4) == []
+    _add(store, range(3))
+    assert store.similarity_search_by_vectors([], k=4) == []
+    assert store.top_k(np.zeros((0, DIM)), k=4) == []
+
+
+def test_torn_log_line_is_truncated_before_new_writes(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    _add(store, [0, 1])
+    with open(tmp_path / "log.jsonl", "a") as f:
+        f.write('{"op": "add", "id": "doc-torn", "ro')
+
+    reopened = NumpyVectorStore(str(tmp_path))
+    assert reopened.count() == 2
+    _add(reopened, [2])
+    reopened.delete(["doc-0"])
+
+    reloaded = NumpyVectorStore(str(tmp_path))
+    assert reloaded.count() == 2
+    assert sorted(reloaded.get(["doc-0", "doc-1", "doc-2"])) == ["doc-1", "doc-2"]
+
+
+class _CompactingNumpy:
+    """numpy stand-in that deletes most rows, and so compacts the store, while a search is scoring."""
+
+    def __init__(self, store):
+        self.store = store
+        self.compacted = False
+
+    def __getattr__(self, name):
+        return getattr(np, name)
+
+    def take_along_axis(self, *args, **kwargs):
+        if not self.compacted:
+            self.compacted = True
+            self.store.delete([f"doc-{i}" for i in range(1500)])
+        return np.take_along_axis(*args, **kwargs)
+
+
+def test_search_concurrent_with_compaction_returns_matching_documents(tmp_path, monkeypatch):
+    store = NumpyVectorStore(str(tmp_path), compact_ratio=0.5)
+    _add(store, range(2000))
+    fake_numpy = _CompactingNumpy(store)
+    monkeypatch.setattr(numpy_store, "np", fake_numpy)
+
+    results = store.similarity_search_by_vectors([_vector(1999), _vector(1700)], k=1)
+    assert fake_numpy.compacted and store.count() == 500
+    assert [docs[0].id for docs in results] == ["doc-1999", "doc-1700"]
+    assert results[0][0].page_content == "text 1999"
@@ -0,0 +1,42 @@
+import os
+
+from langchain_core.embeddings import Embeddings
+
+from query_embedding_cache import CachedQueryEmbeddings, append_query_log
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_query_log_is_trimmed_to_its_tail(tmp_path):
+    log_path = str(tmp_path / "query_log.txt")
+    for i in range(1000):
+        append_query_log(log_path, f"  question\tnumber {i:04d} ", tail_bytes=200)
+        assert os.path.getsize(log_path) <= 4 * 200 + 30
+
+    with open(log_path) as f:
+        lines = f.read().splitlines()
+    # Only whole lines are kept and the newest question is last
+    assert lines[-1] == "question number 0999"
+    assert all(line.startswith("question number ") and len(line) == 20 for line in lines)
+    assert not os.path.exists(log_path + ".tmp")
+
+
+def test_warm_from_log_reads_only_the_tail(tmp_path):
+    log_path = str(tmp_path / "query_log.txt")
+    for question in ["old"] * 50 + ["new", "newer", "new"]:
+        append_query_log(log_path, question)
+
+    embeddings = FakeEmbeddings()
+    cache = CachedQueryEmbeddings(embeddings, "test", cache_dir=str(tmp_path / "cache"))
+    assert cache.warm_from_log(log_path, limit=10, tail_bytes=len("w\nnewer\nnew\n")) == 2
+    assert sorted(embeddings.embedded) == ["new", "newer"]
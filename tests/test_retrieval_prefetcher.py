@@ -0,0 +1,46 @@
+import threading
+
+from retrieval_prefetcher import RetrievalPrefetcher
+
+
+def test_finished_prefetch_is_reused():
+    prefetcher = RetrievalPrefetcher(lambda query, session_id: ("standalone", [query]))
+    prefetcher.prefetch("s", "What is X?").result()
+    assert prefetcher.take("s", "what is  x?") == ("standalone", ["What is X?"])
+    assert prefetcher.get_stats()["hits"] == 1
+    prefetcher.shutdown()
+
+
+def test_prefetch_that_has_not_started_is_cancelled_instead_of_awaited():
+    release = threading.Event()
+    prefetcher = RetrievalPrefetcher(lambda query, session_id: release.wait(5) and query, max_workers=1)
+    blocker = prefetcher.prefetch("other", "busy")
+    queued = prefetcher.prefetch("s", "question")
+    try:
+        assert prefetcher.take("s", "question") is None
+        assert queued.cancelled()
+        assert prefetcher.get_stats()["cancelled"] == 1
+    finally:
+        release.set()
+        blocker.result()
+        prefetcher.shutdown()
+
+
+def test_running_prefetch_is_awaited_with_a_bound():
+    started = threading.Event()
+    release = threading.Event()
+
+    def retrieve(query, session_id):
+        started.set()
+        release.wait(5)
+        return query
+
+    prefetcher = RetrievalPrefetcher(retrieve, wait_timeout=0.05)
+    prefetcher.prefetch("s", "question")
+    started.wait(5)
+    try:
+        assert prefetcher.take("s", "question") is None
+        assert prefetcher.get_stats()["late"] == 1
+    finally:
+        release.set()
+        prefetcher.shutdown()